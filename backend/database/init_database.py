@@ -1,7 +1,74 @@
+import json
+
 from sqlalchemy import text
 
 from database.db import Base, engine
 from models import *
+from models.message import MESSAGE_SEARCH_VECTOR_SQL
+from utils.embedded.vector_codec import EMBEDDING_DIMENSION, encode_vector
+
+EMBEDDING_MIGRATION_BATCH_SIZE = 1000
+
+# Database objects the table definitions depend on, created before create_all().
+# unaccent() is only STABLE, so generated columns go through an IMMUTABLE wrapper.
+SCHEMA_PREREQUISITES = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """,
+]
+
+# create_all() only creates missing tables, so columns and indexes added to
+# existing tables are applied here. Every statement must be idempotent.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE destinations ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION",
+    "ALTER TABLE destinations ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION",
+    "ALTER TABLE destinations ADD COLUMN IF NOT EXISTS coordinates_updated_at TIMESTAMPTZ",
+    "ALTER TABLE destinations ADD COLUMN IF NOT EXISTS green_score DOUBLE PRECISION",
+    "ALTER TABLE destinations ADD COLUMN IF NOT EXISTS green_verified_at TIMESTAMPTZ",
+    # Message history pages on (room_id, created_at, id); replaces the
+    # (room_id, created_at) index, which is a prefix of it
+    "CREATE INDEX IF NOT EXISTS ix_message_room_created_id ON messages (room_id, created_at, id)",
+    "DROP INDEX IF EXISTS ix_message_room_created",
+    # Full-text message search, ignoring case and diacritics
+    f"""
+    ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+        GENERATED ALWAYS AS ({MESSAGE_SEARCH_VECTOR_SQL}) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_message_search_vector ON messages USING gin (search_vector)",
+    # Embeddings moved from JSON text to float32 BYTEA. The old columns are
+    # renamed and backfilled by migrate_legacy_embeddings().
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'destination_embeddings'
+              AND column_name = 'embedding_vector' AND data_type = 'text'
+        ) THEN
+            ALTER TABLE destination_embeddings
+                RENAME COLUMN embedding_vector TO embedding_vector_legacy;
+            ALTER TABLE destination_embeddings ADD COLUMN embedding_vector BYTEA;
+        END IF;
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'preferences'
+              AND column_name = 'embedding' AND data_type IN ('json', 'jsonb')
+        ) THEN
+            ALTER TABLE preferences RENAME COLUMN embedding TO embedding_legacy;
+            ALTER TABLE preferences ADD COLUMN embedding BYTEA;
+        END IF;
+    END $$
+    """,
+]
+
+# (table, key column, new column, legacy column)
+LEGACY_EMBEDDING_COLUMNS = [
+    ("destination_embeddings", "destination_id", "embedding_vector", "embedding_vector_legacy"),
+    ("preferences", "id", "embedding", "embedding_legacy"),
+]
 
 
 async def drop_specific_tables(table_names: list[str]):
@@ -20,6 +87,79 @@ async def clear_table_data(table_names: list[str]):
         print("Table data cleared successfully")
 
 
+async def apply_schema_upgrades(conn):
+    for statement in SCHEMA_UPGRADES:
+        await conn.execute(text(statement))
+
+
+async def _legacy_column_exists(conn, table: str, column: str) -> bool:
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = :table AND column_name = :column"
+        ),
+        {"table": table, "column": column},
+    )
+    return result.first() is not None
+
+
+async def migrate_legacy_embeddings(conn):
+    """
+    Convert JSON-encoded embeddings left by older schemas into float32 bytes
+    in batches, then drop the legacy columns. Rows whose JSON is not a
+    384-dimension vector (unparseable, JSON null, [] ...) lose their
+    embedding and are regenerated by the normal jobs.
+    """
+    for table, key, column, legacy in LEGACY_EMBEDDING_COLUMNS:
+        if not await _legacy_column_exists(conn, table, legacy):
+            continue
+
+        converted = 0
+        while True:
+            rows = (
+                await conn.execute(
+                    text(
+                        f"SELECT {key}, {legacy}::text FROM {table} "
+                        f"WHERE {column} IS NULL AND {legacy} IS NOT NULL "
+                        f"LIMIT :limit"
+                    ),
+                    {"limit": EMBEDDING_MIGRATION_BATCH_SIZE},
+                )
+            ).all()
+            if not rows:
+                break
+
+            updates, broken = [], []
+            for row_key, raw in rows:
+                try:
+                    vector = encode_vector(json.loads(raw), EMBEDDING_DIMENSION)
+                    updates.append({"key": row_key, "vector": vector})
+                except (TypeError, ValueError):
+                    broken.append({"key": row_key})
+
+            if updates:
+                await conn.execute(
+                    text(f"UPDATE {table} SET {column} = :vector WHERE {key} = :key"),
+                    updates,
+                )
+            if broken:
+                await conn.execute(
+                    text(f"UPDATE {table} SET {legacy} = NULL WHERE {key} = :key"),
+                    broken,
+                )
+                print(f"WARNING: Dropped {len(broken)} unreadable embeddings from {table}")
+            converted += len(updates)
+
+        if table == "destination_embeddings":
+            # Destination embeddings without a vector are useless to the index
+            await conn.execute(text(f"DELETE FROM {table} WHERE {column} IS NULL"))
+            await conn.execute(
+                text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+            )
+        await conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {legacy}"))
+        print(f"Migrated {converted} embeddings in {table} to float32 bytes")
+
+
 async def init_db(drop_all: bool = False):
     async with engine.begin() as conn:
         if drop_all:
@@ -28,6 +168,10 @@ async def init_db(drop_all: bool = False):
             await conn.execute(text("CREATE SCHEMA public"))
             await conn.execute(text("GRANT ALL ON SCHEMA public TO postgres"))
             await conn.execute(text("GRANT ALL ON SCHEMA public TO public"))
+        for statement in SCHEMA_PREREQUISITES:
+            await conn.execute(text(statement))
         print("Creating tables...")
         await conn.run_sync(Base.metadata.create_all)
+        await apply_schema_upgrades(conn)
+        await migrate_legacy_embeddings(conn)
     print("Database initialized successfully")
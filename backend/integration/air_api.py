@@ -1,7 +1,6 @@
 from typing import List, Optional
 
-import httpx
-
+from integration.http_clients import get_http_client
 from schemas.air_schema import AirQualityIndex, AirQualityResponse, HealthRecommendation
 from schemas.destination_schema import Location
 from utils.config import settings
@@ -10,11 +9,12 @@ from utils.config import settings
 class AirQualityAPI:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.GOOGLE_API_KEY
-        self.client = httpx.AsyncClient()
+        self.client = get_http_client("google_air_quality")
         self.base_url = "https://airquality.googleapis.com/v1/currentConditions:lookup"
 
     async def close(self):
-        await self.client.aclose()
+        # The pooled client is owned by the registry and closed on shutdown
+        pass
 
     async def get_air_quality(
         self,
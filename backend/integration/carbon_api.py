@@ -2,6 +2,7 @@ from typing import Optional
 
 import httpx
 
+from integration.http_clients import get_http_client
 from schemas.route_schema import TransportMode
 from utils.config import settings
 
@@ -17,10 +18,11 @@ class CarbonAPI:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
-        self.client = httpx.AsyncClient(headers=self.headers, timeout=10)
+        self.client = get_http_client("climatiq")
 
     async def close(self):
-        await self.client.aclose()
+        # The pooled client is owned by the registry and closed on shutdown
+        pass
 
     async def estimate_car(self, distance_km: float, passengers: int = 1) -> float:
         url = f"{self.basic_base_url}/estimate"
@@ -34,7 +36,7 @@ class CarbonAPI:
         }
 
         try:
-            res = await self.client.post(url, json=params)
+            res = await self.client.post(url, json=params, headers=self.headers)
 
             if res.status_code != 200:
                 raise ValueError(
@@ -64,7 +66,7 @@ class CarbonAPI:
             "parameters": {"distance": distance_km, "distance_unit": "km"},
         }
         try:
-            response = await self.client.post(url, json=params)
+            response = await self.client.post(url, json=params, headers=self.headers)
 
             if response.status_code != 200:
                 raise ValueError(
@@ -92,7 +94,7 @@ class CarbonAPI:
         }
 
         try:
-            response = await self.client.post(url, json=params)
+            response = await self.client.post(url, json=params, headers=self.headers)
 
             if response.status_code != 200:
                 raise ValueError(
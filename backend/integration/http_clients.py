@@ -0,0 +1,172 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from utils.config import settings
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class PoolConfig:
+    max_connections: int
+    max_keepalive_connections: int
+    timeout: float
+    connect_timeout: float = 10.0
+    http2: bool = True
+    follow_redirects: bool = False
+
+
+# One pool per upstream host. Google Maps and Places share a pool because
+# MapAPI talks to both hosts from the same methods.
+POOL_CONFIGS: Dict[str, PoolConfig] = {
+    "google_maps": PoolConfig(max_connections=50, max_keepalive_connections=20, timeout=30.0),
+    "google_routes": PoolConfig(max_connections=40, max_keepalive_connections=20, timeout=30.0),
+    "google_weather": PoolConfig(max_connections=10, max_keepalive_connections=5, timeout=10.0),
+    "google_air_quality": PoolConfig(max_connections=10, max_keepalive_connections=5, timeout=10.0),
+    "climatiq": PoolConfig(max_connections=10, max_keepalive_connections=5, timeout=10.0, http2=False),
+    "openrouter": PoolConfig(max_connections=20, max_keepalive_connections=10, timeout=60.0),
+    # Place photos for green verification; photo URLs redirect to the CDN
+    "images": PoolConfig(
+        max_connections=settings.IMAGE_FETCH_CONCURRENCY,
+        max_keepalive_connections=settings.IMAGE_FETCH_CONCURRENCY,
+        timeout=settings.IMAGE_FETCH_TIMEOUT_SECONDS,
+        follow_redirects=True,
+    ),
+}
+
+
+def _parse_limit_overrides(raw: str) -> Dict[str, int]:
+    """Parse "pool=limit,pool=limit" from HTTP_POOL_MAX_CONNECTIONS."""
+    overrides = {}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            overrides[name.strip()] = int(value.strip())
+    return overrides
+
+
+class HTTPClientRegistry:
+    """
+    Application-scoped httpx clients shared by all integration classes.
+
+    Clients are created in main.lifespan and closed on shutdown. get() also
+    creates a client lazily so scripts that never run the lifespan still work.
+    """
+
+    def __init__(self, configs: Dict[str, PoolConfig]):
+        self.configs = dict(configs)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._request_counts: Dict[str, int] = {}
+        self._error_counts: Dict[str, int] = {}
+
+        for name, limit in _parse_limit_overrides(settings.HTTP_POOL_MAX_CONNECTIONS).items():
+            if name in self.configs:
+                config = self.configs[name]
+                self.configs[name] = PoolConfig(
+                    max_connections=limit,
+                    max_keepalive_connections=min(config.max_keepalive_connections, limit),
+                    timeout=config.timeout,
+                    connect_timeout=config.connect_timeout,
+                    http2=config.http2,
+                    follow_redirects=config.follow_redirects,
+                )
+
+    @staticmethod
+    def _uses_http2(config: PoolConfig) -> bool:
+        return config.http2 and settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+
+    def _create_client(self, name: str) -> httpx.AsyncClient:
+        config = self.configs[name]
+        self._request_counts.setdefault(name, 0)
+        self._error_counts.setdefault(name, 0)
+
+        async def count_request(request: httpx.Request):
+            self._request_counts[name] += 1
+
+        async def count_error(response: httpx.Response):
+            if response.status_code >= 500:
+                self._error_counts[name] += 1
+
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=settings.HTTP_POOL_KEEPALIVE_EXPIRY,
+            ),
+            http2=self._uses_http2(config),
+            follow_redirects=config.follow_redirects,
+            event_hooks={"request": [count_request], "response": [count_error]},
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        if name not in self.configs:
+            raise ValueError(f"Unknown HTTP client pool: {name}")
+
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create_client(name)
+            self._clients[name] = client
+        return client
+
+    async def start(self):
+        for name in self.configs:
+            self.get(name)
+
+    async def close(self):
+        for client in self._clients.values():
+            if not client.is_closed:
+                await client.aclose()
+        self._clients.clear()
+
+    @staticmethod
+    def _pool_snapshot(client: httpx.AsyncClient) -> Dict[str, int]:
+        # httpx does not expose pool state publicly, so read it defensively
+        # from the underlying httpcore connection pool.
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "connections": len(connections),
+            "active_connections": len(connections) - idle,
+            "idle_connections": idle,
+            "queued_requests": len(getattr(pool, "_requests", []) or []),
+        }
+
+    def stats(self) -> Dict[str, dict]:
+        result = {}
+        for name, config in self.configs.items():
+            client: Optional[httpx.AsyncClient] = self._clients.get(name)
+            snapshot = (
+                self._pool_snapshot(client)
+                if client is not None and not client.is_closed
+                else {
+                    "connections": 0,
+                    "active_connections": 0,
+                    "idle_connections": 0,
+                    "queued_requests": 0,
+                }
+            )
+            result[name] = {
+                **snapshot,
+                "max_connections": config.max_connections,
+                "utilization": snapshot["active_connections"] / config.max_connections,
+                "http2": self._uses_http2(config),
+                "requests_total": self._request_counts.get(name, 0),
+                "server_errors_total": self._error_counts.get(name, 0),
+            }
+        return result
+
+
+http_clients = HTTPClientRegistry(POOL_CONFIGS)
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    return http_clients.get(name)
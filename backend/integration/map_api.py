@@ -24,6 +24,7 @@ from schemas.map_schema import (
     TextSearchResponse,
 )
 from schemas.route_schema import DirectionsResponse
+from integration.http_clients import get_http_client
 from utils.config import settings
 from utils.maps.map_utils import interpolate_search_params
 
@@ -46,13 +47,9 @@ class MapAPI:
         self.base_url = "https://maps.googleapis.com/maps/api"
         self.new_base_url = "https://places.googleapis.com/v1/places/"
 
-        # Create client with better timeout and connection settings
-        # Increase timeout and add retries for flaky connections
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0, connect=10.0),
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
-            verify=True,  # Ensure SSL verification is enabled
-        )
+        # Borrow the application-scoped pool so TLS sessions and keep-alive
+        # connections survive across requests
+        self.client = get_http_client("google_maps")
 
     async def _convert_photos_safely(self, photos: list) -> list:
         """Convert photo references to URLs with error handling for each photo."""
@@ -210,7 +207,8 @@ class MapAPI:
                 raise e
 
     async def close(self):
-        await self.client.aclose()
+        # The pooled client is owned by the registry and closed on shutdown
+        pass
 
     async def autocomplete_place(
         self, data: AutocompleteRequest, components: str = "country:vn"
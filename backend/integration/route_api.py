@@ -1,8 +1,6 @@
 import time
 from typing import Any, Dict, List, Optional
 
-import httpx
-
 from schemas.route_schema import (
     DirectionsRequest,
     DirectionsResponse,
@@ -11,6 +9,7 @@ from schemas.route_schema import (
     Step,
     TransportMode,
 )
+from integration.http_clients import get_http_client
 from utils.config import settings
 
 # Import Location and Bounds from route_schema since it already imports from destination_schema
@@ -85,7 +84,7 @@ class RouteAPI:
 
         self.base_url = "https://routes.googleapis.com/directions/v2:computeRoutes"
         self.base_url_v1 = "https://maps.googleapis.com/maps/api/directions/json"
-        self.client = httpx.AsyncClient(timeout=30.0)  # Increased timeout for Routes API
+        self.client = get_http_client("google_routes")
 
     @staticmethod
     def _parse_transit_details(transit_data: Dict[str, Any]) -> Optional[Any]:
@@ -137,7 +136,8 @@ class RouteAPI:
             return None
 
     async def close(self):
-        await self.client.aclose()
+        # The pooled client is owned by the registry and closed on shutdown
+        pass
 
     async def get_routes_v1(
         self, data: DirectionsRequest, mode: TransportMode, language: str = "vi"
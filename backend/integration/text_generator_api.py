@@ -1,5 +1,6 @@
 import httpx
 
+from integration.http_clients import get_http_client
 from utils.config import settings
 
 
@@ -38,32 +39,32 @@ class TextGeneratorAPI:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                print(f"🔄 Calling OpenRouter API with model: {model}")
-                print(f"📤 Payload: {payload}")
+            client = get_http_client("openrouter")
+            print(f"🔄 Calling OpenRouter API with model: {model}")
+            print(f"📤 Payload: {payload}")
 
-                resp = await client.post(
-                    self.base_url, json=payload, headers=headers
-                )
+            resp = await client.post(
+                self.base_url, json=payload, headers=headers
+            )
 
-                print(f"📥 Response status: {resp.status_code}")
-                print(f"📥 Response body: {resp.text[:500]}")
+            print(f"📥 Response status: {resp.status_code}")
+            print(f"📥 Response body: {resp.text[:500]}")
 
-                resp.raise_for_status()
+            resp.raise_for_status()
 
-                if not resp.text or resp.text.strip() == "":
-                    raise Exception("Empty response from LLM")
+            if not resp.text or resp.text.strip() == "":
+                raise Exception("Empty response from LLM")
 
-                try:
-                    data = resp.json()
-                except Exception as json_err:
-                    raise Exception("LLM returned non-JSON body") from json_err
+            try:
+                data = resp.json()
+            except Exception as json_err:
+                raise Exception("LLM returned non-JSON body") from json_err
 
-                if "choices" not in data or len(data["choices"]) == 0:
-                    raise Exception("Invalid response format: missing 'choices'")
+            if "choices" not in data or len(data["choices"]) == 0:
+                raise Exception("Invalid response format: missing 'choices'")
 
-                reply = data["choices"][0]["message"]["content"]
-                return reply
+            reply = data["choices"][0]["message"]["content"]
+            return reply
 
         except httpx.HTTPStatusError as e:
             error_body = e.response.text if hasattr(e.response, 'text') else str(e)
@@ -110,57 +111,57 @@ class TextGeneratorAPI:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                print("🔄 Calling OpenRouter API for JSON generation")
-
-                resp = await client.post(
-                    self.base_url, json=payload, headers=headers
-                )
-
-                print(f"📥 Response status: {resp.status_code}")
-
-                resp.raise_for_status()
-
-                if not resp.text or resp.text.strip() == "":
-                    raise Exception("Empty response from LLM")
-
-                try:
-                    data = resp.json()
-                except Exception as json_err:
-                    raise Exception("LLM returned non-JSON body") from json_err
-
-                if "choices" not in data or len(data["choices"]) == 0:
-                    raise Exception("Invalid response format: missing 'choices'")
-
-                reply = data["choices"][0]["message"]["content"]
-
-                # Try to parse the reply as JSON
-                try:
-                    import json
-                    # Log raw response before processing
-                    print(f"📝 Raw LLM response: {repr(reply)}")
-
-                    # Remove markdown code blocks if present
-                    reply = reply.strip()
-                    if reply.startswith("```json"):
-                        reply = reply[7:]
-                    if reply.startswith("```"):
-                        reply = reply[3:]
-                    if reply.endswith("```"):
-                        reply = reply[:-3]
-                    reply = reply.strip()
-
-                    print(f"📝 After markdown removal: {repr(reply)}")
-
-                    json_result = json.loads(reply)
-                    print(f"✅ Parsed JSON: {json_result}")
-                    return json_result
-                except json.JSONDecodeError as e:
-                    print(f"❌ Failed to parse JSON. Error: {e}")
-                    print(f"❌ Problematic text: {repr(reply)}")
-                    print(f"❌ Text length: {len(reply)} chars")
-                    print(f"❌ First 100 chars: {reply[:100]}")
-                    raise Exception(f"LLM response is not valid JSON: {e}")
+            client = get_http_client("openrouter")
+            print("🔄 Calling OpenRouter API for JSON generation")
+
+            resp = await client.post(
+                self.base_url, json=payload, headers=headers
+            )
+
+            print(f"📥 Response status: {resp.status_code}")
+
+            resp.raise_for_status()
+
+            if not resp.text or resp.text.strip() == "":
+                raise Exception("Empty response from LLM")
+
+            try:
+                data = resp.json()
+            except Exception as json_err:
+                raise Exception("LLM returned non-JSON body") from json_err
+
+            if "choices" not in data or len(data["choices"]) == 0:
+                raise Exception("Invalid response format: missing 'choices'")
+
+            reply = data["choices"][0]["message"]["content"]
+
+            # Try to parse the reply as JSON
+            try:
+                import json
+                # Log raw response before processing
+                print(f"📝 Raw LLM response: {repr(reply)}")
+
+                # Remove markdown code blocks if present
+                reply = reply.strip()
+                if reply.startswith("```json"):
+                    reply = reply[7:]
+                if reply.startswith("```"):
+                    reply = reply[3:]
+                if reply.endswith("```"):
+                    reply = reply[:-3]
+                reply = reply.strip()
+
+                print(f"📝 After markdown removal: {repr(reply)}")
+
+                json_result = json.loads(reply)
+                print(f"✅ Parsed JSON: {json_result}")
+                return json_result
+            except json.JSONDecodeError as e:
+                print(f"❌ Failed to parse JSON. Error: {e}")
+                print(f"❌ Problematic text: {repr(reply)}")
+                print(f"❌ Text length: {len(reply)} chars")
+                print(f"❌ First 100 chars: {reply[:100]}")
+                raise Exception(f"LLM response is not valid JSON: {e}")
 
         except httpx.HTTPStatusError as e:
             error_body = e.response.text if hasattr(e.response, 'text') else str(e)
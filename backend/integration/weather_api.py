@@ -1,7 +1,6 @@
 from typing import Optional
 
-import httpx
-
+from integration.http_clients import get_http_client
 from schemas.weather_schema import (
     CurrentWeatherRequest,
     CurrentWeatherResponse,
@@ -26,7 +25,7 @@ class WeatherAPI:
         self.current_weather_endpoint = "/currentConditions:lookup"
         self.forecast_endpoint = "/forecast/hours:lookup"
 
-        self.client = httpx.AsyncClient()
+        self.client = get_http_client("google_weather")
 
     async def get_current(self, param: CurrentWeatherRequest) -> CurrentWeatherResponse:
         params = {
@@ -126,7 +125,8 @@ class WeatherAPI:
         return WeatherForecastResponse(hourly_forecast=hourly_data)
 
     async def close(self):
-        await self.client.aclose()
+        # The pooled client is owned by the registry and closed on shutdown
+        pass
 
 
 async def create_weather_client(api_key: Optional[str] = None) -> WeatherAPI:
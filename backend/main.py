@@ -1,3 +1,7 @@
+from utils.startup import readiness, startup_profiler
+
+startup_profiler.start_imports()
+
 from contextlib import asynccontextmanager
 import asyncio
 
@@ -9,13 +13,16 @@ from fastapi.responses import Response
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from database.db import get_sync_session
-from utils.embedded.faiss_utils import build_index
+from utils.embedded.faiss_utils import is_index_ready, load_or_build_index, persist_index
+from utils.embedded.embedding_service import embedding_service
+from utils.embedded.embedding_utils import get_embedding_model
 
 # Import database setup
 from database.db import engine
 from database.db import UserAsyncSessionLocal
 from database.init_database import init_db
 from database.create_all_databases import create_databases
+from integration.http_clients import http_clients
 from scripts import bulk_create
 from routers.air_router import router as air_router
 from routers.authentication_router import router as auth_router
@@ -37,7 +44,19 @@ from routers.user_router import router as user_router
 from routers.weather_router import router as weather_router
 from routers.carbon_router import router as carbon_router
 from utils.config import settings
+from utils.maps.route_cache import route_cache
+from services.carbon_service import CarbonService
 from services.cluster_service import ClusterService
+from services.green_verification_service import (
+    green_verification_jobs,
+    green_verification_sweep,
+)
+from utils.green_verification.worker import green_verification_pool
+from services.socket_service import socket
+from utils.socket_backplane import InProcessBackplane
+from utils.chat_context_cache import chat_context_cache
+
+startup_profiler.stop_imports()
 
 # Scheduler instance
 scheduler = AsyncIOScheduler()
@@ -64,6 +83,77 @@ async def scheduled_clustering_job():
         print(f"\n❌ Error in scheduled clustering job: {e}")
 
 
+# Background emission factor refresh
+async def scheduled_emission_factor_refresh_job():
+    """
+    Refresh the offline emission factors from Climatiq.
+    Route estimation keeps using the loaded factors if this fails.
+    """
+    try:
+        async with UserAsyncSessionLocal() as db:
+            table = await CarbonService.refresh_emission_factors(db)
+            print(f"\n✅ Emission factors refreshed: {table.version}")
+    except Exception as e:
+        print(f"\n❌ Error in emission factor refresh job: {e}")
+
+
+# Background route cache cleanup
+async def scheduled_route_cache_purge_job():
+    try:
+        purged = await route_cache.purge_expired()
+        print(f"\n✅ Route cache purged {purged} expired entries")
+    except Exception as e:
+        print(f"\n❌ Error in route cache purge job: {e}")
+
+
+# Background FAISS index persistence
+async def scheduled_faiss_persist_job():
+    """Write incremental index changes to disk so restarts can skip a rebuild."""
+    try:
+        with get_sync_session() as db:
+            if persist_index(db):
+                print("\n✅ FAISS index persisted")
+    except Exception as e:
+        print(f"\n❌ Error in FAISS persist job: {e}")
+
+
+# Background warm-up of the ML subsystems
+def _warm_embeddings():
+    get_embedding_model().encode(["warm up"])
+
+
+def _warm_faiss():
+    with get_sync_session() as db:
+        if not load_or_build_index(db, normalize=False):
+            raise RuntimeError("FAISS index build failed - recommendations may be limited")
+
+
+def _warm_green_models():
+    # Models live in the worker processes, so starting the workers loads them
+    green_verification_pool.warm_up()
+
+
+async def warm_up_subsystems():
+    """
+    Load models and indexes in worker threads after the API is already
+    serving. Requests arriving earlier use the existing fallbacks (database
+    queries instead of FAISS, on-demand model loading).
+    """
+    async def warm(name: str, loader):
+        try:
+            with readiness.track(name):
+                await asyncio.to_thread(loader)
+            print(f"✅ {name} ready")
+        except Exception as e:
+            print(f"⚠️ WARNING: {name} warm-up failed - {e}")
+
+    warmers = [warm("embeddings", _warm_embeddings), warm("faiss", _warm_faiss)]
+    if settings.WARM_GREEN_MODELS:
+        warmers.append(warm("green_models", _warm_green_models))
+    await asyncio.gather(*warmers)
+    startup_profiler.report()
+
+
 # Lifespan event handler (startup/shutdown)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -80,8 +170,20 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting EcomoveX ..")
 
+    await http_clients.start()
+    print("HTTP client pools ready")
+
+    try:
+        await socket.start()
+        print(f"✅ Socket backplane ready ({settings.SOCKET_BACKPLANE})")
+    except Exception as e:
+        # Chat keeps working for sockets on this worker
+        await socket.start(InProcessBackplane())
+        print(f"⚠️ WARNING: Socket backplane unavailable, using in-process fan-out - {e}")
+
     try:
-        await init_db(drop_all=False)
+        with startup_profiler.step("init_db"):
+            await init_db(drop_all=False)
         print("Database initialized")
     except Exception as e:
         print(f"WARNING: Database initialization failed - {e}")
@@ -99,18 +201,19 @@ async def lifespan(app: FastAPI):
     else:
         print("ℹ️  Bulk create users is disabled")
 
-    # Initialize FAISS index for recommendations
     try:
-        print("🔧 Initializing FAISS recommendation index...")
-        with get_sync_session() as db:
-            success = build_index(db, normalize=False)
-            if success:
-                print("✅ FAISS index built successfully")
-            else:
-                print("⚠️ FAISS index build failed - recommendations may be limited")
+        with startup_profiler.step("emission_factors"):
+            async with UserAsyncSessionLocal() as db:
+                table = await CarbonService.load_emission_factors(db)
+        print(f"✅ Emission factors loaded (version {table.version})")
     except Exception as e:
-        print(f"⚠️ WARNING: FAISS index initialization failed - {e}")
-        print("   Recommendations will fall back to database-only queries")
+        print(f"⚠️ WARNING: Failed to load emission factors, using defaults - {e}")
+
+    # ML subsystems load in the background so the API accepts traffic immediately
+    readiness.register("embeddings")
+    readiness.register("faiss")
+    readiness.register("green_models", enabled=settings.WARM_GREEN_MODELS)
+    warm_up_task = asyncio.create_task(warm_up_subsystems())
 
     # Start APScheduler for periodic clustering
     try:
@@ -123,6 +226,31 @@ async def lifespan(app: FastAPI):
             replace_existing=True,
             max_instances=1  # Only one instance at a time
         )
+        scheduler.add_job(
+            scheduled_route_cache_purge_job,
+            trigger=IntervalTrigger(days=1),
+            id="route_cache_purge_job",
+            name="Purge expired route cache entries",
+            replace_existing=True,
+            max_instances=1
+        )
+        scheduler.add_job(
+            scheduled_faiss_persist_job,
+            trigger=IntervalTrigger(minutes=settings.FAISS_PERSIST_INTERVAL_MINUTES),
+            id="faiss_persist_job",
+            name="Persist FAISS index changes",
+            replace_existing=True,
+            max_instances=1
+        )
+        if settings.CLIMATIQ_API_KEY:
+            scheduler.add_job(
+                scheduled_emission_factor_refresh_job,
+                trigger=IntervalTrigger(days=settings.EMISSION_FACTOR_REFRESH_DAYS),
+                id="emission_factor_refresh_job",
+                name="Refresh emission factors from Climatiq",
+                replace_existing=True,
+                max_instances=1
+            )
         scheduler.start()
         print("✅ Scheduler started - clustering will run every 7 days")
         print("   Next run: Check scheduler logs")
@@ -135,6 +263,13 @@ async def lifespan(app: FastAPI):
     # Shutdown: Cleanup
     print("Shutting down EcomoveX ..")
 
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+
+    green_verification_jobs.cancel_all()
+    green_verification_sweep.cancel()
+    green_verification_pool.shutdown()
+
     # Stop scheduler
     try:
         scheduler.shutdown(wait=False)
@@ -142,6 +277,29 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"WARNING: Failed to stop scheduler - {e}")
 
+    try:
+        if is_index_ready():
+            with get_sync_session() as db:
+                persist_index(db)
+    except Exception as e:
+        print(f"WARNING: Failed to persist FAISS index - {e}")
+
+    try:
+        await embedding_service.close()
+    except Exception as e:
+        print(f"WARNING: Failed to stop embedding service - {e}")
+
+    try:
+        await socket.close()
+    except Exception as e:
+        print(f"WARNING: Failed to close socket backplane - {e}")
+
+    try:
+        await http_clients.close()
+        print("HTTP client pools closed")
+    except Exception as e:
+        print(f"WARNING: Failed to close HTTP client pools - {e}")
+
     try:
         await engine.dispose()
         print("Database connections closed")
@@ -216,6 +374,32 @@ async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.get("/ready", tags=["Root"])
+async def readiness_check():
+    """Which ML subsystems have finished warming up."""
+    return readiness.snapshot()
+
+
+@app.get("/metrics/http-pools", tags=["Root"])
+async def http_pool_metrics():
+    return http_clients.stats()
+
+
+@app.get("/metrics/embeddings", tags=["Root"])
+async def embedding_metrics():
+    return embedding_service.stats()
+
+
+@app.get("/metrics/sockets", tags=["Root"])
+async def socket_metrics():
+    return socket.stats()
+
+
+@app.get("/metrics/chat-context", tags=["Root"])
+async def chat_context_metrics():
+    return chat_context_cache.stats()
+
+
 # Global exception handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -1,11 +1,21 @@
-from .cluster import Cluster, ClusterDestination, Preference, UserClusterAssociation
+from .cluster import (
+    Cluster,
+    ClusterCentroid,
+    ClusterDestination,
+    ClusterRecommendation,
+    Preference,
+    UserClusterAssociation,
+)
 from .destination import Destination, DestinationEmbedding, UserSavedDestination
+from .emission_factor import EmissionFactor
 from .friend import Friend
+from .green_verification import GreenImageResult, GreenVerificationJob
 from .message import Message, RoomContext
 from .metadata import Metadata
 from .mission import Mission, UserMission
 from .plan import Plan, PlanDestination, PlanMember, Route
 from .review import Review, ReviewFile
+from .route_cache import RouteCacheEntry
 from .room import Room, RoomDirect, RoomMember
 from .user import User, UserActivity
 
@@ -22,7 +32,9 @@ __all__ = [
     "Mission",
     "UserMission",
     "Cluster",
+    "ClusterCentroid",
     "ClusterDestination",
+    "ClusterRecommendation",
     "UserClusterAssociation",
     "Friend",
     "UserSavedDestination",
@@ -34,4 +46,8 @@ __all__ = [
     "RoomContext",
     "Preference",
     "Route",
+    "EmissionFactor",
+    "RouteCacheEntry",
+    "GreenImageResult",
+    "GreenVerificationJob",
 ]
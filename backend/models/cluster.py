@@ -13,6 +13,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from database.db import Base
+from utils.embedded.vector_codec import Float32Vector
 
 
 class Cluster(Base):
@@ -103,7 +104,7 @@ class Preference(Base):
         JSON, nullable=True
     )  # list of destination IDs or names
 
-    embedding = Column(JSON, nullable=True)
+    embedding = Column(Float32Vector, nullable=True)
     weight = Column(Float, default=1.0)
     cluster_id = Column(
         Integer, ForeignKey("clusters.id", ondelete="SET NULL"), nullable=True
@@ -112,3 +113,47 @@ class Preference(Base):
 
     user = relationship("User", back_populates="preference")
     cluster = relationship("Cluster", back_populates="preferences")
+
+
+class ClusterRecommendation(Base):
+    """Hybrid recommendations precomputed for each cluster after clustering runs."""
+
+    __tablename__ = "cluster_recommendations"
+    __table_args__ = (Index("ix_cluster_recommendation_rank", "cluster_id", "rank"),)
+
+    cluster_id = Column(
+        Integer,
+        ForeignKey("clusters.id", ondelete="CASCADE"),
+        nullable=False,
+        primary_key=True,
+    )
+    destination_id = Column(
+        String(255),
+        ForeignKey("destinations.place_id", ondelete="CASCADE"),
+        nullable=False,
+        primary_key=True,
+    )
+    rank = Column(Integer, nullable=False)
+    hybrid_score = Column(Float, nullable=False)
+    similarity_score = Column(Float, nullable=False)
+    popularity_score = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ClusterCentroid(Base):
+    """Mean preference embedding of each cluster, written by the clustering run."""
+
+    __tablename__ = "cluster_centroids"
+
+    cluster_id = Column(
+        Integer,
+        ForeignKey("clusters.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    centroid = Column(Float32Vector, nullable=False)
+    member_count = Column(Integer, nullable=False, default=0)
+    # Identifies the clustering run that produced the centroid
+    version = Column(String(50), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
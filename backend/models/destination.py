@@ -1,14 +1,15 @@
-import json
 from enum import Enum
 
+import numpy as np
+
 from sqlalchemy import (
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
     String,
-    Text,
 )
 from sqlalchemy import (
     Enum as SQLEnum,
@@ -17,6 +18,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from database.db import Base
+from utils.embedded.vector_codec import Float32Vector
 
 
 class GreenVerifiedStatus(str, Enum):
@@ -34,6 +36,11 @@ class Destination(Base):
         SQLEnum(GreenVerifiedStatus),
         default=GreenVerifiedStatus.Not_Green_Verified,
     )
+    green_score = Column(Float, nullable=True)
+    green_verified_at = Column(DateTime(timezone=True), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    coordinates_updated_at = Column(DateTime(timezone=True), nullable=True)
 
     reviews = relationship(
         "Review", back_populates="destination", cascade="all, delete-orphan"
@@ -74,7 +81,7 @@ class DestinationEmbedding(Base):
         ForeignKey("destinations.place_id", ondelete="CASCADE"),
         primary_key=True,
     )
-    embedding_vector = Column(Text, nullable=False)
+    embedding_vector = Column(Float32Vector, nullable=False)
     model_version = Column(String(50), default="v1", nullable=False)
     updated_at = Column(
         DateTime(timezone=True),
@@ -85,10 +92,13 @@ class DestinationEmbedding(Base):
     destination = relationship("Destination", back_populates="embedding", uselist=False)
 
     def set_vector(self, vector: list[float]):
-        self.embedding_vector = json.dumps(vector)
+        self.embedding_vector = np.asarray(vector, dtype=np.float32)
 
     def get_vector(self) -> list[float]:
-        return json.loads(self.embedding_vector)
+        return self.get_array().tolist()
+
+    def get_array(self) -> np.ndarray:
+        return np.asarray(self.embedding_vector, dtype=np.float32)
 
 
 class UserSavedDestination(Base):
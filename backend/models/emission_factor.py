@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Float, Index, String
+from sqlalchemy.sql import func
+
+from database.db import Base
+
+
+class EmissionFactor(Base):
+    __tablename__ = "emission_factors"
+    __table_args__ = (Index("ix_emission_factor_created", "created_at"),)
+
+    mode = Column(String(20), primary_key=True)
+    version = Column(String(50), primary_key=True)
+    kg_co2e_per_km = Column(Float, nullable=False)
+    source = Column(String(50), nullable=False, default="default")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,55 @@
+from sqlalchemy import Column, DateTime, Enum as SQLEnum, Float, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+
+from database.db import Base
+from models.destination import GreenVerifiedStatus
+
+# Job statuses a place can have at most one of at a time
+ACTIVE_JOB_STATUSES = ("queued", "running")
+ACTIVE_JOB_PREDICATE = text("status IN ('queued', 'running')")
+
+
+class GreenImageResult(Base):
+    """Model output for one photo, keyed by the hash of its decoded pixels."""
+
+    __tablename__ = "green_image_results"
+
+    content_hash = Column(String(64), primary_key=True)
+    model_version = Column(String(64), primary_key=True)
+    green_score = Column(Float, nullable=False)
+    mask_coverage = Column(Float, nullable=False)
+    cup_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class GreenVerificationJob(Base):
+    """
+    A place verification job. Stored in the database so every API worker
+    can report it and submissions for the same place coalesce on one job.
+    """
+
+    __tablename__ = "green_verification_jobs"
+
+    id = Column(String(32), primary_key=True)
+    place_id = Column(String(255), nullable=False)
+    # queued, running, succeeded or failed (GreenVerificationJobStatus)
+    status = Column(String(20), nullable=False, default="queued")
+    green_score = Column(Float, nullable=True)
+    verified_status = Column(SQLEnum(GreenVerifiedStatus), nullable=True)
+    images_processed = Column(Integer, nullable=False, default=0)
+    error = Column(String(200), nullable=True)
+    # Users notified over their sockets when the job finishes
+    subscriber_ids = Column(ARRAY(Integer), nullable=False, default=list)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ux_green_job_active_place",
+            "place_id",
+            unique=True,
+            postgresql_where=ACTIVE_JOB_PREDICATE,
+        ),
+        Index("ix_green_job_finished_at", "finished_at"),
+    )
@@ -3,6 +3,7 @@ from enum import Enum
 from sqlalchemy import (
     JSON,
     Column,
+    Computed,
     DateTime,
     ForeignKey,
     Index,
@@ -13,12 +14,19 @@ from sqlalchemy import (
 from sqlalchemy import (
     Enum as SQLEnum,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 from database.db import Base
 
 
+# immutable_unaccent() is created by database.init_database before the tables
+MESSAGE_SEARCH_VECTOR_SQL = (
+    "to_tsvector('simple', immutable_unaccent(coalesce(content, '')))"
+)
+
+
 class MessageType(str, Enum):
     text = "text"
     file = "file"
@@ -34,9 +42,11 @@ class MessageStatus(str, Enum):
 class Message(Base):
     __tablename__ = "messages"
     __table_args__ = (
-        Index("ix_message_room_created", "room_id", "created_at"),
+        # Keyset pagination of a room's history on (created_at, id)
+        Index("ix_message_room_created_id", "room_id", "created_at", "id"),
         Index("ix_message_sender_created", "sender_id", "created_at"),
         Index("ix_message_room_status", "room_id", "status"),
+        Index("ix_message_search_vector", "search_vector", postgresql_using="gin"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -49,6 +59,10 @@ class Message(Base):
     content = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(SQLEnum(MessageStatus), default=MessageStatus.sent)
+    # Accent-free words of the content, kept up to date by Postgres
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(MESSAGE_SEARCH_VECTOR_SQL, persisted=True))
+    )
 
     sender = relationship(
         "User", foreign_keys=[sender_id], back_populates="sent_messages"
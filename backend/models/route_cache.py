@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Index, String, Text
+from sqlalchemy.sql import func
+
+from database.db import Base
+
+
+class RouteCacheEntry(Base):
+    __tablename__ = "route_cache"
+    __table_args__ = (Index("ix_route_cache_expires", "expires_at"),)
+
+    cache_key = Column(String(255), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
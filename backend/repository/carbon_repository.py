@@ -0,0 +1,73 @@
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.emission_factor import EmissionFactor
+
+
+class CarbonRepository:
+    @staticmethod
+    async def get_latest_factors(
+        db: AsyncSession,
+    ) -> Optional[Tuple[str, Dict[str, float]]]:
+        """
+        Get the most recently stored emission factor version.
+
+        Returns:
+            (version, {mode: kg_co2e_per_km}) or None if no factors are stored
+        """
+        try:
+            latest = await db.execute(
+                select(EmissionFactor.version)
+                .order_by(EmissionFactor.created_at.desc())
+                .limit(1)
+            )
+            version = latest.scalar_one_or_none()
+            if version is None:
+                return None
+
+            result = await db.execute(
+                select(EmissionFactor.mode, EmissionFactor.kg_co2e_per_km).where(
+                    EmissionFactor.version == version
+                )
+            )
+            return version, {mode: factor for mode, factor in result.all()}
+        except SQLAlchemyError as e:
+            print(f"ERROR: Failed to load emission factors - {e}")
+            return None
+
+    @staticmethod
+    async def save_factors(
+        db: AsyncSession, version: str, factors: Dict[str, float], source: str
+    ) -> bool:
+        if not factors:
+            return True
+        try:
+            stmt = insert(EmissionFactor).values(
+                [
+                    {
+                        "mode": mode,
+                        "version": version,
+                        "kg_co2e_per_km": factor,
+                        "source": source,
+                    }
+                    for mode, factor in factors.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[EmissionFactor.mode, EmissionFactor.version],
+                set_={
+                    "kg_co2e_per_km": stmt.excluded.kg_co2e_per_km,
+                    "source": stmt.excluded.source,
+                },
+            )
+            await db.execute(stmt)
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to save emission factors version {version} - {e}")
+            return False
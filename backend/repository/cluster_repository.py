@@ -1,18 +1,24 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from sqlalchemy import and_, delete, func, or_, select, update
+import numpy as np
+
+from sqlalchemy import and_, bindparam, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from models.cluster import (
     Cluster,
+    ClusterCentroid,
     ClusterDestination,
+    ClusterRecommendation,
     Preference,
     UserClusterAssociation,
 )
-from models.user import User
+from models.user import User, UserActivity
 from schemas.cluster_schema import ClusterCreate, ClusterUpdate, PreferenceUpdate
+from schemas.recommendation_schema import RecommendationScore
 
 
 class ClusterRepository:
@@ -423,6 +429,19 @@ class ClusterRepository:
             print(f"ERROR: updating embedding for user {user_id} - {e}")
             return False
 
+    @staticmethod
+    async def get_embeddings_by_user_ids(db: AsyncSession, user_ids: List[int]):
+        """Return (user_id, embedding) rows for users that have an embedding."""
+        try:
+            query = select(Preference.user_id, Preference.embedding).where(
+                Preference.user_id.in_(user_ids), Preference.embedding.isnot(None)
+            )
+            result = await db.execute(query)
+            return result.all()
+        except SQLAlchemyError as e:
+            print(f"ERROR: fetching embeddings for users - {e}")
+            return []
+
     @staticmethod
     async def get_preference_by_user_id(db: AsyncSession, user_id: int):
         try:
@@ -539,3 +558,301 @@ class ClusterRepository:
         except SQLAlchemyError as e:
             print(f"ERROR: fetching latest cluster for user {user_id} - {e}")
             return None
+
+    @staticmethod
+    async def replace_cluster_recommendations(
+        db: AsyncSession,
+        recommendations: Dict[int, List[RecommendationScore]],
+        chunk_size: int = 1000,
+    ) -> bool:
+        """
+        Swap the stored recommendations of each given cluster in one
+        transaction. Rows are inserted in chunks to stay under the bind
+        parameter limit of a single statement.
+        """
+        if not recommendations:
+            return True
+        try:
+            await db.execute(
+                delete(ClusterRecommendation).where(
+                    ClusterRecommendation.cluster_id.in_(list(recommendations))
+                )
+            )
+            rows = [
+                {
+                    "cluster_id": cluster_id,
+                    "destination_id": item.destination_id,
+                    "rank": rank,
+                    "hybrid_score": item.hybrid_score,
+                    "similarity_score": item.similarity_score,
+                    "popularity_score": item.popularity_score,
+                }
+                for cluster_id, items in recommendations.items()
+                for rank, item in enumerate(items)
+            ]
+            for start in range(0, len(rows), chunk_size):
+                await db.execute(
+                    insert(ClusterRecommendation).values(rows[start : start + chunk_size])
+                )
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: storing cluster recommendations - {e}")
+            return False
+
+    @staticmethod
+    async def get_cluster_recommendations(
+        db: AsyncSession, cluster_id: int, limit: int = 20
+    ):
+        try:
+            query = (
+                select(ClusterRecommendation)
+                .where(ClusterRecommendation.cluster_id == cluster_id)
+                .order_by(ClusterRecommendation.rank)
+                .limit(limit)
+            )
+            result = await db.execute(query)
+            return result.scalars().all()
+        except SQLAlchemyError as e:
+            print(f"ERROR: fetching recommendations for cluster {cluster_id} - {e}")
+            return []
+
+    @staticmethod
+    async def get_cluster_centroid(db: AsyncSession, cluster_id: int):
+        try:
+            result = await db.execute(
+                select(ClusterCentroid).where(ClusterCentroid.cluster_id == cluster_id)
+            )
+            return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            print(f"ERROR: fetching centroid for cluster {cluster_id} - {e}")
+            return None
+
+    @staticmethod
+    async def get_cluster_centroids(db: AsyncSession):
+        try:
+            result = await db.execute(select(ClusterCentroid))
+            return result.scalars().all()
+        except SQLAlchemyError as e:
+            print(f"ERROR: fetching cluster centroids - {e}")
+            return []
+
+    @staticmethod
+    async def upsert_cluster_centroids(db: AsyncSession, centroids: List[dict]) -> bool:
+        """centroids: dicts with cluster_id, centroid, member_count and version."""
+        if not centroids:
+            return True
+        try:
+            stmt = insert(ClusterCentroid).values(centroids)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ClusterCentroid.cluster_id],
+                set_={
+                    "centroid": stmt.excluded.centroid,
+                    "member_count": stmt.excluded.member_count,
+                    "version": stmt.excluded.version,
+                    "updated_at": func.now(),
+                },
+            )
+            await db.execute(stmt)
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: storing cluster centroids - {e}")
+            return False
+
+    @staticmethod
+    async def add_member_to_centroid(db: AsyncSession, cluster_id: int, embedding: np.ndarray):
+        """
+        Running-mean update of one cluster's centroid in a single transaction.
+        The row is locked with SELECT ... FOR UPDATE so concurrent joins to the
+        same cluster apply one after another instead of overwriting each other.
+        Returns the new (centroid, member_count), or None on failure.
+        """
+        embedding = np.asarray(embedding, dtype=np.float64)
+        # populate_existing so a row already in the session is re-read under the lock
+        locked = (
+            select(ClusterCentroid)
+            .where(ClusterCentroid.cluster_id == cluster_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        try:
+            stored = (await db.execute(locked)).scalar_one_or_none()
+            if stored is None:
+                centroid = embedding.astype(np.float32)
+                inserted = await db.execute(
+                    insert(ClusterCentroid)
+                    .values(
+                        cluster_id=cluster_id,
+                        centroid=centroid,
+                        member_count=1,
+                        version="incremental",
+                    )
+                    .on_conflict_do_nothing(index_elements=[ClusterCentroid.cluster_id])
+                )
+                if inserted.rowcount:
+                    await db.commit()
+                    return centroid, 1
+                # Another join created the row first; wait for its lock
+                stored = (await db.execute(locked)).scalar_one()
+
+            member_count = stored.member_count + 1
+            current = np.asarray(stored.centroid, dtype=np.float64)
+            centroid = (current + (embedding - current) / member_count).astype(np.float32)
+            await db.execute(
+                update(ClusterCentroid)
+                .where(ClusterCentroid.cluster_id == cluster_id)
+                .values(centroid=centroid, member_count=member_count, updated_at=func.now())
+            )
+            await db.commit()
+            return centroid, member_count
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: updating centroid for cluster {cluster_id} - {e}")
+            return None
+
+    @staticmethod
+    async def get_clustering_inputs(db: AsyncSession):
+        """
+        Every preference of an existing user with the user fields used to
+        build its embedding text, in one query.
+        """
+        try:
+            query = select(
+                Preference.id,
+                Preference.user_id,
+                Preference.weather_pref,
+                Preference.budget_range,
+                Preference.attraction_types,
+                Preference.kids_friendly,
+                Preference.embedding,
+                Preference.last_updated,
+                User.eco_point,
+                User.rank,
+            ).join(User, User.id == Preference.user_id)
+            result = await db.execute(query)
+            return result.all()
+        except SQLAlchemyError as e:
+            print(f"ERROR: fetching clustering inputs - {e}")
+            return []
+
+    @staticmethod
+    async def get_activity_counts(
+        db: AsyncSession, user_ids: Optional[List[int]] = None
+    ):
+        """(user_id, destination_id, activity, count) rows, optionally for some users."""
+        try:
+            query = select(
+                UserActivity.user_id,
+                UserActivity.destination_id,
+                UserActivity.activity,
+                func.count(),
+            ).group_by(
+                UserActivity.user_id, UserActivity.destination_id, UserActivity.activity
+            )
+            if user_ids is not None:
+                query = query.where(UserActivity.user_id.in_(user_ids))
+            result = await db.execute(query)
+            return result.all()
+        except SQLAlchemyError as e:
+            print(f"ERROR: fetching activity counts - {e}")
+            return []
+
+    @staticmethod
+    async def bulk_update_preference_embeddings(
+        db: AsyncSession, embeddings: Dict[int, List[float]], chunk_size: int = 1000
+    ) -> int:
+        """Write user_id -> embedding in executemany UPDATE chunks."""
+        table = Preference.__table__
+        stmt = (
+            update(table)
+            .where(table.c.user_id == bindparam("b_user_id"))
+            .values(embedding=bindparam("b_embedding"), last_updated=func.now())
+        )
+        items = list(embeddings.items())
+        try:
+            for start in range(0, len(items), chunk_size):
+                await db.execute(
+                    stmt,
+                    [
+                        {"b_user_id": user_id, "b_embedding": embedding}
+                        for user_id, embedding in items[start : start + chunk_size]
+                    ],
+                )
+                await db.commit()
+            return len(items)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: bulk updating preference embeddings - {e}")
+            return 0
+
+    @staticmethod
+    async def bulk_assign_users_to_clusters(
+        db: AsyncSession, user_cluster_mapping: Dict[int, int], chunk_size: int = 1000
+    ) -> int:
+        """
+        Upsert user-cluster associations (refreshing assigned_at so the new
+        assignment is the latest) and set preferences.cluster_id, in chunks.
+        """
+        table = Preference.__table__
+        preference_stmt = (
+            update(table)
+            .where(table.c.user_id == bindparam("b_user_id"))
+            .values(cluster_id=bindparam("b_cluster_id"))
+        )
+        items = list(user_cluster_mapping.items())
+        try:
+            for start in range(0, len(items), chunk_size):
+                chunk = items[start : start + chunk_size]
+                stmt = insert(UserClusterAssociation).values(
+                    [
+                        {"user_id": user_id, "cluster_id": cluster_id}
+                        for user_id, cluster_id in chunk
+                    ]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[
+                        UserClusterAssociation.user_id,
+                        UserClusterAssociation.cluster_id,
+                    ],
+                    set_={"assigned_at": func.now()},
+                )
+                await db.execute(stmt)
+                await db.execute(
+                    preference_stmt,
+                    [
+                        {"b_user_id": user_id, "b_cluster_id": cluster_id}
+                        for user_id, cluster_id in chunk
+                    ],
+                )
+                await db.commit()
+            return len(items)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: bulk assigning users to clusters - {e}")
+            return 0
+
+    @staticmethod
+    async def upsert_cluster_destinations(
+        db: AsyncSession, rows: List[dict], chunk_size: int = 1000
+    ) -> int:
+        """rows: dicts with cluster_id, destination_id and popularity_score."""
+        try:
+            for start in range(0, len(rows), chunk_size):
+                stmt = insert(ClusterDestination).values(rows[start : start + chunk_size])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[
+                        ClusterDestination.cluster_id,
+                        ClusterDestination.destination_id,
+                    ],
+                    set_={"popularity_score": stmt.excluded.popularity_score},
+                )
+                await db.execute(stmt)
+                await db.commit()
+            return len(rows)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: upserting cluster destinations - {e}")
+            return 0
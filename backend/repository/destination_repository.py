@@ -1,6 +1,8 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy import and_, case, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -330,6 +332,58 @@ class DestinationRepository:
             )
             return []
 
+    @staticmethod
+    def _green_sweep_filter(after_place_id: Optional[str], stale_before: Optional[datetime]):
+        conditions = [Destination.green_verified == GreenVerifiedStatus.Not_Green_Verified]
+        if after_place_id is not None:
+            conditions.append(Destination.place_id > after_place_id)
+        if stale_before is not None:
+            conditions.append(
+                (Destination.green_verified_at.is_(None))
+                | (Destination.green_verified_at < stale_before)
+            )
+        return and_(*conditions)
+
+    @staticmethod
+    async def get_green_sweep_page(
+        db: AsyncSession,
+        after_place_id: Optional[str],
+        limit: int,
+        stale_before: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Next page of Not_Green_Verified place_ids in place_id order (keyset
+        pagination, so a sweep can resume after the last id it finished).
+        """
+        try:
+            result = await db.execute(
+                select(Destination.place_id)
+                .where(DestinationRepository._green_sweep_filter(after_place_id, stale_before))
+                .order_by(Destination.place_id)
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+        except SQLAlchemyError as e:
+            print(f"ERROR: Failed to get green sweep page after {after_place_id} - {e}")
+            return []
+
+    @staticmethod
+    async def count_green_sweep_candidates(
+        db: AsyncSession,
+        after_place_id: Optional[str],
+        stale_before: Optional[datetime] = None,
+    ) -> int:
+        try:
+            result = await db.execute(
+                select(func.count())
+                .select_from(Destination)
+                .where(DestinationRepository._green_sweep_filter(after_place_id, stale_before))
+            )
+            return int(result.scalar_one())
+        except SQLAlchemyError as e:
+            print(f"ERROR: Failed to count green sweep candidates - {e}")
+            return 0
+
     @staticmethod
     async def get_embeddings_by_ids(db: AsyncSession, destination_ids: List[str]):
         """
@@ -352,3 +406,115 @@ class DestinationRepository:
         except SQLAlchemyError as e:
             print(f"ERROR: Failed to get embeddings for destinations - {e}")
             return {}
+
+    @staticmethod
+    async def get_coordinates_by_ids(db: AsyncSession, place_ids: List[str]):
+        """
+        Get persisted coordinates for multiple destinations in one query.
+
+        Returns:
+            List of (place_id, latitude, longitude, coordinates_updated_at) rows
+            for destinations that have coordinates stored
+        """
+        try:
+            result = await db.execute(
+                select(
+                    Destination.place_id,
+                    Destination.latitude,
+                    Destination.longitude,
+                    Destination.coordinates_updated_at,
+                ).where(
+                    Destination.place_id.in_(place_ids),
+                    Destination.latitude.is_not(None),
+                    Destination.longitude.is_not(None),
+                )
+            )
+            return result.all()
+        except SQLAlchemyError as e:
+            print(f"ERROR: Failed to get coordinates for destinations - {e}")
+            return []
+
+    @staticmethod
+    async def upsert_coordinates(
+        db: AsyncSession,
+        coordinates: Dict[str, Tuple[float, float]],
+        fetched_at: Optional[datetime] = None,
+    ) -> bool:
+        """Insert or update coordinates, creating destination rows when missing."""
+        if not coordinates:
+            return True
+        try:
+            fetched_at = fetched_at or datetime.now().astimezone()
+            stmt = insert(Destination).values(
+                [
+                    {
+                        "place_id": place_id,
+                        "latitude": lat,
+                        "longitude": lng,
+                        "coordinates_updated_at": fetched_at,
+                    }
+                    for place_id, (lat, lng) in coordinates.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Destination.place_id],
+                set_={
+                    "latitude": stmt.excluded.latitude,
+                    "longitude": stmt.excluded.longitude,
+                    "coordinates_updated_at": stmt.excluded.coordinates_updated_at,
+                },
+            )
+            await db.execute(stmt)
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to upsert destination coordinates - {e}")
+            return False
+
+    @staticmethod
+    async def upsert_green_verifications(
+        db: AsyncSession,
+        results: Dict[str, Tuple[float, GreenVerifiedStatus]],
+        verified_at: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Store AI green scores and statuses, creating destination rows when
+        missing. A Green_Certified status is never downgraded by an AI result.
+        """
+        if not results:
+            return True
+        try:
+            verified_at = verified_at or datetime.now().astimezone()
+            stmt = insert(Destination).values(
+                [
+                    {
+                        "place_id": place_id,
+                        "green_score": score,
+                        "green_verified": status,
+                        "green_verified_at": verified_at,
+                    }
+                    for place_id, (score, status) in results.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Destination.place_id],
+                set_={
+                    "green_score": stmt.excluded.green_score,
+                    "green_verified_at": stmt.excluded.green_verified_at,
+                    "green_verified": case(
+                        (
+                            Destination.green_verified == GreenVerifiedStatus.Green_Certified,
+                            Destination.green_verified,
+                        ),
+                        else_=stmt.excluded.green_verified,
+                    ),
+                },
+            )
+            await db.execute(stmt)
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to store green verification results - {e}")
+            return False
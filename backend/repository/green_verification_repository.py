@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import any_, case, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.green_verification import (
+    ACTIVE_JOB_PREDICATE,
+    ACTIVE_JOB_STATUSES,
+    GreenImageResult,
+    GreenVerificationJob,
+)
+
+
+class GreenVerificationRepository:
+    @staticmethod
+    async def get_image_results(
+        db: AsyncSession, content_hashes: List[str], model_version: str
+    ) -> Dict[str, GreenImageResult]:
+        if not content_hashes:
+            return {}
+        try:
+            result = await db.execute(
+                select(GreenImageResult).where(
+                    GreenImageResult.content_hash.in_(content_hashes),
+                    GreenImageResult.model_version == model_version,
+                )
+            )
+            return {row.content_hash: row for row in result.scalars().all()}
+        except SQLAlchemyError as e:
+            print(f"ERROR: Failed to get cached green image results - {e}")
+            return {}
+
+    @staticmethod
+    async def save_image_results(
+        db: AsyncSession, results: Dict[str, dict], model_version: str
+    ) -> bool:
+        """results: content_hash -> {"green_score", "mask_coverage", "cup_count"}"""
+        if not results:
+            return True
+        try:
+            stmt = insert(GreenImageResult).values(
+                [
+                    {
+                        "content_hash": content_hash,
+                        "model_version": model_version,
+                        "green_score": row["green_score"],
+                        "mask_coverage": row["mask_coverage"],
+                        "cup_count": row["cup_count"],
+                    }
+                    for content_hash, row in results.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[GreenImageResult.content_hash, GreenImageResult.model_version],
+                set_={
+                    "green_score": stmt.excluded.green_score,
+                    "mask_coverage": stmt.excluded.mask_coverage,
+                    "cup_count": stmt.excluded.cup_count,
+                },
+            )
+            await db.execute(stmt)
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to save green image results - {e}")
+            return False
+
+    @staticmethod
+    async def expire_jobs(db: AsyncSession, ttl_seconds: int, timeout_seconds: int) -> bool:
+        """
+        Delete jobs finished more than ttl_seconds ago and fail queued or
+        running jobs older than timeout_seconds, whose worker went away.
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            await db.execute(
+                delete(GreenVerificationJob).where(
+                    GreenVerificationJob.finished_at < now - timedelta(seconds=ttl_seconds)
+                )
+            )
+            await db.execute(
+                update(GreenVerificationJob)
+                .where(
+                    GreenVerificationJob.status.in_(ACTIVE_JOB_STATUSES),
+                    GreenVerificationJob.created_at < now - timedelta(seconds=timeout_seconds),
+                )
+                .values(status="failed", error="timed out", finished_at=func.now())
+            )
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to expire green verification jobs - {e}")
+            return False
+
+    @staticmethod
+    async def create_or_join_job(
+        db: AsyncSession, job_id: str, place_id: str, user_id: int
+    ) -> Tuple[Optional[GreenVerificationJob], bool]:
+        """
+        Queue a job for the place, or add the user to the place's queued or
+        running job. Returns the job and whether it was created; the partial
+        unique index on place_id makes this safe across API workers.
+        """
+        insert_stmt = (
+            insert(GreenVerificationJob)
+            .values(id=job_id, place_id=place_id, status="queued", subscriber_ids=[user_id])
+            .on_conflict_do_nothing(
+                index_elements=[GreenVerificationJob.place_id],
+                index_where=ACTIVE_JOB_PREDICATE,
+            )
+            .returning(GreenVerificationJob)
+        )
+        join_stmt = (
+            update(GreenVerificationJob)
+            .where(
+                GreenVerificationJob.place_id == place_id,
+                GreenVerificationJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+            .values(
+                subscriber_ids=case(
+                    (
+                        literal(user_id) == any_(GreenVerificationJob.subscriber_ids),
+                        GreenVerificationJob.subscriber_ids,
+                    ),
+                    else_=func.array_append(GreenVerificationJob.subscriber_ids, user_id),
+                )
+            )
+            .returning(GreenVerificationJob)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            # The active job can finish between the two statements; retry then
+            for _ in range(3):
+                created = (await db.execute(insert_stmt)).scalar_one_or_none()
+                if created is not None:
+                    await db.commit()
+                    return created, True
+                joined = (await db.execute(join_stmt)).scalar_one_or_none()
+                if joined is not None:
+                    await db.commit()
+                    return joined, False
+            await db.rollback()
+            return None, False
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to queue green verification for {place_id} - {e}")
+            return None, False
+
+    @staticmethod
+    async def create_job(db: AsyncSession, **values) -> Optional[GreenVerificationJob]:
+        try:
+            job = GreenVerificationJob(**values)
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+            return job
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to create green verification job - {e}")
+            return None
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: str) -> Optional[GreenVerificationJob]:
+        try:
+            result = await db.execute(
+                select(GreenVerificationJob)
+                .where(GreenVerificationJob.id == job_id)
+                .execution_options(populate_existing=True)
+            )
+            return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            print(f"ERROR: Failed to get green verification job {job_id} - {e}")
+            return None
+
+    @staticmethod
+    async def update_job(
+        db: AsyncSession, job_id: str, **values
+    ) -> Optional[GreenVerificationJob]:
+        try:
+            result = await db.execute(
+                update(GreenVerificationJob)
+                .where(GreenVerificationJob.id == job_id)
+                .values(**values)
+                .returning(GreenVerificationJob)
+                .execution_options(populate_existing=True)
+            )
+            job = result.scalar_one_or_none()
+            await db.commit()
+            return job
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to update green verification job {job_id} - {e}")
+            return None
@@ -1,6 +1,8 @@
-from typing import Optional
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy import and_, delete, func, literal, or_, select, tuple_, union, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -11,9 +13,12 @@ from models.message import (
     MessageType,
     RoomContext,
 )
+from models.room import RoomDirect, RoomMember
 from schemas.message_schema import (
+    MessageHistoryItem,
     RoomContextCreate,
 )
+from utils.chat_context_cache import chat_context_cache
 
 
 class MessageRepository:
@@ -31,19 +36,51 @@ class MessageRepository:
             return None
 
     @staticmethod
-    async def get_messages_by_room(db: AsyncSession, room_id: int):
+    async def get_messages_by_room(
+        db: AsyncSession,
+        room_id: int,
+        limit: Optional[int] = None,
+        before_id: Optional[int] = None,
+    ) -> List[Message]:
+        """
+        Up to `limit` messages of a room (all of them when limit is None),
+        newest first. With before_id, only messages older than that message.
+        Keyset pagination on (created_at, id), served by
+        ix_message_room_created_id.
+        """
         try:
-            result = await db.execute(
-                select(Message)
-                .options(selectinload(Message.file_metadata))
-                .where((Message.room_id == room_id))
-                .order_by(Message.created_at.desc())
-            )
-            return result.scalars().all()
+            query = select(Message).where(Message.room_id == room_id)
+            if before_id is not None:
+                cursor = await db.execute(
+                    select(Message.created_at).where(
+                        (Message.id == before_id) & (Message.room_id == room_id)
+                    )
+                )
+                before_created_at: Optional[datetime] = cursor.scalar_one_or_none()
+                if before_created_at is None:
+                    return []
+                query = query.where(
+                    tuple_(Message.created_at, Message.id)
+                    < tuple_(literal(before_created_at, Message.created_at.type), before_id)
+                )
+            query = query.order_by(Message.created_at.desc(), Message.id.desc())
+            if limit is not None:
+                query = query.limit(limit)
+            result = await db.execute(query)
+            return list(result.scalars().all())
         except SQLAlchemyError as e:
             print(f"ERROR: fetching messages for room ID {room_id} - {e}")
             return []
 
+    @staticmethod
+    async def get_recent_messages(
+        db: AsyncSession, room_id: int, limit: int
+    ) -> List[Message]:
+        """The last `limit` messages of a room in chronological order."""
+        messages = await MessageRepository.get_messages_by_room(db, room_id, limit)
+        messages.reverse()
+        return messages
+
     @staticmethod
     async def get_file_messages_by_room(db: AsyncSession, room_id: int):
         try:
@@ -61,23 +98,73 @@ class MessageRepository:
             return []
 
     @staticmethod
-    async def search_messages_by_keyword(db: AsyncSession, room_id: int, keyword: str):
+    def build_search_query(keyword: str) -> Optional[str]:
+        """
+        tsquery text matching every word of the keyword as a prefix, or None
+        when the keyword has no words. Accents are stripped in SQL.
+        """
+        words = re.findall(r"\w+", keyword.lower())
+        if not words:
+            return None
+        return " & ".join(f"{word}:*" for word in words)
+
+    @staticmethod
+    async def search_messages(
+        db: AsyncSession,
+        keyword: str,
+        limit: int,
+        offset: int = 0,
+        room_id: Optional[int] = None,
+        member_id: Optional[int] = None,
+    ) -> List[Tuple[Message, float]]:
+        """
+        Text messages matching every word of the keyword, best match first.
+        Matching ignores case and Vietnamese diacritics and uses the GIN
+        index on messages.search_vector. Restricted to one room with room_id
+        and to the rooms the user belongs to with member_id.
+        """
+        search_query = MessageRepository.build_search_query(keyword)
+        if search_query is None:
+            return []
         try:
-            result = await db.execute(
-                select(Message)
-                .where(
-                    (Message.content.ilike(f"%{keyword}%"))
-                    & (Message.room_id == room_id)
+            ts_query = func.to_tsquery(
+                "simple", func.immutable_unaccent(search_query)
+            )
+            rank = func.ts_rank_cd(Message.search_vector, ts_query).label("rank")
+            query = select(Message, rank).where(
+                Message.search_vector.op("@@")(ts_query),
+                Message.message_type == MessageType.text,
+            )
+            if room_id is not None:
+                query = query.where(Message.room_id == room_id)
+            if member_id is not None:
+                member_rooms = union(
+                    select(RoomMember.room_id).where(RoomMember.user_id == member_id),
+                    select(RoomDirect.room_id).where(
+                        or_(RoomDirect.user1_id == member_id, RoomDirect.user2_id == member_id)
+                    ),
                 )
-                .order_by(Message.created_at.desc())
+                query = query.where(Message.room_id.in_(select(member_rooms.subquery())))
+
+            result = await db.execute(
+                query.order_by(rank.desc(), Message.created_at.desc(), Message.id.desc())
+                .limit(limit)
+                .offset(offset)
             )
-            return result.scalars().all()
+            return [(message, float(score)) for message, score in result.all()]
         except SQLAlchemyError as e:
-            print(
-                f"ERROR: searching messages for room ID {room_id} with keyword '{keyword}' - {e}"
-            )
+            print(f"ERROR: searching messages with keyword '{keyword}' - {e}")
             return []
 
+    @staticmethod
+    def history_item(message: Message) -> MessageHistoryItem:
+        """A message as chatbot context history; the chatbot sends as user 0."""
+        return MessageHistoryItem(
+            role="assistant" if message.sender_id == 0 else "user",
+            content=message.content or "",
+            timestamp=message.created_at,
+        )
+
     @staticmethod
     async def create_text_message(
         db: AsyncSession, sender_id: int, room_id: int, message_text: str
@@ -94,6 +181,9 @@ class MessageRepository:
             db.add(new_message)
             await db.commit()
             await db.refresh(new_message)
+            chat_context_cache.append_message(
+                room_id, MessageRepository.history_item(new_message)
+            )
             return new_message
         except SQLAlchemyError as e:
             await db.rollback()
@@ -116,6 +206,9 @@ class MessageRepository:
             db.add(new_message)
             await db.commit()
             await db.refresh(new_message)
+            chat_context_cache.append_message(
+                room_id, MessageRepository.history_item(new_message)
+            )
             return new_message
         except SQLAlchemyError as e:
             await db.rollback()
@@ -166,6 +259,7 @@ class MessageRepository:
             message = result.scalar_one_or_none()
             if message:
                 await db.refresh(message)
+                chat_context_cache.invalidate_room(message.room_id)
             return message
         except SQLAlchemyError as e:
             await db.rollback()
@@ -175,14 +269,22 @@ class MessageRepository:
     @staticmethod
     async def delete_message(db: AsyncSession, message_id: int):
         try:
-            stmt = delete(Message).where(
-                and_(
-                    Message.id == message_id,
+            stmt = (
+                delete(Message)
+                .where(
+                    and_(
+                        Message.id == message_id,
+                    )
                 )
+                .returning(Message.room_id)
             )
             result = await db.execute(stmt)
+            room_id = result.scalar_one_or_none()
             await db.commit()
-            return result.rowcount > 0
+            if room_id is None:
+                return False
+            chat_context_cache.invalidate_room(room_id)
+            return True
         except SQLAlchemyError as e:
             await db.rollback()
             print(f"ERROR: deleting message ID {message_id} - {e}")
@@ -215,6 +317,7 @@ class MessageRepository:
 
             await db.commit()
             await db.refresh(context)
+            chat_context_cache.invalidate_room(context_data.room_id)
             return context
         except SQLAlchemyError as e:
             await db.rollback()
@@ -268,6 +371,7 @@ class MessageRepository:
             )
             result = await db.execute(stmt)
             await db.commit()
+            chat_context_cache.invalidate_room(room_id)
             return result.rowcount > 0
         except SQLAlchemyError as e:
             await db.rollback()
@@ -280,6 +384,7 @@ class MessageRepository:
             stmt = delete(RoomContext).where(RoomContext.room_id == room_id)
             await db.execute(stmt)
             await db.commit()
+            chat_context_cache.invalidate_room(room_id)
             return True
         except SQLAlchemyError as e:
             await db.rollback()
@@ -314,6 +419,9 @@ class MessageRepository:
             db.add(new_message)
             await db.commit()
             await db.refresh(new_message)
+            chat_context_cache.append_message(
+                room_id, MessageRepository.history_item(new_message)
+            )
 
             # Lưu trạng thái pending vào RoomContext
             context_key = f"invitation_{new_message.id}"
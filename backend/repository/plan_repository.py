@@ -1,7 +1,10 @@
+from typing import List, Optional
+
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from models.plan import (
     Plan,
@@ -19,6 +22,7 @@ from schemas.plan_schema import (
 )
 from schemas.route_schema import RouteCreate, TransportMode
 from models.destination import Destination
+from utils.chat_context_cache import chat_context_cache
 
 
 
@@ -86,6 +90,41 @@ class PlanRepository:
             print(f"ERROR: retrieving plan ID {plan_id} - {e}")
             return None
 
+    @staticmethod
+    async def get_member_plan_with_destinations(
+        db: AsyncSession, user_id: int, plan_id: Optional[int] = None
+    ) -> Optional[Plan]:
+        """
+        A plan the user belongs to with its destinations, in one query.
+        With plan_id that plan, otherwise the user's earliest plan.
+        """
+        try:
+            query = (
+                select(Plan)
+                .join(PlanMember)
+                .where(PlanMember.user_id == user_id)
+                .options(joinedload(Plan.destinations))
+                .order_by(Plan.id)
+                .limit(1)
+            )
+            if plan_id is not None:
+                query = query.where(Plan.id == plan_id)
+            result = await db.execute(query)
+            return result.unique().scalar_one_or_none()
+        except SQLAlchemyError as e:
+            print(f"ERROR: retrieving plan with destinations for user ID {user_id} - {e}")
+            return None
+
+    @staticmethod
+    async def get_plan_summary(db: AsyncSession, plan_id: int) -> Optional[Plan]:
+        """The plan row alone, without members or destinations."""
+        try:
+            result = await db.execute(select(Plan).where(Plan.id == plan_id))
+            return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            print(f"ERROR: retrieving plan ID {plan_id} - {e}")
+            return None
+
     @staticmethod
     async def create_plan(db: AsyncSession, plan_data: PlanCreate):
         try:
@@ -125,6 +164,7 @@ class PlanRepository:
             db.add(plan)
             await db.commit()
             await db.refresh(plan)
+            chat_context_cache.invalidate_plan(plan_id)
             return plan
         except SQLAlchemyError as e:
             await db.rollback()
@@ -142,6 +182,7 @@ class PlanRepository:
 
             await db.delete(plan)
             await db.commit()
+            chat_context_cache.invalidate_plan(plan_id)
             return True
         except SQLAlchemyError as e:
             await db.rollback()
@@ -178,6 +219,7 @@ class PlanRepository:
             db.add(new_plan_dest)
             await db.commit()
             await db.refresh(new_plan_dest)
+            chat_context_cache.invalidate_plan(plan_id)
             return new_plan_dest
         except SQLAlchemyError as e:
             await db.rollback()
@@ -221,6 +263,7 @@ class PlanRepository:
             db.add(plan_dest)
             await db.commit()
             await db.refresh(plan_dest)
+            chat_context_cache.invalidate_plan(plan_id)
             return plan_dest
         except SQLAlchemyError as e:
             await db.rollback()
@@ -239,6 +282,7 @@ class PlanRepository:
             for dest in plan_destinations:
                 await db.delete(dest)
             await db.commit()
+            chat_context_cache.invalidate_plan(plan_id)
             return True
         except SQLAlchemyError as e:
             await db.rollback()
@@ -254,6 +298,7 @@ class PlanRepository:
             db.add(new_plan_member)
             await db.commit()
             await db.refresh(new_plan_member)
+            chat_context_cache.invalidate_user(data.user_id)
             return new_plan_member
         except SQLAlchemyError as e:
             await db.rollback()
@@ -290,6 +335,7 @@ class PlanRepository:
 
             await db.delete(user_plan)
             await db.commit()
+            chat_context_cache.invalidate_user(member_id)
             return True
         except SQLAlchemyError as e:
             await db.rollback()
@@ -378,6 +424,7 @@ class PlanRepository:
 
             await db.delete(dest)
             await db.commit()
+            chat_context_cache.invalidate_plan(dest.plan_id)
             return True
         except SQLAlchemyError as e:
             await db.rollback()
@@ -433,6 +480,33 @@ class PlanRepository:
             print(f"ERROR: creating route - {e}")
             return None
 
+    @staticmethod
+    async def create_routes(db: AsyncSession, routes_data: List[RouteCreate]) -> bool:
+        """Insert many routes in one statement, skipping pairs that already exist."""
+        if not routes_data:
+            return True
+        try:
+            stmt = insert(Route).values(
+                [
+                    {
+                        "plan_id": route_data.plan_id,
+                        "origin_place_id": route_data.origin_plan_destination_id,
+                        "destination_place_id": route_data.destination_plan_destination_id,
+                        "distance_km": route_data.distance_km,
+                        "carbon_emission_kg": route_data.carbon_emission_kg,
+                        "mode": route_data.mode.value,
+                    }
+                    for route_data in routes_data
+                ]
+            ).on_conflict_do_nothing(constraint="uq_route_plan_origin_dest")
+            await db.execute(stmt)
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: creating routes - {e}")
+            return False
+
     @staticmethod
     async def get_all_routes_by_plan_id(db: AsyncSession, plan_id: int) -> list[Route]:
         try:
@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.route_cache import RouteCacheEntry
+
+
+class RouteCacheRepository:
+    @staticmethod
+    async def get_entry(db: AsyncSession, cache_key: str) -> Optional[RouteCacheEntry]:
+        try:
+            result = await db.execute(
+                select(RouteCacheEntry).where(
+                    RouteCacheEntry.cache_key == cache_key,
+                    RouteCacheEntry.expires_at > datetime.now().astimezone(),
+                )
+            )
+            return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            print(f"ERROR: Failed to get route cache entry {cache_key} - {e}")
+            return None
+
+    @staticmethod
+    async def upsert_entry(
+        db: AsyncSession, cache_key: str, kind: str, payload: str, expires_at: datetime
+    ) -> bool:
+        try:
+            stmt = insert(RouteCacheEntry).values(
+                cache_key=cache_key,
+                kind=kind,
+                payload=payload,
+                expires_at=expires_at,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[RouteCacheEntry.cache_key],
+                set_={
+                    "payload": stmt.excluded.payload,
+                    "expires_at": stmt.excluded.expires_at,
+                },
+            )
+            await db.execute(stmt)
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to save route cache entry {cache_key} - {e}")
+            return False
+
+    @staticmethod
+    async def delete_expired(db: AsyncSession) -> int:
+        try:
+            result = await db.execute(
+                delete(RouteCacheEntry).where(
+                    RouteCacheEntry.expires_at <= datetime.now().astimezone()
+                )
+            )
+            await db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"ERROR: Failed to purge expired route cache entries - {e}")
+            return 0
@@ -21,3 +21,8 @@ async def estimate_transport_emission(
         transport_mode, distance_km, passengers
     )
     return carbon_emission
+
+
+@router.get("/factors", status_code=status.HTTP_200_OK)
+async def get_emission_factors():
+    return CarbonService.get_emission_factor_info()
@@ -1,9 +1,16 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from services.green_verification_service import GreenVerificationService
-from schemas.green_verification_schema import GreenVerificationResponse
+from schemas.green_verification_schema import (
+    GreenVerificationJobResponse,
+    GreenVerificationResponse,
+    GreenVerificationSweepStats,
+)
 from utils.token.authentication_util import get_current_user
+from utils.token.authorizer import require_roles
 from database.db import get_db
 
 router = APIRouter(prefix="/green-verification", tags=["Green Verification"])
@@ -29,3 +36,70 @@ async def verify_place_green(
     """
     user_id = current_user.get("user_id")
     return await GreenVerificationService.verify_place_green_coverage(place_id, user_db, user_id)
+
+
+@router.post(
+    "/jobs",
+    response_model=GreenVerificationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue green verification for a place ID"
+)
+async def submit_green_verification_job(
+    place_id: str = Query(..., description="Place ID to verify"),
+    force: bool = Query(False, description="Ignore a recent cached result for the place"),
+    current_user: dict = Depends(get_current_user),
+    user_db: AsyncSession = Depends(get_db),
+):
+    """
+    Queue a verification and return its job immediately. Poll
+    GET /green-verification/jobs/{job_id} (served by any API worker) or
+    listen for a "green_verification" message on an open room socket.
+    Submitting a place that is already being verified returns the existing
+    job, and a place verified recently returns a finished job with the
+    cached result.
+    """
+    user_id = current_user.get("user_id")
+    return await GreenVerificationService.submit_verification(user_db, place_id, user_id, force)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=GreenVerificationJobResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get the state of a green verification job"
+)
+async def get_green_verification_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    user_db: AsyncSession = Depends(get_db),
+):
+    return await GreenVerificationService.get_verification_job(user_db, job_id)
+
+
+@router.post(
+    "/sweep",
+    response_model=GreenVerificationSweepStats,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start a batch green verification sweep",
+    dependencies=[Depends(require_roles(["Admin"]))],
+)
+async def start_green_verification_sweep(
+    restart: bool = Query(False, description="Ignore the checkpoint and start from the first destination"),
+    max_places: Optional[int] = Query(None, ge=1, description="Stop after this many destinations"),
+):
+    """
+    Verify every Not Green Verified destination not checked recently, in the
+    background. An interrupted sweep resumes from its checkpoint.
+    """
+    return GreenVerificationService.start_sweep(restart, max_places)
+
+
+@router.get(
+    "/sweep",
+    response_model=GreenVerificationSweepStats,
+    status_code=status.HTTP_200_OK,
+    summary="Get progress of the green verification sweep",
+    dependencies=[Depends(require_roles(["Admin"]))],
+)
+async def get_green_verification_sweep():
+    return GreenVerificationService.get_sweep_stats()
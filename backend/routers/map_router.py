@@ -105,3 +105,8 @@ async def search_along_route(
         directions=direction_data,
         search_type=search_type,
     )
+
+
+@router.get("/coordinate-cache/stats", status_code=status.HTTP_200_OK)
+async def get_coordinate_cache_stats():
+    return MapService.get_coordinate_cache_stats()
@@ -20,6 +20,7 @@ from schemas.message_schema import (
     CommonMessageResponse,
     InvitationActionRequest,
     MessageResponse,
+    MessageSearchResponse,
 )
 from services.message_service import MessageService
 from utils.token.authentication_util import get_current_user
@@ -29,17 +30,26 @@ router = APIRouter(prefix="/messages", tags=["Messages"])
 
 @router.get(
     "/search/keyword",
-    response_model=List[MessageResponse],
+    response_model=MessageSearchResponse,
     status_code=status.HTTP_200_OK,
 )
 async def search_messages_by_keyword(
-    room_id: int = Query(..., gt=0),
     keyword: str = Query(..., min_length=1),
+    room_id: Optional[int] = Query(
+        None, gt=0, description="Search one room; omit to search all of the user's rooms"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return await MessageService.get_message_by_keyword(
-        db, current_user["user_id"], room_id, keyword
+    """
+    Messages containing every word of the keyword (as a word prefix), best
+    match first. Case and Vietnamese diacritics are ignored, so "pho" finds
+    "phở".
+    """
+    return await MessageService.search_messages(
+        db, current_user["user_id"], keyword, room_id, limit, offset
     )
 
 
@@ -63,11 +73,17 @@ async def get_message_by_id(
 )
 async def get_messages_in_room(
     room_id: int = Path(..., gt=0),
+    limit: Optional[int] = Query(
+        None, ge=1, le=200, description="Page size; the full history when omitted"
+    ),
+    before: Optional[int] = Query(
+        None, gt=0, description="Return messages older than this message ID"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     return await MessageService.get_messages_by_room(
-        db, current_user["user_id"], room_id
+        db, current_user["user_id"], room_id, limit, before
     )
 
 
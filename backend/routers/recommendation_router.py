@@ -3,7 +3,11 @@ from typing import Any, Dict, List
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.db import get_db
-from schemas.recommendation_schema import SimpleRecommendation, RecommendationDestination
+from schemas.recommendation_schema import (
+    RecommendationDestination,
+    RecommendationResponse,
+    SimpleRecommendation,
+)
 from schemas.map_schema import TextSearchResponse
 from services.recommendation_service import RecommendationService
 from utils.token.authentication_util import get_current_user
@@ -25,6 +29,22 @@ async def get_recommendations_for_current_user(
     )
 
 
+@router.get(
+    "/user/me/cluster-hybrid",
+    response_model=RecommendationResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get hybrid recommendations precomputed for the user's cluster",
+)
+async def get_cluster_hybrid_recommendations_for_current_user(
+    k: int = Query(default=20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return await RecommendationService.recommend_cluster_hybrid_for_user(
+        db, current_user["user_id"], k=k
+    )
+
+
 @router.post(
     "/user/me/sort-by-cluster",
     response_model=List[Dict[str, Any]],
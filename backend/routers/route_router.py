@@ -14,3 +14,8 @@ router = APIRouter(prefix="/routes", tags=["Routes"])
 )
 async def find_optimal_routes(request: FindRoutesRequest):
     return await RouteService.find_three_optimal_routes(request)
+
+
+@router.get("/cache/stats", status_code=status.HTTP_200_OK)
+async def get_route_cache_stats():
+    return RouteService.get_route_cache_stats()
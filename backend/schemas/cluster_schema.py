@@ -113,6 +113,8 @@ class ClusteringStats(BaseModel):
     users_clustered: int
     associations_created: int
     clusters_updated: int
+    # Wall-clock milliseconds per pipeline phase
+    phase_timings_ms: Dict[str, float] = Field(default_factory=dict)
 
 
 class ClusteringResultResponse(BaseModel):
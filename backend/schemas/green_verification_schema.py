@@ -1,5 +1,50 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
 from pydantic import BaseModel
 from .destination_schema import GreenVerifiedStatus
 class GreenVerificationResponse(BaseModel):
     green_score: float
     status: GreenVerifiedStatus
+
+
+class GreenVerificationJobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class GreenVerificationJobResponse(BaseModel):
+    job_id: str
+    place_id: str
+    status: GreenVerificationJobStatus
+    green_score: Optional[float] = None
+    verified_status: Optional[GreenVerifiedStatus] = None
+    images_processed: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class GreenVerificationSweepStats(BaseModel):
+    """Progress of a catalogue sweep; also the checkpoint it resumes from."""
+
+    running: bool = False
+    last_place_id: Optional[str] = None
+    # Destinations verified after this cutoff are skipped
+    stale_before: Optional[datetime] = None
+    places_total: int = 0
+    places_processed: int = 0
+    places_verified: int = 0
+    places_failed: int = 0
+    images_processed: int = 0
+    images_scored: int = 0
+    elapsed_seconds: float = 0.0
+    images_per_second: float = 0.0
+    places_per_second: float = 0.0
+    eta_seconds: Optional[float] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
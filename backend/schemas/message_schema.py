@@ -50,6 +50,17 @@ class MessageResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MessageSearchItem(MessageResponse):
+    rank: float
+
+
+class MessageSearchResponse(BaseModel):
+    items: List[MessageSearchItem]
+    limit: int
+    offset: int
+    next_offset: Optional[int] = None  # None on the last page
+
+
 class RoomContextCreate(BaseModel):
     room_id: int = Field(..., gt=0)
     key: str = Field(..., min_length=1, max_length=128)
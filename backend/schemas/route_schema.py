@@ -81,11 +81,27 @@ class FindRoutesRequest(BaseModel):
     language: str = "vi"
 
 
+class RouteModeTiming(BaseModel):
+    status: str  # "ok", "cached", "timeout" or "error"
+    latency_ms: float
+    routes: int = 0
+    error: Optional[str] = None
+
+
+class FindRoutesDebug(BaseModel):
+    cache_hit: bool = False
+    mode_timings: Dict[str, RouteModeTiming] = Field(default_factory=dict)
+    processing_ms: float = 0.0
+    recommendation_ms: float = 0.0
+    total_ms: float = 0.0
+
+
 class FindRoutesResponse(BaseModel):
     origin: Location
     destination: Location
     routes: Dict[RouteType, RouteData]
     recommendation: str
+    debug: Optional[FindRoutesDebug] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,31 @@
+"""
+Run the batch green verification sweep outside the API.
+
+    cd backend
+    python -m scripts.green_verification_sweep [--restart] [--max-places N]
+
+Progress is checkpointed after every page, so stopping the script and
+running it again continues after the last finished destination.
+"""
+import argparse
+import asyncio
+
+from services.green_verification_service import green_verification_sweep
+from utils.green_verification.worker import green_verification_pool
+
+
+async def main(restart: bool, max_places):
+    try:
+        await asyncio.to_thread(green_verification_pool.warm_up)
+        await green_verification_sweep.run(restart=restart, max_places=max_places)
+    finally:
+        green_verification_pool.shutdown()
+
+
+if __name__ == "__main__":
+    # The worker pool uses spawn, which re-imports this module in each worker
+    parser = argparse.ArgumentParser(description="Green verification sweep")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint")
+    parser.add_argument("--max-places", type=int, default=None, help="Stop after N destinations")
+    args = parser.parse_args()
+    asyncio.run(main(args.restart, args.max_places))
@@ -1,7 +1,18 @@
+from datetime import datetime
+from typing import List, Sequence, Union
+
 from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from integration.carbon_api import create_carbonAPI_client
+from repository.carbon_repository import CarbonRepository
 from schemas.route_schema import TransportMode
+from utils.carbon.emission_factors import (
+    CLIMATIQ_REFRESHABLE_MODES,
+    EmissionFactorTable,
+    get_emission_factors,
+    set_emission_factors,
+)
 
 
 class CarbonService:
@@ -11,22 +22,89 @@ class CarbonService:
         distance_km: float,
         passengers: int = 1,
     ) -> float:
+        try:
+            return get_emission_factors().estimate(mode, distance_km, passengers)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error estimating transport emission: {e}",
+            )
+
+    @staticmethod
+    def estimate_many(
+        modes: Sequence[TransportMode],
+        distances_km: Sequence[float],
+        passengers: Union[int, Sequence[int]] = 1,
+    ) -> List[float]:
+        """Estimate kg CO2e for a batch of routes in one vectorised pass."""
+        try:
+            return get_emission_factors().estimate_many(
+                modes, distances_km, passengers
+            ).tolist()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error estimating transport emissions: {e}",
+            )
+
+    @staticmethod
+    async def load_emission_factors(db: AsyncSession) -> EmissionFactorTable:
+        """Load the latest stored factor version, keeping defaults if none exist."""
+        stored = await CarbonRepository.get_latest_factors(db)
+        if stored:
+            version, factors = stored
+            table = EmissionFactorTable(
+                version,
+                {
+                    TransportMode(mode): factor
+                    for mode, factor in factors.items()
+                    if mode in TransportMode._value2member_map_
+                },
+            )
+            set_emission_factors(table)
+        return get_emission_factors()
+
+    @staticmethod
+    async def refresh_emission_factors(db: AsyncSession) -> EmissionFactorTable:
+        """
+        Pull per-km factors from Climatiq and store them as a new version.
+        Modes Climatiq does not cover keep their current factor.
+        """
         carbonAPI = None
         try:
             carbonAPI = await create_carbonAPI_client()
-            estimation = await carbonAPI.estimate_transport(
-                mode=mode,
-                distance_km=distance_km,
-                passengers=passengers,
+            current = get_emission_factors()
+            factors = dict(current.factors)
+            for mode in CLIMATIQ_REFRESHABLE_MODES:
+                factors[mode] = await carbonAPI.estimate_transport(
+                    mode=mode, distance_km=1.0, passengers=1
+                )
+
+            version = f"climatiq-{datetime.now().strftime('%Y%m%d%H%M')}"
+            saved = await CarbonRepository.save_factors(
+                db,
+                version,
+                {mode.value: factor for mode, factor in factors.items()},
+                source="climatiq",
             )
-            return estimation
+            if not saved:
+                raise ValueError("Failed to persist refreshed emission factors")
+
+            table = EmissionFactorTable(version, factors)
+            set_emission_factors(table)
+            return table
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error estimating transport emission: {e}",
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Error refreshing emission factors: {e}",
             )
         finally:
             if carbonAPI:
                 await carbonAPI.close()
+
+    @staticmethod
+    def get_emission_factor_info() -> dict:
+        table = get_emission_factors()
+        return {"version": table.version, "factors": table.as_dict()}
@@ -1,6 +1,7 @@
+import asyncio
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
-import hdbscan
 import numpy as np
 from fastapi import HTTPException, status
 from sqlalchemy import select
@@ -9,13 +10,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from services.user_service import UserService
 from models.user import Activity, UserActivity
 from repository.cluster_repository import ClusterRepository
-from repository.user_repository import UserRepository
 from schemas.cluster_schema import (
     ClusteringResultResponse,
     ClusteringStats,
 )
 from schemas.cluster_schema import PreferenceUpdate
-from utils.embedded.embedding_utils import encode_text
+from utils.embedded.centroid_cache import centroid_cache
+from utils.config import settings
+from utils.embedded.embedding_service import embedding_service
 
 EMBEDDING_UPDATE_INTERVAL_DAYS = 7
 MIN_CLUSTER_SIZE = 2  # Minimum users per cluster for HDBSCAN
@@ -35,18 +37,11 @@ class ClusterService:
                     detail=f"No users found in cluster {cluster_id}",
                 )
 
-            user_embeddings = []
-            for user_id in user_ids:
-                preference = await ClusterRepository.get_preference_by_user_id(
-                    db, user_id
-                )
-                if preference and preference.embedding:
-                    user_embeddings.append(np.array(preference.embedding))
-
-            if not user_embeddings:
+            rows = await ClusterRepository.get_embeddings_by_user_ids(db, user_ids)
+            if not rows:
                 return None
 
-            cluster_vector = np.mean(user_embeddings, axis=0)
+            cluster_vector = np.mean(np.vstack([row[1] for row in rows]), axis=0)
             return cluster_vector
 
         except HTTPException:
@@ -57,6 +52,148 @@ class ClusterService:
                 detail=f"Error computing cluster embedding: {e}",
             )
 
+    @staticmethod
+    def compute_cluster_centroids(
+        user_embeddings: List[Tuple[int, np.ndarray]], user_cluster_mapping: Dict[int, int]
+    ) -> Dict[int, Tuple[np.ndarray, int]]:
+        """Mean embedding and member count of every cluster in one vectorised pass."""
+        members = [
+            (user_cluster_mapping[user_id], embedding)
+            for user_id, embedding in user_embeddings
+            if user_id in user_cluster_mapping
+        ]
+        if not members:
+            return {}
+
+        cluster_ids, labels = np.unique(
+            np.array([cluster_id for cluster_id, _ in members]), return_inverse=True
+        )
+        matrix = np.vstack([embedding for _, embedding in members]).astype(np.float64)
+
+        sums = np.zeros((len(cluster_ids), matrix.shape[1]), dtype=np.float64)
+        np.add.at(sums, labels, matrix)
+        counts = np.bincount(labels, minlength=len(cluster_ids))
+        centroids = (sums / counts[:, None]).astype(np.float32)
+
+        return {
+            int(cluster_id): (centroids[idx], int(counts[idx]))
+            for idx, cluster_id in enumerate(cluster_ids)
+        }
+
+    @staticmethod
+    async def save_cluster_centroids(
+        db: AsyncSession, centroids: Dict[int, Tuple[np.ndarray, int]], version: str
+    ) -> bool:
+        saved = await ClusterRepository.upsert_cluster_centroids(
+            db,
+            [
+                {
+                    "cluster_id": cluster_id,
+                    "centroid": centroid,
+                    "member_count": member_count,
+                    "version": version,
+                }
+                for cluster_id, (centroid, member_count) in centroids.items()
+            ],
+        )
+        for cluster_id in centroids:
+            centroid_cache.invalidate(cluster_id)
+        return saved
+
+    @staticmethod
+    async def get_cluster_centroid(
+        db: AsyncSession, cluster_id: int
+    ) -> Optional[np.ndarray]:
+        """
+        Cluster centroid from the in-process cache, then the cluster_centroids
+        table. Clusters without a stored centroid are computed once and stored.
+        Returns None when the cluster has no embedded users.
+        """
+        centroid = centroid_cache.get(cluster_id)
+        if centroid is not None:
+            return centroid
+
+        stored = await ClusterRepository.get_cluster_centroid(db, cluster_id)
+        if stored is not None:
+            centroid_cache.put(cluster_id, stored.centroid)
+            return centroid_cache.get(cluster_id)
+
+        try:
+            user_ids = await ClusterRepository.get_users_in_cluster(db, cluster_id)
+            rows = (
+                await ClusterRepository.get_embeddings_by_user_ids(db, user_ids)
+                if user_ids
+                else []
+            )
+        except Exception as e:
+            print(f"ERROR: computing centroid for cluster {cluster_id} - {e}")
+            return None
+
+        if not rows:
+            return None
+
+        centroids = ClusterService.compute_cluster_centroids(
+            [(row[0], row[1]) for row in rows], {row[0]: cluster_id for row in rows}
+        )
+        await ClusterService.save_cluster_centroids(db, centroids, version="on-demand")
+        centroid_cache.put(cluster_id, centroids[cluster_id][0])
+        return centroid_cache.get(cluster_id)
+
+    @staticmethod
+    async def add_member_to_centroid(
+        db: AsyncSession, cluster_id: int, embedding: np.ndarray
+    ) -> bool:
+        """Running-mean update of a stored centroid when one user joins a cluster."""
+        updated = await ClusterRepository.add_member_to_centroid(db, cluster_id, embedding)
+        centroid_cache.invalidate(cluster_id)
+        return updated is not None
+
+    @staticmethod
+    def build_preference_text(
+        weather_pref: Optional[dict],
+        budget_range: Optional[dict],
+        attraction_types: Optional[List[str]],
+        kids_friendly: Optional[bool],
+        activity_counts: Dict[str, int],
+        eco_point: Optional[int],
+        rank,
+    ) -> str:
+        """Describe a user's preferences and behaviour as text for the embedding model."""
+        text_parts = []
+
+        if weather_pref:
+            if "min_temp" in weather_pref and "max_temp" in weather_pref:
+                text_parts.append(
+                    f"prefers temperature between {weather_pref['min_temp']} "
+                    f"and {weather_pref['max_temp']} degrees"
+                )
+
+        if budget_range:
+            if "min" in budget_range and "max" in budget_range:
+                text_parts.append(
+                    f"budget range {budget_range['min']} to {budget_range['max']}"
+                )
+
+        if attraction_types:
+            text_parts.append(f"interested in {', '.join(attraction_types)}")
+
+        if kids_friendly:
+            text_parts.append("prefers kid-friendly destinations")
+
+        for act, count in activity_counts.items():
+            text_parts.append(f"{act} {count} times")
+
+        if eco_point and eco_point > 0:
+            text_parts.append(f"eco-conscious with {eco_point} eco points")
+        if rank:
+            text_parts.append(f"travel experience level {rank.value}")
+
+        if not text_parts:
+            # Default embedding for new users with no data
+            text_parts.append("new traveler interested in exploring destinations")
+
+        return " ".join(text_parts)
+
     @staticmethod
     async def embed_preference(db: AsyncSession, user_id: int) -> Optional[List[float]]: # tạo embedding từ sở thích người dùng
         try:
@@ -64,32 +201,7 @@ class ClusterService:
             if not user:
                 return None
 
-            text_parts = []
-
             preference = await ClusterRepository.get_preference_by_user_id(db, user_id)
-            if preference:
-                if preference.weather_pref:
-                    weather = preference.weather_pref
-                    if "min_temp" in weather and "max_temp" in weather:
-                        text_parts.append(
-                            f"prefers temperature between {weather['min_temp']} "
-                            f"and {weather['max_temp']} degrees"
-                        )
-
-                if preference.budget_range:
-                    budget = preference.budget_range
-                    if "min" in budget and "max" in budget:
-                        text_parts.append(
-                            f"budget range {budget['min']} to {budget['max']}"
-                        )
-
-                if preference.attraction_types:
-                    text_parts.append(
-                        f"interested in {', '.join(preference.attraction_types)}"
-                    )
-
-                if preference.kids_friendly:
-                    text_parts.append("prefers kid-friendly destinations")
 
             activities_result = await db.execute(
                 select(UserActivity).where(UserActivity.user_id == user_id)
@@ -102,21 +214,18 @@ class ClusterService:
                 activity_counts[activity_type] = (
                     activity_counts.get(activity_type, 0) + 1
                 )
-            for act, count in activity_counts.items():
-                text_parts.append(f"{act} {count} times")
-
-            if user.eco_point and user.eco_point > 0:
-                text_parts.append(f"eco-conscious with {user.eco_point} eco points")
-            if user.rank:
-                text_parts.append(f"travel experience level {user.rank.value}")
-
-            if not text_parts:
-                # Default embedding for new users with no data
-                text_parts.append("new traveler interested in exploring destinations")
 
-            user_text = " ".join(text_parts)
+            user_text = ClusterService.build_preference_text(
+                preference.weather_pref if preference else None,
+                preference.budget_range if preference else None,
+                preference.attraction_types if preference else None,
+                preference.kids_friendly if preference else None,
+                activity_counts,
+                user.eco_point,
+                user.rank,
+            )
             print(f"🔤 Generating embedding for user {user_id}: '{user_text[:100]}...'")
-            embedding = encode_text(user_text)
+            embedding = (await embedding_service.encode(user_text)).tolist()
             if embedding:
                 print(f"✅ Generated embedding with {len(embedding)} dimensions for user {user_id}")
             else:
@@ -162,6 +271,44 @@ class ClusterService:
         except Exception:
             return []
 
+    @staticmethod
+    def compute_popularity_rows(
+        user_cluster_mapping: Dict[int, int], activity_counts
+    ) -> List[dict]:
+        """
+        Popularity of each destination within each cluster from
+        (user_id, destination_id, activity, count) rows:
+        saves x3 + reviews x2 + searches x1, scaled by cluster size to 10-100.
+        """
+        weights = {
+            Activity.save_destination: 3,
+            Activity.review_destination: 2,
+            Activity.search_destination: 1,
+        }
+        cluster_sizes: Dict[int, int] = {}
+        for cluster_id in user_cluster_mapping.values():
+            cluster_sizes[cluster_id] = cluster_sizes.get(cluster_id, 0) + 1
+
+        raw_scores: Dict[Tuple[int, str], int] = {}
+        for user_id, dest_id, activity, count in activity_counts:
+            cluster_id = user_cluster_mapping.get(user_id)
+            if cluster_id is None or not dest_id:
+                continue
+            key = (cluster_id, dest_id)
+            raw_scores[key] = raw_scores.get(key, 0) + weights.get(activity, 0) * count
+
+        return [
+            {
+                "cluster_id": cluster_id,
+                "destination_id": dest_id,
+                # Minimum of 10 keeps destinations with a single activity
+                "popularity_score": min(
+                    100.0, max(10.0, (score / cluster_sizes[cluster_id]) * 20)
+                ),
+            }
+            for (cluster_id, dest_id), score in raw_scores.items()
+        ]
+
     @staticmethod
     async def compute_cluster_popularity(        # tính toán điểm phổ biến của cụm
         db: AsyncSession,
@@ -174,63 +321,18 @@ class ClusterService:
                 print(f"⚠️ No users found in cluster {cluster_id}, skipping popularity computation")
                 return
 
-            # Fetch activities for all users in the cluster
-            activities = []
-            for user_id in user_ids:
-                user_activities = await UserRepository.get_user_activities(db, user_id)
-                activities.extend(user_activities)
-
-            print(f"📊 Cluster {cluster_id}: {len(user_ids)} users, {len(activities)} total activities")
-
-            if not activities:
+            activity_counts = await ClusterRepository.get_activity_counts(db, user_ids)
+            if not activity_counts:
                 print(f"⚠️ No activities found for cluster {cluster_id}")
                 return
 
-            destination_scores = {}
-            for activity in activities:
-                dest_id = activity.destination_id
-                if not dest_id:
-                    continue
-
-                if dest_id not in destination_scores:
-                    destination_scores[dest_id] = {"save": 0, "search": 0, "review": 0}
-
-                if activity.activity == Activity.save_destination:
-                    destination_scores[dest_id]["save"] += 1
-                elif activity.activity == Activity.search_destination:
-                    destination_scores[dest_id]["search"] += 1
-                elif activity.activity == Activity.review_destination:
-                    destination_scores[dest_id]["review"] += 1
-
-            print(f"📍 Cluster {cluster_id}: Found {len(destination_scores)} unique destinations from activities")
-
-            destinations_added = 0
-            for dest_id, scores in destination_scores.items():
-                popularity_score = (
-                    scores["save"] * 3 + scores["review"] * 2 + scores["search"] * 1
-                )
-                # Lower threshold and adjust normalization for small datasets
-                # Minimum score of 1 activity = 1 point, normalize to at least get some destinations
-                normalized_score = min(100.0, max(10.0, (popularity_score / len(user_ids)) * 20))
-                
-                # Lower threshold to 10 to include destinations with at least 1 activity
-                if normalized_score >= 10:
-                    if (
-                        await ClusterRepository.get_cluster_destination(
-                            db, cluster_id, dest_id
-                        )
-                        is None
-                    ):
-                        await ClusterRepository.add_destination_to_cluster(
-                            db, cluster_id, dest_id, normalized_score
-                        )
-                        destinations_added += 1
-                    else:
-                        await ClusterRepository.update_destination_popularity(
-                            db, cluster_id, dest_id, normalized_score
-                        )
-
-            print(f"✅ Cluster {cluster_id}: Added/updated {destinations_added} destinations")
+            rows = ClusterService.compute_popularity_rows(
+                {user_id: cluster_id for user_id in user_ids}, activity_counts
+            )
+            await ClusterRepository.upsert_cluster_destinations(
+                db, rows, settings.CLUSTERING_WRITE_CHUNK_SIZE
+            )
+            print(f"✅ Cluster {cluster_id}: Added/updated {len(rows)} destinations")
 
         except HTTPException:
             raise
@@ -269,6 +371,9 @@ class ClusterService:
         # Ensure min_samples doesn't exceed the number of points
         effective_min_samples = min(1, num_points - 1) if num_points > 1 else 1
 
+        # Import here so hdbscan is only loaded by clustering runs
+        import hdbscan
+
         clusterer = hdbscan.HDBSCAN(
             min_cluster_size=effective_min_size,
             min_samples=effective_min_samples,
@@ -308,52 +413,67 @@ class ClusterService:
         return user_cluster_mapping
 
     @staticmethod
-    async def update_user_embeddings(db: AsyncSession) -> int:
-        try:
-            # Use timezone-naive datetime to match the database column type (TIMESTAMP WITHOUT TIME ZONE)
-            cutoff_date = datetime.utcnow() - timedelta(
-                days=EMBEDDING_UPDATE_INTERVAL_DAYS
+    async def refresh_preference_embeddings(
+        db: AsyncSession, inputs, activity_counts
+    ) -> Dict[int, np.ndarray]:
+        """
+        Re-embed every preference that has no embedding or was last embedded
+        more than EMBEDDING_UPDATE_INTERVAL_DAYS ago. Texts are encoded in
+        batches by the embedding service and written back in chunks.
+        Returns the new embeddings by user_id.
+        """
+        # Timezone-naive to match preferences.last_updated (TIMESTAMP WITHOUT TIME ZONE)
+        cutoff_date = datetime.utcnow() - timedelta(days=EMBEDDING_UPDATE_INTERVAL_DAYS)
+
+        per_user_counts: Dict[int, Dict[str, int]] = {}
+        for user_id, _, activity, count in activity_counts:
+            counts = per_user_counts.setdefault(user_id, {})
+            counts[activity.value] = counts.get(activity.value, 0) + count
+
+        stale = [
+            row
+            for row in inputs
+            if row.embedding is None
+            or row.last_updated is None
+            or row.last_updated < cutoff_date
+        ]
+        if not stale:
+            return {}
+
+        texts = [
+            ClusterService.build_preference_text(
+                row.weather_pref,
+                row.budget_range,
+                row.attraction_types,
+                row.kids_friendly,
+                per_user_counts.get(row.user_id, {}),
+                row.eco_point,
+                row.rank,
             )
+            for row in stale
+        ]
+        matrix = await embedding_service.encode_many(texts)
+        embeddings = {row.user_id: matrix[idx] for idx, row in enumerate(stale)}
 
-            users_needing_update = (
-                await ClusterRepository.get_users_needing_embedding_update(
-                    db, cutoff_date
-                )
+        written = await ClusterRepository.bulk_update_preference_embeddings(
+            db, embeddings, settings.CLUSTERING_WRITE_CHUNK_SIZE
+        )
+        if written != len(embeddings):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to store refreshed preference embeddings",
             )
+        return embeddings
 
-            # Debug: Log user IDs needing update
-            user_ids_needing_update = [u.id for u in users_needing_update]
-            print(f"📋 User IDs needing update: {user_ids_needing_update[:10]}...{user_ids_needing_update[-5:] if len(user_ids_needing_update) > 10 else ''}")
-
-            updated_count = 0
-            skipped_users = []
-            for user in users_needing_update:
-                # Check if user has a preference record first
-                pref = await ClusterRepository.get_preference_by_user_id(db, user.id)
-                if not pref:
-                    skipped_users.append(user.id)
-                    print(f"⚠️ User {user.id} has no preference record, skipping")
-                    continue
-
-                embedding = await ClusterService.embed_preference(db, user.id)
-                if embedding:
-                    success = await ClusterService.save_preference_embedding(
-                        db, user.id, embedding
-                    )
-                    if success:
-                        updated_count += 1
-                    else:
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Failed to update embedding for user {user.id}",
-                        )
-                else:
-                    print(f"⚠️ Failed to generate embedding for user {user.id}")
-
-            if skipped_users:
-                print(f"⚠️ Skipped {len(skipped_users)} users without preferences: {skipped_users[:10]}")
-
-            return updated_count
+    @staticmethod
+    async def update_user_embeddings(db: AsyncSession) -> int:
+        try:
+            inputs = await ClusterRepository.get_clustering_inputs(db)
+            activity_counts = await ClusterRepository.get_activity_counts(db)
+            embeddings = await ClusterService.refresh_preference_embeddings(
+                db, inputs, activity_counts
+            )
+            return len(embeddings)
         except HTTPException:
             raise
         except Exception as e:
@@ -367,31 +487,9 @@ class ClusterService:
         db: AsyncSession, user_cluster_mapping: Dict[int, int]
     ) -> int:
         try:
-            created_count = 0
-            failed_users = []
-
-            for user_id, cluster_id in user_cluster_mapping.items():
-                try:
-                    association = await ClusterRepository.add_user_to_cluster(
-                        db, user_id, cluster_id
-                    )
-                    if association:
-                        created_count += 1
-                        await ClusterRepository.update_preference_cluster(
-                            db, user_id, cluster_id
-                        )
-                    else:
-                        failed_users.append(user_id)
-                        print(f"WARNING: Failed to create association for user_id={user_id}")
-                except Exception as inner_e:
-                    failed_users.append(user_id)
-                    print(f"ERROR: Failed to assign user_id={user_id} to cluster_id={cluster_id}: {inner_e}")
-                    await db.rollback()
-
-            if failed_users:
-                print(f"WARNING: Failed to assign {len(failed_users)} users: {failed_users}")
-
-            return created_count
+            return await ClusterRepository.bulk_assign_users_to_clusters(
+                db, user_cluster_mapping, settings.CLUSTERING_WRITE_CHUNK_SIZE
+            )
         except Exception as e:
             await db.rollback()
             raise HTTPException(
@@ -401,114 +499,76 @@ class ClusterService:
 
     @staticmethod
     async def run_user_clustering(db: AsyncSession) -> ClusteringResultResponse: # hàm chính để chạy quá trình phân cụm người dùng
+        timings: Dict[str, float] = {}
+        phase_start = time.perf_counter()
+
+        def end_phase(name: str):
+            nonlocal phase_start
+            now = time.perf_counter()
+            timings[name] = round((now - phase_start) * 1000, 1)
+            phase_start = now
+
+        def failed(message: str, embeddings_updated: int = 0) -> ClusteringResultResponse:
+            return ClusteringResultResponse(
+                success=False,
+                message=message,
+                stats=ClusteringStats(
+                    embeddings_updated=embeddings_updated,
+                    users_clustered=0,
+                    associations_created=0,
+                    clusters_updated=0,
+                    phase_timings_ms=timings,
+                ),
+            )
+
         try:
+            # Phase 1: preferences (joined with their users) and activity counts
+            inputs = await ClusterRepository.get_clustering_inputs(db)
+            activity_counts = await ClusterRepository.get_activity_counts(db)
+            end_phase("load")
+            print(f"📊 Loaded {len(inputs)} preferences and {len(activity_counts)} activity groups")
+
+            if not inputs:
+                return failed("No users with preference embeddings found")
+
+            # Phase 2: batch-encode stale or missing embeddings
             print("🔄 Starting clustering: updating user embeddings...")
-            embeddings_updated = await ClusterService.update_user_embeddings(db)
+            refreshed = await ClusterService.refresh_preference_embeddings(
+                db, inputs, activity_counts
+            )
+            embeddings_updated = len(refreshed)
+            end_phase("embed")
             print(f"✅ Updated {embeddings_updated} user embeddings")
 
-            users_with_embeddings = await ClusterRepository.get_users_with_embeddings(
-                db
-            )
-            
-            # Force generate embeddings for users with preferences but no embedding
-            all_preferences = await ClusterRepository.get_all_preferences(db)
-            users_missing_embeddings = [
-                pref for pref in all_preferences 
-                if pref.embedding is None
+            user_embeddings_data = [
+                (row.user_id, refreshed.get(row.user_id, row.embedding))
+                for row in inputs
+                if row.user_id in refreshed or row.embedding is not None
             ]
-            
-            if users_missing_embeddings:
-                print(f"🔧 Force generating embeddings for {len(users_missing_embeddings)} users with missing embeddings...")
-                for pref in users_missing_embeddings:
-                    try:
-                        embedding = await ClusterService.embed_preference(db, pref.user_id)
-                        if embedding:
-                            success = await ClusterService.save_preference_embedding(
-                                db, pref.user_id, embedding
-                            )
-                            if success:
-                                embeddings_updated += 1
-                                print(f"  ✅ Generated embedding for user {pref.user_id}")
-                            else:
-                                print(f"  ❌ Failed to save embedding for user {pref.user_id}")
-                        else:
-                            print(f"  ❌ Failed to generate embedding for user {pref.user_id}")
-                    except Exception as e:
-                        print(f"  ❌ Error generating embedding for user {pref.user_id}: {e}")
-                
-                # Refresh the list after generating embeddings
-                users_with_embeddings = await ClusterRepository.get_users_with_embeddings(db)
-
-            if not users_with_embeddings:
-                return ClusteringResultResponse(
-                    success=False,
-                    message="No users with preference embeddings found",
-                    stats=ClusteringStats(
-                        embeddings_updated=embeddings_updated,
-                        users_clustered=0,
-                        associations_created=0,
-                        clusters_updated=0,
-                    ),
-                )
-
-            print(f"📊 Found {len(users_with_embeddings)} users with embeddings")
-
-            # Validate that user IDs actually exist in the database
-            user_embeddings_data = []
-            valid_user_ids = set()
-
-            for pref in users_with_embeddings:
-                if pref and pref.embedding and pref.user_id:
-                    # Verify user still exists
-                    user_exists = await UserRepository.get_user_by_id(db, pref.user_id)
-                    if user_exists:
-                        user_embeddings_data.append((pref.user_id, pref.embedding))
-                        valid_user_ids.add(pref.user_id)
-                    else:
-                        print(f"WARNING: Preference exists for non-existent user_id={pref.user_id}")
-                else:
-                    if pref and pref.user_id:
-                        print(f"⚠️ User {pref.user_id} has preference but no embedding")
-
             if not user_embeddings_data:
-                return ClusteringResultResponse(
-                    success=False,
-                    message="No valid users with embeddings found",
-                    stats=ClusteringStats(
-                        embeddings_updated=embeddings_updated,
-                        users_clustered=0,
-                        associations_created=0,
-                        clusters_updated=0,
-                    ),
-                )
+                return failed("No valid users with embeddings found", embeddings_updated)
 
-            user_cluster_mapping = ClusterService.cluster_users_hdbscan(
-                user_embeddings_data, MIN_CLUSTER_SIZE
+            # Phase 3: HDBSCAN off the event loop
+            user_cluster_mapping = await asyncio.to_thread(
+                ClusterService.cluster_users_hdbscan,
+                user_embeddings_data,
+                MIN_CLUSTER_SIZE,
             )
+            end_phase("cluster")
 
             if not user_cluster_mapping:
-                return ClusteringResultResponse(
-                    success=False,
-                    message="HDBSCAN clustering failed",
-                    stats=ClusteringStats(
-                        embeddings_updated=embeddings_updated,
-                        users_clustered=0,
-                        associations_created=0,
-                        clusters_updated=0,
-                    ),
-                )
+                return failed("HDBSCAN clustering failed", embeddings_updated)
 
             cluster_counts = {}
             for cluster_id in user_cluster_mapping.values():
                 cluster_counts[cluster_id] = cluster_counts.get(cluster_id, 0) + 1
-#==========================================================================================
-            # First, ensure cluster records exist in database
+
+            # Phase 4: cluster rows, associations and preference.cluster_id
+            existing_ids = {cluster.id for cluster in await ClusterRepository.get_all_clusters(db)}
             for cluster_id in sorted(cluster_counts.keys()):
                 print(f"    - Cluster {cluster_id}: {cluster_counts[cluster_id]} users")
 
-                # Check if cluster exists, create if not
-                existing_cluster = await ClusterRepository.get_cluster_by_id(db, cluster_id + 1)
-                if not existing_cluster:
+                if cluster_id + 1 not in existing_ids:
                     from schemas.cluster_schema import ClusterCreate
                     cluster_data = ClusterCreate(
                         name=f"Cluster {cluster_id + 1}",
@@ -520,25 +580,53 @@ class ClusterService:
             # Remap cluster IDs from 0-based to 1-based (database IDs start at 1)
             adjusted_mapping = {user_id: cluster_id + 1 for user_id, cluster_id in user_cluster_mapping.items()}
 
-#==========================================================================================
             associations_created = (
                 await ClusterService.create_user_cluster_associations(
                     db, adjusted_mapping
                 )
             )
-            #==========================================================================================
-            # Compute popularity for adjusted cluster IDs
-            popularity_errors = 0
-            for cluster_id in set(adjusted_mapping.values()):
-                try:
-                    await ClusterService.compute_cluster_popularity(db, cluster_id)
-                except Exception as pop_error:
-                    popularity_errors += 1
-                    print(f"ERROR: Failed to compute popularity for cluster_id={cluster_id}: {pop_error}")
-
-            if popularity_errors > 0:
-                print(f"WARNING: Failed to compute popularity for {popularity_errors} clusters")
-#==========================================================================================
+            end_phase("assign")
+
+            # Phase 5: popularity for every cluster from the activities loaded above
+            popularity_rows = ClusterService.compute_popularity_rows(
+                adjusted_mapping, activity_counts
+            )
+            await ClusterRepository.upsert_cluster_destinations(
+                db, popularity_rows, settings.CLUSTERING_WRITE_CHUNK_SIZE
+            )
+            end_phase("popularity")
+
+            # Phase 6: store this run's centroids so reads are a single-row lookup
+            run_version = f"run-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
+            centroids = ClusterService.compute_cluster_centroids(
+                user_embeddings_data, adjusted_mapping
+            )
+            if not await ClusterService.save_cluster_centroids(db, centroids, run_version):
+                print("WARNING: Failed to store cluster centroids")
+
+            # Memberships changed, so every cached centroid is stale
+            centroid_cache.clear()
+            end_phase("centroids")
+
+            # Phase 7: precompute hybrid recommendations so requests read them from a table
+            try:
+                # Import here to avoid circular import
+                from services.recommendation_service import (
+                    PRECOMPUTED_RECOMMENDATIONS_PER_CLUSTER,
+                    RecommendationService,
+                )
+
+                precomputed = await RecommendationService.recommend_for_clusters(
+                    db,
+                    sorted(set(adjusted_mapping.values())),
+                    k=PRECOMPUTED_RECOMMENDATIONS_PER_CLUSTER,
+                )
+                print(f"✅ Precomputed recommendations for {len(precomputed)} clusters")
+            except Exception as rec_error:
+                print(f"WARNING: Failed to precompute cluster recommendations: {rec_error}")
+            end_phase("recommendations")
+
+            print(f"⏱️ Clustering phase timings (ms): {timings}")
             return ClusteringResultResponse(
                 success=True,
                 message="Clustering completed successfully",
@@ -547,9 +635,12 @@ class ClusterService:
                     users_clustered=len(user_cluster_mapping),
                     associations_created=associations_created,
                     clusters_updated=len(cluster_counts),
+                    phase_timings_ms=timings,
                 ),
             )
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -588,6 +679,7 @@ class ClusterService:
                 
                 # Assign to this new cluster and exit
                 await ClusterRepository.add_user_to_cluster(db, user_id, cluster_id)
+                centroid_cache.invalidate(cluster_id)
                 print(f"✅ Successfully assigned user {user_id} to cluster {cluster_id}")
                 return True
             
@@ -606,19 +698,31 @@ class ClusterService:
             await ClusterService.save_preference_embedding(db, user_id, embedding)
             
             # Find the most similar cluster based on embedding
-            user_embedding = np.array(embedding)
+            user_embedding = np.array(embedding, dtype=np.float32)
             best_cluster_id = None
             min_distance = float('inf')
-            
+
+            stored_centroids = {
+                row.cluster_id: row.centroid
+                for row in await ClusterRepository.get_cluster_centroids(db)
+            }
             for cluster in existing_clusters:
-                # Compute cluster centroid
-                cluster_embedding = await ClusterService.compute_cluster_embedding(db, cluster.id)
-                if cluster_embedding is not None:
-                    # Calculate Euclidean distance
-                    distance = np.linalg.norm(user_embedding - cluster_embedding)
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_cluster_id = cluster.id
+                if cluster.id not in stored_centroids:
+                    centroid = await ClusterService.get_cluster_centroid(db, cluster.id)
+                    if centroid is not None:
+                        stored_centroids[cluster.id] = centroid
+
+            if stored_centroids:
+                # Euclidean distance to every centroid at once
+                candidate_ids = list(stored_centroids)
+                distances = np.linalg.norm(
+                    np.vstack([stored_centroids[cid] for cid in candidate_ids])
+                    - user_embedding,
+                    axis=1,
+                )
+                best = int(np.argmin(distances))
+                best_cluster_id = candidate_ids[best]
+                min_distance = float(distances[best])
             
             # Fallback if no valid cluster embedding found
             if best_cluster_id is None:
@@ -631,6 +735,7 @@ class ClusterService:
             
             # Create user-cluster association
             await ClusterRepository.add_user_to_cluster(db, user_id, cluster_id)
+            await ClusterService.add_member_to_centroid(db, cluster_id, user_embedding)
             
             # Update cluster popularity (non-blocking)
             try:
@@ -12,7 +12,8 @@ from schemas.destination_schema import (
     DestinationUpdate,
     UserSavedDestinationResponse,
 )
-from utils.embedded.embedding_utils import encode_text
+from utils.embedded.embedding_service import embedding_service
+from utils.embedded.faiss_utils import add_to_index, remove_from_index
 
 
 class DestinationService:
@@ -228,11 +229,11 @@ class DestinationService:
                 text_parts.append(destination_data["category"])
 
             text = " ".join(text_parts) if text_parts else "destination"
-            embedding = encode_text(text)
-            return embedding
+            embedding = await embedding_service.encode(text)
+            return embedding.tolist()
 
         except Exception:
-            return encode_text("destination")
+            return (await embedding_service.encode("destination")).tolist()
 
     @staticmethod
     async def embed_destination_by_id(
@@ -252,7 +253,9 @@ class DestinationService:
                 embedding_vector=embedding,
                 model_version="v1",
             )
-            await DestinationRepository.save_embedding(db, embedding_data)
+            saved = await DestinationRepository.save_embedding(db, embedding_data)
+            if saved is not None:
+                add_to_index(destination_id, embedding)
 
             return embedding
 
@@ -280,7 +283,10 @@ class DestinationService:
     @staticmethod
     async def delete_destination_embedding(db: AsyncSession, destination_id: str):
         try:
-            return await DestinationRepository.delete_embedding(db, destination_id)
+            deleted = await DestinationRepository.delete_embedding(db, destination_id)
+            if deleted:
+                remove_from_index(destination_id)
+            return deleted
         except Exception:
             return False
 
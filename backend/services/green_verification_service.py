@@ -1,11 +1,181 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from database.db import UserAsyncSessionLocal
 from models.destination import GreenVerifiedStatus
+from models.green_verification import GreenVerificationJob
+from repository.destination_repository import DestinationRepository
+from repository.green_verification_repository import GreenVerificationRepository
 from schemas.map_schema import PlaceDataCategory, PlaceDetailsRequest
 from services.map_service import MapService
-from utils.green_verification.orchestrator import GreenCoverageOrchestrator
-from schemas.green_verification_schema import GreenVerificationResponse
+from services.socket_service import socket
+from utils.config import settings
+from utils.green_verification.image_loader import image_loader
+from utils.green_verification.result_cache import (
+    get_model_version,
+    image_content_hash,
+    place_result_cache,
+)
+from utils.green_verification.worker import green_verification_pool
+from schemas.green_verification_schema import (
+    GreenVerificationJobResponse,
+    GreenVerificationJobStatus,
+    GreenVerificationResponse,
+    GreenVerificationSweepStats,
+)
+
+# Mean green score from which a place counts as AI green verified
+GREEN_SCORE_THRESHOLD = 0.02
+
+
+FINISHED_JOB_STATUSES = (
+    GreenVerificationJobStatus.succeeded,
+    GreenVerificationJobStatus.failed,
+)
+
+
+def job_response(job: GreenVerificationJob) -> GreenVerificationJobResponse:
+    return GreenVerificationJobResponse(
+        job_id=job.id,
+        place_id=job.place_id,
+        status=GreenVerificationJobStatus(job.status),
+        green_score=job.green_score,
+        verified_status=job.verified_status,
+        images_processed=job.images_processed or 0,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+class GreenVerificationJobs:
+    """
+    Verification jobs, stored in green_verification_jobs so every API worker
+    can report any job. Submissions for a place that already has a queued or
+    running job join that job instead of starting a new one; a partial
+    unique index on place_id keeps this true across workers. The worker
+    that created a job runs it. Finished jobs stay pollable for
+    GREEN_VERIFICATION_JOB_TTL_SECONDS, and jobs still active after
+    GREEN_VERIFICATION_JOB_TIMEOUT_SECONDS are marked failed.
+    """
+
+    def __init__(self, ttl_seconds: int, timeout_seconds: int, poll_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self.poll_seconds = poll_seconds
+        # Jobs run by this worker
+        self._done: Dict[str, asyncio.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def submit(
+        self, db: AsyncSession, place_id: str, user_id: int
+    ) -> GreenVerificationJobResponse:
+        await GreenVerificationRepository.expire_jobs(db, self.ttl_seconds, self.timeout_seconds)
+        job, created = await GreenVerificationRepository.create_or_join_job(
+            db, uuid.uuid4().hex, place_id, user_id
+        )
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Could not queue green verification for {place_id}",
+            )
+
+        response = job_response(job)
+        if created:
+            self._done[job.id] = asyncio.Event()
+            self._tasks[job.id] = asyncio.create_task(
+                GreenVerificationService._run_job(response.model_copy(), user_id)
+            )
+        return response
+
+    async def get(self, db: AsyncSession, job_id: str) -> Optional[GreenVerificationJobResponse]:
+        job = await GreenVerificationRepository.get_job(db, job_id)
+        return job_response(job) if job is not None else None
+
+    async def completed(
+        self, db: AsyncSession, place_id: str, result: GreenVerificationResponse
+    ) -> GreenVerificationJobResponse:
+        """Record an already known result as a finished job."""
+        job = await GreenVerificationRepository.create_job(
+            db,
+            id=uuid.uuid4().hex,
+            place_id=place_id,
+            status=GreenVerificationJobStatus.succeeded.value,
+            green_score=result.green_score,
+            verified_status=result.status,
+            subscriber_ids=[],
+            finished_at=datetime.now(timezone.utc),
+        )
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Could not record green verification for {place_id}",
+            )
+        return job_response(job)
+
+    async def set_running(self, db: AsyncSession, job: GreenVerificationJobResponse):
+        job.status = GreenVerificationJobStatus.running
+        await GreenVerificationRepository.update_job(db, job.job_id, status=job.status.value)
+
+    async def finish(self, job: GreenVerificationJobResponse) -> List[int]:
+        """Store the final state of a job run here; returns the users to notify."""
+        job.finished_at = datetime.now(timezone.utc)
+        subscribers: List[int] = []
+        try:
+            async with UserAsyncSessionLocal() as db:
+                row = await GreenVerificationRepository.update_job(
+                    db,
+                    job.job_id,
+                    status=job.status.value,
+                    green_score=job.green_score,
+                    verified_status=job.verified_status,
+                    images_processed=job.images_processed,
+                    error=job.error,
+                    finished_at=job.finished_at,
+                )
+                if row is not None:
+                    subscribers = list(row.subscriber_ids or [])
+        finally:
+            self._tasks.pop(job.job_id, None)
+            done = self._done.pop(job.job_id, None)
+            if done is not None:
+                done.set()
+        return subscribers
+
+    async def wait(self, job_id: str) -> Optional[GreenVerificationJobResponse]:
+        """Wait for a job to finish, whichever API worker runs it."""
+        while True:
+            done = self._done.get(job_id)
+            if done is not None:
+                await done.wait()
+            async with UserAsyncSessionLocal() as db:
+                job = await self.get(db, job_id)
+            if job is None or job.status in FINISHED_JOB_STATUSES:
+                return job
+            if done is None:
+                await asyncio.sleep(self.poll_seconds)
+
+    def cancel_all(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+
+green_verification_jobs = GreenVerificationJobs(
+    ttl_seconds=settings.GREEN_VERIFICATION_JOB_TTL_SECONDS,
+    timeout_seconds=settings.GREEN_VERIFICATION_JOB_TIMEOUT_SECONDS,
+    poll_seconds=settings.GREEN_VERIFICATION_JOB_POLL_SECONDS,
+)
 
 
 class GreenVerificationService:
@@ -13,13 +183,16 @@ class GreenVerificationService:
     DATA FLOW
     - use place_id to get place details
     - Get associated image URLs
-    - For each image URL:
-        - Run segmentation model to get green mask
-        - Run depth model to get depth map
-        - Calculate green coverage metrics
-        - Run cup detection model to find cups
-    - Return results with green scores and status
-    
+    - Fetch and decode the photos; reuse stored results for photos whose
+      content hash was already scored with the current model version
+    - Send the remaining photos to a worker process, which:
+        - Runs segmentation model to get green masks
+        - Runs depth model to get depth maps
+        - Calculates green coverage metrics
+        - Runs cup detection model to find cups
+    - Store the score and status on the destination
+    - Notify the submitting users over their open sockets
+
     Input: place_id
     Output: {
         score: float,
@@ -27,10 +200,151 @@ class GreenVerificationService:
         }
     '''
 
+    @staticmethod
+    def aggregate_scores(scores: List[float]) -> GreenVerificationResponse:
+        final_score = sum(scores) / len(scores) if scores else 0.0
+        if final_score >= GREEN_SCORE_THRESHOLD:
+            verification_status = GreenVerifiedStatus.AI_Green_Verified
+        else:
+            verification_status = GreenVerifiedStatus.Not_Green_Verified
+        return GreenVerificationResponse(
+            green_score=final_score, status=verification_status
+        )
+
+    @staticmethod
+    async def get_place_image_urls(db: AsyncSession, place_id: str, user_id: int) -> List[str]:
+        request = PlaceDetailsRequest(
+            place_id=place_id,
+            categories=[PlaceDataCategory.BASIC]
+        )
+        place_details = await MapService.get_location_details(request, db, user_id)
+        return [p.photo_url for p in (place_details.photos or []) if p.photo_url]
+
+    @staticmethod
+    async def score_decoded_images(
+        db: AsyncSession, images: List[np.ndarray], batch_size: Optional[int] = None
+    ) -> Tuple[List[float], int]:
+        """
+        Green score per decoded photo, plus how many photos needed inference.
+        Photos are looked up by content hash and model version; only unseen
+        photos go to the worker pool, split into batch_size chunks that run
+        on the workers in parallel. New results are stored for the next run.
+        """
+        if not images:
+            return [], 0
+
+        hashes = await asyncio.to_thread(lambda: [image_content_hash(img) for img in images])
+        model_version = get_model_version()
+        cached = await GreenVerificationRepository.get_image_results(
+            db, list(set(hashes)), model_version
+        )
+        scores_by_hash = {h: row.green_score for h, row in cached.items()}
+
+        missing = {}
+        for content_hash, image in zip(hashes, images):
+            if content_hash not in scores_by_hash and content_hash not in missing:
+                missing[content_hash] = image
+
+        if missing:
+            keys = list(missing.keys())
+            arrays = list(missing.values())
+            step = batch_size or len(arrays)
+            chunks = await asyncio.gather(
+                *(
+                    green_verification_pool.score_arrays(arrays[i:i + step])
+                    for i in range(0, len(arrays), step)
+                )
+            )
+            fresh = dict(zip(keys, [res for chunk in chunks for res in chunk]))
+            await GreenVerificationRepository.save_image_results(db, fresh, model_version)
+            scores_by_hash.update({h: res["green_score"] for h, res in fresh.items()})
+
+        return [scores_by_hash[h] for h in hashes], len(missing)
+
+    @staticmethod
+    async def score_place_images(db: AsyncSession, image_urls: List[str]) -> List[float]:
+        """Fetch and decode a place's photos, then score them with the result cache."""
+        images = await image_loader.load_many(image_urls)
+        loaded = [image for image in images if not isinstance(image, Exception)]
+        if not loaded:
+            raise RuntimeError(str(images[0]) if images else "no image could be processed")
+
+        scores, scored = await GreenVerificationService.score_decoded_images(db, loaded)
+        print(
+            f"[GreenVerification] {len(loaded)} photos, {len(loaded) - scored} "
+            f"from cache, {scored} scored"
+        )
+        return scores
+
+    @staticmethod
+    async def _run_job(job: GreenVerificationJobResponse, user_id: int):
+        try:
+            async with UserAsyncSessionLocal() as db:
+                image_urls = await GreenVerificationService.get_place_image_urls(
+                    db, job.place_id, user_id
+                )
+
+                # No images → Not Verified, score = 0
+                if image_urls:
+                    await green_verification_jobs.set_running(db, job)
+                    scores = await GreenVerificationService.score_place_images(db, image_urls)
+                else:
+                    scores = []
+
+                result = GreenVerificationService.aggregate_scores(scores)
+                saved = await DestinationRepository.upsert_green_verifications(
+                    db, {job.place_id: (result.green_score, result.status)}
+                )
+                if not saved:
+                    raise RuntimeError("failed to store the verification result")
+
+            place_result_cache.put(job.place_id, result)
+            job.green_score = result.green_score
+            job.verified_status = result.status
+            job.images_processed = len(scores)
+            job.status = GreenVerificationJobStatus.succeeded
+        except asyncio.CancelledError:
+            job.status = GreenVerificationJobStatus.failed
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            print(f"[GreenVerification] Job {job.job_id} for {job.place_id} failed: {e}")
+            job.status = GreenVerificationJobStatus.failed
+            job.error = str(e)[:200]
+        finally:
+            subscribers = await green_verification_jobs.finish(job)
+
+        message = {"type": "green_verification", "job": job.model_dump(mode="json")}
+        for subscriber in subscribers:
+            await socket.notify_user(message, subscriber)
+
+    @staticmethod
+    async def submit_verification(
+        db: AsyncSession, place_id: str, user_id: int, force: bool = False
+    ) -> GreenVerificationJobResponse:
+        """Queue a verification; a recent result for the place is returned as a finished job."""
+        if not force:
+            cached = place_result_cache.get(place_id)
+            if cached is not None:
+                return await green_verification_jobs.completed(db, place_id, cached)
+        return await green_verification_jobs.submit(db, place_id, user_id)
+
+    @staticmethod
+    async def get_verification_job(db: AsyncSession, job_id: str) -> GreenVerificationJobResponse:
+        job = await green_verification_jobs.get(db, job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Green verification job {job_id} not found",
+            )
+        return job
+
     @classmethod
     async def verify_place_green_coverage(cls, place_id: str, db: AsyncSession, user_id: int) -> GreenVerificationResponse:
         """
-        Verify green coverage for images associated with a place.
+        Verify green coverage for images associated with a place and wait
+        for the result. Runs as a regular job, so it shares work with any
+        pending submission for the same place.
 
         Args:
             place_id: place_id của địa điểm
@@ -40,57 +354,223 @@ class GreenVerificationService:
         Returns:
             GreenVerificationResponse with green_score and status
         """
+        job = await cls.submit_verification(db, place_id, user_id)
+        job = await green_verification_jobs.wait(job.job_id) or job
 
-        # 1. Fetch place info
-        request = PlaceDetailsRequest(
-            place_id=place_id,
-            categories=[PlaceDataCategory.BASIC]
+        if job.status != GreenVerificationJobStatus.succeeded:
+            # This allows the API to still work even if ML models fail to load
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Green verification service is currently unavailable due to ML model compatibility issues. Please contact administrator. Error: {(job.error or '')[:100]}"
+            )
+
+        return GreenVerificationResponse(
+            green_score=job.green_score,
+            status=job.verified_status
         )
 
-        place_details = await MapService.get_location_details(request, db, user_id)
+    @staticmethod
+    def start_sweep(restart: bool = False, max_places: Optional[int] = None) -> GreenVerificationSweepStats:
+        if not green_verification_sweep.start(restart=restart, max_places=max_places):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A green verification sweep is already running",
+            )
+        return green_verification_sweep.stats
 
-        # 2. Collect image URLs
-        image_urls = [p.photo_url for p in (place_details.photos or []) if p.photo_url]
+    @staticmethod
+    def get_sweep_stats() -> GreenVerificationSweepStats:
+        if green_verification_sweep.running:
+            return green_verification_sweep.stats
+        return green_verification_sweep.load_checkpoint()
 
-        # No images → Not Verified, score = 0
-        if not image_urls:
-            return GreenVerificationResponse(
-                green_score=0.0,
-                status=GreenVerifiedStatus.Not_Green_Verified
-            )
 
-        # 3. Process images with error handling for ML library compatibility issues
+class GreenVerificationSweep:
+    """
+    Verifies every Not_Green_Verified destination that has not been checked
+    in the last GREEN_SWEEP_REVERIFY_DAYS. Destinations are read in place_id
+    pages; the photos of a page are fetched together and scored in large
+    batches across the worker pool; statuses are written with one upsert per
+    page. Progress is checkpointed to disk after each page so an interrupted
+    sweep resumes after the last finished place.
+    """
+
+    def __init__(self, checkpoint_path: Path):
+        self.checkpoint_path = Path(checkpoint_path)
+        self.stats = GreenVerificationSweepStats()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def load_checkpoint(self) -> GreenVerificationSweepStats:
         try:
-            orchestrator = GreenCoverageOrchestrator.get_instance()
-
-            scores = []
-            for url in image_urls:
-                res = orchestrator.process_single_image(url)
-                scores.append(res["green_score"])
-
-            # 4. Aggregate score (mean)
-            final_score = sum(scores) / len(scores)
-
-            # 5. Determine status
-            if final_score >= 0.02:
-                verification_status = GreenVerifiedStatus.AI_Green_Verified
-            else:
-                verification_status = GreenVerifiedStatus.Not_Green_Verified
-
-            # 6. Return final schema
-            return GreenVerificationResponse(
-                green_score=final_score,
-                status=verification_status
+            return GreenVerificationSweepStats.model_validate_json(
+                self.checkpoint_path.read_text()
             )
-
+        except FileNotFoundError:
+            return GreenVerificationSweepStats()
         except Exception as e:
-            # Log the error
-            print(f"[GreenVerification] ML processing failed: {e}")
+            print(f"WARNING: Ignoring unreadable green sweep checkpoint - {e}")
+            return GreenVerificationSweepStats()
 
+    def save_checkpoint(self):
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".json.tmp")
+        tmp_path.write_text(self.stats.model_dump_json())
+        os.replace(tmp_path, self.checkpoint_path)
 
-            # Return a fallback response indicating processing is unavailable
-            # This allows the API to still work even if ML models fail to load
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Green verification service is currently unavailable due to ML model compatibility issues. Please contact administrator. Error: {str(e)[:100]}"
+    def start(self, restart: bool = False, max_places: Optional[int] = None) -> bool:
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self.run(restart=restart, max_places=max_places))
+        return True
+
+    @staticmethod
+    async def _fetch_image_urls(place_ids: List[str]) -> Dict[str, Optional[List[str]]]:
+        """Photo URLs per place; None when the details lookup failed."""
+        semaphore = asyncio.Semaphore(settings.GREEN_SWEEP_DETAILS_CONCURRENCY)
+
+        async def fetch(place_id: str):
+            async with semaphore:
+                try:
+                    request = PlaceDetailsRequest(
+                        place_id=place_id, categories=[PlaceDataCategory.BASIC]
+                    )
+                    details = await MapService.get_location_details(request)
+                    return [p.photo_url for p in (details.photos or []) if p.photo_url]
+                except Exception as e:
+                    print(f"[GreenSweep] Details lookup failed for {place_id}: {e}")
+                    return None
+
+        urls = await asyncio.gather(*(fetch(place_id) for place_id in place_ids))
+        return dict(zip(place_ids, urls))
+
+    async def _score_urls(
+        self, db: AsyncSession, urls: List[str], batch_size: int
+    ) -> Dict[str, float]:
+        """Score photos in slices large enough to keep every worker busy."""
+        scores: Dict[str, float] = {}
+        slice_size = batch_size * settings.GREEN_VERIFICATION_WORKERS
+        for i in range(0, len(urls), slice_size):
+            chunk = urls[i:i + slice_size]
+            images = await image_loader.load_many(chunk)
+            loaded = [
+                (url, image) for url, image in zip(chunk, images)
+                if not isinstance(image, Exception)
+            ]
+            chunk_scores, scored = await GreenVerificationService.score_decoded_images(
+                db, [image for _, image in loaded], batch_size
+            )
+            scores.update(zip([url for url, _ in loaded], chunk_scores))
+            self.stats.images_processed += len(loaded)
+            self.stats.images_scored += scored
+        return scores
+
+    def _update_rates(self, run_started: float, base_elapsed: float, images_before: int, places_before: int):
+        run_elapsed = time.perf_counter() - run_started
+        stats = self.stats
+        stats.elapsed_seconds = round(base_elapsed + run_elapsed, 1)
+        if run_elapsed > 0:
+            stats.images_per_second = round((stats.images_processed - images_before) / run_elapsed, 2)
+            stats.places_per_second = round((stats.places_processed - places_before) / run_elapsed, 2)
+        remaining = max(stats.places_total - stats.places_processed, 0)
+        stats.eta_seconds = (
+            round(remaining / stats.places_per_second, 1) if stats.places_per_second else None
+        )
+        stats.updated_at = datetime.now(timezone.utc)
+
+    async def run(
+        self, restart: bool = False, max_places: Optional[int] = None
+    ) -> GreenVerificationSweepStats:
+        previous = None if restart else self.load_checkpoint()
+        if previous is None or previous.finished_at is not None or previous.started_at is None:
+            stale_before = datetime.now(timezone.utc) - timedelta(days=settings.GREEN_SWEEP_REVERIFY_DAYS)
+            self.stats = GreenVerificationSweepStats(
+                started_at=datetime.now(timezone.utc), stale_before=stale_before
             )
+        else:
+            self.stats = previous
+            print(f"[GreenSweep] Resuming after {previous.last_place_id}")
+
+        stats = self.stats
+        stats.running = True
+        run_started = time.perf_counter()
+        base_elapsed = stats.elapsed_seconds
+        images_before = stats.images_processed
+        places_before = stats.places_processed
+        page_size = settings.GREEN_SWEEP_PAGE_SIZE
+        batch_size = settings.GREEN_SWEEP_IMAGE_BATCH_SIZE
+
+        try:
+            async with UserAsyncSessionLocal() as db:
+                remaining = await DestinationRepository.count_green_sweep_candidates(
+                    db, stats.last_place_id, stats.stale_before
+                )
+                stats.places_total = stats.places_processed + remaining
+                print(f"[GreenSweep] {remaining} destinations to verify")
+
+                while max_places is None or stats.places_processed - places_before < max_places:
+                    place_ids = await DestinationRepository.get_green_sweep_page(
+                        db, stats.last_place_id, page_size, stats.stale_before
+                    )
+                    if not place_ids:
+                        stats.finished_at = datetime.now(timezone.utc)
+                        break
+
+                    urls_by_place = await self._fetch_image_urls(place_ids)
+                    all_urls = list(dict.fromkeys(
+                        url for urls in urls_by_place.values() if urls for url in urls
+                    ))
+                    score_by_url = await self._score_urls(db, all_urls, batch_size)
+
+                    results = {}
+                    for place_id, urls in urls_by_place.items():
+                        if urls is None:
+                            stats.places_failed += 1
+                            continue
+                        place_scores = [score_by_url[url] for url in urls if url in score_by_url]
+                        if urls and not place_scores:
+                            # Photos could not be loaded; the next sweep retries the place
+                            stats.places_failed += 1
+                            continue
+                        result = GreenVerificationService.aggregate_scores(place_scores)
+                        results[place_id] = (result.green_score, result.status)
+                        place_result_cache.put(place_id, result)
+                        if result.status == GreenVerifiedStatus.AI_Green_Verified:
+                            stats.places_verified += 1
+
+                    if not await DestinationRepository.upsert_green_verifications(db, results):
+                        raise RuntimeError("failed to store green verification results")
+
+                    stats.last_place_id = place_ids[-1]
+                    stats.places_processed += len(place_ids)
+                    self._update_rates(run_started, base_elapsed, images_before, places_before)
+                    self.save_checkpoint()
+                    print(
+                        f"[GreenSweep] {stats.places_processed}/{stats.places_total} places, "
+                        f"{stats.images_per_second} images/s, ETA {stats.eta_seconds}s"
+                    )
+        except asyncio.CancelledError:
+            print(f"[GreenSweep] Interrupted after {stats.last_place_id}")
+            raise
+        except Exception as e:
+            print(f"[GreenSweep] Failed after {stats.last_place_id}: {e}")
+        finally:
+            stats.running = False
+            self._update_rates(run_started, base_elapsed, images_before, places_before)
+            self.save_checkpoint()
+
+        print(
+            f"[GreenSweep] Done: {stats.places_processed} places, {stats.places_verified} verified, "
+            f"{stats.places_failed} failed, {stats.images_processed} images in {stats.elapsed_seconds}s"
+        )
+        return stats
+
+    def cancel(self):
+        if self.running:
+            self._task.cancel()
+
+
+green_verification_sweep = GreenVerificationSweep(settings.GREEN_SWEEP_CHECKPOINT_PATH)
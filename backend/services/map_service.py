@@ -1,8 +1,10 @@
-from typing import Optional
+import asyncio
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from database.db import UserAsyncSessionLocal
 from integration.map_api import create_map_client
 from models.user import Activity
 from repository.destination_repository import DestinationRepository
@@ -24,6 +26,8 @@ from schemas.map_schema import (
 from schemas.route_schema import DirectionsResponse
 from schemas.user_schema import UserActivityCreate
 from services.user_service import UserService
+from utils.config import settings
+from utils.maps.coordinate_cache import coordinate_cache
 
 FIELD_GROUPS = {
     PlaceDataCategory.BASIC: [
@@ -69,33 +73,122 @@ class MapService:
         return place_id.startswith('ChIJ') or len(place_id) > 20
 
     @staticmethod
-    async def get_coordinates(place_id: str) -> Location:
-        # Validate place_id before making API call
-        if not MapService._is_valid_place_id(place_id):
-            print(f"INVALID place_id format: {place_id}, skipping API call")
-            return None
-        
+    async def get_coordinates(
+        place_id: str, db: Optional[AsyncSession] = None
+    ) -> Location:
+        coordinates = await MapService.get_coordinates_many([place_id], db=db)
+        return coordinates.get(place_id)
+
+    @staticmethod
+    async def get_coordinates_many(
+        place_ids: List[str], db: Optional[AsyncSession] = None
+    ) -> Dict[str, Location]:
+        """
+        Resolve coordinates for many places at once.
+
+        Lookup order is the in-process LRU, then the coordinates persisted on
+        destinations (one query for all remaining ids), then concurrent Place
+        Details calls for whatever is still missing. Places that cannot be
+        resolved are left out of the result.
+        """
+        result: Dict[str, Location] = {}
+        pending = []
+        for place_id in dict.fromkeys(place_ids):
+            if not MapService._is_valid_place_id(place_id):
+                print(f"INVALID place_id format: {place_id}, skipping API call")
+                continue
+
+            cached = coordinate_cache.get(place_id)
+            if cached:
+                coordinate_cache.memory_hits += 1
+                result[place_id] = Location(lat=cached[0], lng=cached[1])
+            else:
+                pending.append(place_id)
+
+        if not pending:
+            return result
+
+        try:
+            if db is not None:
+                rows = await DestinationRepository.get_coordinates_by_ids(db, pending)
+            else:
+                async with UserAsyncSessionLocal() as session:
+                    rows = await DestinationRepository.get_coordinates_by_ids(
+                        session, pending
+                    )
+        except Exception as e:
+            print(f"WARNING: Coordinate lookup in database failed: {e}")
+            rows = []
+
+        for place_id, lat, lng, updated_at in rows:
+            fetched_at = updated_at.timestamp() if updated_at else 0
+            if not coordinate_cache.is_fresh(fetched_at):
+                continue
+            coordinate_cache.db_hits += 1
+            coordinate_cache.put(place_id, lat, lng, fetched_at)
+            result[place_id] = Location(lat=lat, lng=lng)
+
+        misses = [place_id for place_id in pending if place_id not in result]
+        if not misses:
+            return result
+
+        coordinate_cache.misses += len(misses)
+        fetched = await MapService._fetch_coordinates(misses)
+        for place_id, (lat, lng) in fetched.items():
+            coordinate_cache.put(place_id, lat, lng)
+            result[place_id] = Location(lat=lat, lng=lng)
+
+        if fetched:
+            try:
+                if db is not None:
+                    await DestinationRepository.upsert_coordinates(db, fetched)
+                else:
+                    async with UserAsyncSessionLocal() as session:
+                        await DestinationRepository.upsert_coordinates(session, fetched)
+            except Exception as e:
+                print(f"WARNING: Failed to persist coordinates: {e}")
+
+        return result
+
+    @staticmethod
+    async def _fetch_coordinates(place_ids: List[str]) -> Dict[str, Tuple[float, float]]:
+        """Fetch coordinates from Place Details with bounded concurrency."""
+        semaphore = asyncio.Semaphore(settings.COORDINATE_FETCH_CONCURRENCY)
         map_client = None
+
+        async def fetch(place_id: str):
+            async with semaphore:
+                try:
+                    response = await map_client.get_place_details(
+                        place_id=place_id,
+                        fields=["geometry/location"],
+                    )
+                    if response and response.geometry and response.geometry.location:
+                        return place_id, (
+                            response.geometry.location.latitude,
+                            response.geometry.location.longitude,
+                        )
+                    print(f"WARNING: No geometry data in response for place_id={place_id}")
+                except Exception as e:
+                    print(f"ERROR in get_coordinates for place_id={place_id}: {str(e)}")
+                coordinate_cache.api_failures += 1
+                return place_id, None
+
         try:
             map_client = await create_map_client()
-            response = await map_client.get_place_details(
-                place_id=place_id,
-                fields=["geometry/location"],
-            )
-            if response and response.geometry and response.geometry.location:
-                return Location(
-                    lat=response.geometry.location.latitude,
-                    lng=response.geometry.location.longitude,
-                )
-            print(f"WARNING: No geometry data in response for place_id={place_id}")
-            return None
+            results = await asyncio.gather(*[fetch(place_id) for place_id in place_ids])
+            return {place_id: coords for place_id, coords in results if coords}
         except Exception as e:
-            print(f"ERROR in get_coordinates for place_id={place_id}: {str(e)}")
-            return None
+            print(f"ERROR in get_coordinates_many: {str(e)}")
+            return {}
         finally:
             if map_client:
                 await map_client.close()
 
+    @staticmethod
+    def get_coordinate_cache_stats() -> dict:
+        return coordinate_cache.stats()
+
     @staticmethod
     async def text_search_place(
         db: AsyncSession,
@@ -1,4 +1,5 @@
 import base64
+import time
 from datetime import datetime, timezone
 from io import BytesIO
 from typing import Any, Dict, List, Optional
@@ -19,6 +20,8 @@ from schemas.message_schema import (
     LLMContextData,
     MessageHistoryItem,
     MessageResponse,
+    MessageSearchItem,
+    MessageSearchResponse,
     PlanDestinationContext,
     RoomContextCreate,
     SessionContextResponse,
@@ -30,6 +33,7 @@ from schemas.storage_schema import FileCategory
 from services.room_service import RoomService
 from services.socket_service import socket
 from services.storage_service import StorageService
+from utils.chat_context_cache import CONTEXT_HISTORY_LIMIT, chat_context_cache
 from utils.token.authentication_util import decode_access_token
 
 
@@ -73,29 +77,61 @@ class MessageService:
             )
 
     @staticmethod
-    async def get_message_by_keyword(
-        db: AsyncSession, user_id: int, room_id: int, keyword: str
-    ) -> list[MessageResponse]:
+    async def search_messages(
+        db: AsyncSession,
+        user_id: int,
+        keyword: str,
+        room_id: Optional[int] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> MessageSearchResponse:
+        """
+        Ranked full-text search of text messages. Searches one room when
+        room_id is given, otherwise every room the user belongs to.
+        """
         try:
-            if not keyword or not keyword.strip():
+            if not keyword or not MessageRepository.build_search_query(keyword):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Keyword cannot be empty",
                 )
 
-            is_member = await RoomService.is_member(db, user_id, room_id)
-            if not is_member:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"User ID {user_id} is not a member of room ID {room_id}",
+            if room_id is not None:
+                is_member = await RoomService.is_member(db, user_id, room_id)
+                if not is_member:
+                    raise HTTPException(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail=f"User ID {user_id} is not a member of room ID {room_id}",
+                    )
+
+            # One extra row tells whether another page exists
+            results = await MessageRepository.search_messages(
+                db,
+                keyword,
+                limit + 1,
+                offset,
+                room_id=room_id,
+                member_id=None if room_id is not None else user_id,
+            )
+            items = [
+                MessageSearchItem(
+                    id=msg.id,
+                    sender_id=msg.sender_id,
+                    room_id=msg.room_id,
+                    content=msg.content,
+                    message_type=msg.message_type,
+                    status=msg.status,
+                    timestamp=msg.created_at,
+                    rank=rank,
                 )
-            messages = await MessageRepository.search_messages_by_keyword(
-                db, room_id, keyword
+                for msg, rank in results[:limit]
+            ]
+            return MessageSearchResponse(
+                items=items,
+                limit=limit,
+                offset=offset,
+                next_offset=offset + limit if len(results) > limit else None,
             )
-            if messages is None:
-                return []
-            import asyncio
-            return await asyncio.gather(*[MessageService._map_to_response(msg) for msg in messages])
         except HTTPException:
             raise
         except Exception as e:
@@ -106,8 +142,17 @@ class MessageService:
 
     @staticmethod
     async def get_messages_by_room(
-        db: AsyncSession, user_id: int, room_id: int
+        db: AsyncSession,
+        user_id: int,
+        room_id: int,
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
     ) -> list[MessageResponse]:
+        """
+        The room history, newest first; the whole of it unless `limit` is
+        given. To page, pass a limit and the id of the oldest message
+        received as `before` to get the page preceding it.
+        """
         try:
             is_member = await RoomService.is_member(db, user_id, room_id)
             if not is_member:
@@ -115,7 +160,9 @@ class MessageService:
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail=f"User ID {user_id} is not a member of room ID {room_id}",
                 )
-            messages = await MessageRepository.get_messages_by_room(db, room_id)
+            messages = await MessageRepository.get_messages_by_room(
+                db, room_id, limit, before
+            )
             if messages is None:
                 return []
 
@@ -455,23 +502,25 @@ class MessageService:
     async def load_context(
         db: AsyncSession, user_id: int, room_id: int
     ) -> ContextLoadResponse:
+        """
+        Chatbot context for a room and user. Served from chat_context_cache
+        when possible; otherwise built from the recent history, the room
+        context, the active plan with its destinations and the active trip,
+        in at most four queries.
+        """
+        started = time.perf_counter()
+        cached = chat_context_cache.get(room_id, user_id)
+        if cached is not None:
+            chat_context_cache.record_latency(True, time.perf_counter() - started)
+            return cached
+
+        token = chat_context_cache.begin()
         try:
-            messages = await MessageRepository.get_messages_by_room(db, room_id)
-
-            history = []
-            if messages:
-                sorted_messages = sorted(messages, key=lambda m: m.created_at)
-                recent_messages = sorted_messages[-20:]
-
-                for msg in recent_messages:
-                    role = "assistant" if msg.sender_id == 0 else "user"
-                    history.append(
-                        MessageHistoryItem(
-                            role=role,
-                            content=msg.content or "",
-                            timestamp=msg.created_at,
-                        )
-                    )
+            messages = await MessageRepository.get_recent_messages(
+                db, room_id, CONTEXT_HISTORY_LIMIT
+            )
+
+            history = [MessageRepository.history_item(msg) for msg in messages]
 
             room_context = await MessageRepository.load_room_context(db, room_id)
 
@@ -481,49 +530,36 @@ class MessageService:
                 user_preferences = UserPreferences(**pref_data) if pref_data else None
 
             active_plan_context = None
-            plans = await PlanRepository.get_plan_by_user_id(db, user_id)
-            if plans and len(plans) > 0:
-                active_plan_id = room_context.get("active_plan_id")
-                if active_plan_id:
-                    plan = await PlanRepository.get_plan_by_id(db, active_plan_id)
-                else:
-                    plan = plans[0]
-
-                if plan:
-                    destinations = await PlanRepository.get_plan_destinations(
-                        db, plan.id
-                    )
-                    dest_contexts = []
-                    for dest in destinations:
-                        dest_contexts.append(
-                            PlanDestinationContext(
-                                id=dest.id,
-                                destination_id=dest.destination_id,
-                                name=(
-                                    dest.destination.name
-                                    if hasattr(dest, "destination") and dest.destination
-                                    else None
-                                ),
-                                visit_date=(
-                                    str(dest.visit_date) if dest.visit_date else None
-                                ),
-                                time_slot=(
-                                    dest.time_slot.value if dest.time_slot else None
-                                ),
-                                order_in_day=dest.order_in_day,
-                                note=dest.note,
-                            )
+            plan = await PlanRepository.get_member_plan_with_destinations(
+                db, user_id, room_context.get("active_plan_id")
+            )
+            if plan:
+                dest_contexts = []
+                for dest in plan.destinations:
+                    dest_contexts.append(
+                        PlanDestinationContext(
+                            id=dest.id,
+                            destination_id=dest.destination_id,
+                            visit_date=(
+                                str(dest.visit_date) if dest.visit_date else None
+                            ),
+                            time_slot=(
+                                dest.time_slot.value if dest.time_slot else None
+                            ),
+                            order_in_day=dest.order_in_day,
+                            note=dest.note,
                         )
-
-                    active_plan_context = ActivePlanContext(
-                        plan_id=plan.id,
-                        place_name=plan.place_name,
-                        start_date=str(plan.start_date) if plan.start_date else None,
-                        end_date=str(plan.end_date) if plan.end_date else None,
-                        budget_limit=plan.budget_limit,
-                        destinations=dest_contexts,
                     )
 
+                active_plan_context = ActivePlanContext(
+                    plan_id=plan.id,
+                    place_name=plan.place_name,
+                    start_date=str(plan.start_date) if plan.start_date else None,
+                    end_date=str(plan.end_date) if plan.end_date else None,
+                    budget_limit=plan.budget_limit,
+                    destinations=dest_contexts,
+                )
+
             conversation_state = ConversationState(
                 current_intent=room_context.get("current_intent"),
                 pending_action=room_context.get("pending_action"),
@@ -557,7 +593,10 @@ class MessageService:
                 trip_id = (
                     trip_data["trip_id"] if isinstance(trip_data, dict) else trip_data
                 )
-                trip = await PlanRepository.get_plan_by_id(db, trip_id)
+                if plan and plan.id == trip_id:
+                    trip = plan
+                else:
+                    trip = await PlanRepository.get_plan_summary(db, trip_id)
 
                 if trip:
                     active_trip = ActiveTripData(
@@ -569,13 +608,19 @@ class MessageService:
                         preferences=room_context.get("trip_preferences", {}),
                     )
 
-            return ContextLoadResponse(
+            context = ContextLoadResponse(
                 history=history,
                 llm_context=llm_context,
                 stored_context=stored_context,
                 active_trip=active_trip,
                 room_context=room_context,
             )
+            plan_ids = {active_plan_context.plan_id} if active_plan_context else set()
+            if active_trip:
+                plan_ids.add(active_trip.trip_id)
+            chat_context_cache.put(room_id, user_id, context, plan_ids, token)
+            chat_context_cache.record_latency(False, time.perf_counter() - started)
+            return context
 
         except HTTPException:
             raise
@@ -587,8 +632,13 @@ class MessageService:
 
     @staticmethod
     async def update_context_with_messages(
-        context: ContextLoadResponse, user_msg: str, bot_msg: str, max_history: int = 20
+        context: ContextLoadResponse, user_msg: str, bot_msg: str, max_history: int = CONTEXT_HISTORY_LIMIT
     ) -> ContextLoadResponse:
+        """
+        Append a chatbot turn to this copy of the context. The cached context
+        is not touched: it picks up the turn when the chatbot persists the
+        two messages.
+        """
         try:
             context.history.append(
                 MessageHistoryItem(
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List
 
 from fastapi import HTTPException, status
@@ -19,7 +20,13 @@ from schemas.plan_schema import (
     PlanResponseBasic,
     PlanUpdate,
 )
-from schemas.route_schema import FindRoutesRequest, RouteCreate, RouteResponse, TransportMode
+from schemas.route_schema import (
+    FindRoutesRequest,
+    RouteCreate,
+    RouteForPlanResponse,
+    RouteResponse,
+    TransportMode,
+)
 from schemas.room_schema import RoomCreate, RoomMemberCreate
 from schemas.route_schema import RouteType
 from services.map_service import MapService
@@ -28,6 +35,7 @@ from services.room_service import RoomService
 from models.room import MemberRole
 from models.plan import PlanDestination, TimeSlot, DestinationType, PlanRole
 from schemas.room_schema import AddMemberRequest
+from utils.config import settings
 
 
 class PlanService:
@@ -142,8 +150,6 @@ class PlanService:
             )
 
             # 3. Add Destinations - OPTIMIZED: First ensure all destinations exist, then add to plan
-            import asyncio
-
             # Step 1: Ensure all destinations exist (handle duplicates)
             unique_place_ids = list(set(dest.destination_id for dest in plan_data.destinations))
             for place_id in unique_place_ids:
@@ -164,61 +170,13 @@ class PlanService:
                 except Exception as e:
                     print(f"Error adding destination {dest_data.destination_id} to plan: {e}")
 
-            # 4. Create routes between consecutive destinations - OPTIMIZED: Parallel processing
-            if len(saved_dest_ids) > 1:
-                saved_destinations = await PlanRepository.get_plan_destinations(db, new_plan.id)
-
-                async def create_route_for_pair(i):
-                    origin = saved_destinations[i]
-                    destination = saved_destinations[i + 1]
-
-                    try:
-                        origin_coords = await MapService.get_coordinates(origin.destination_id)
-                        destination_coords = await MapService.get_coordinates(destination.destination_id)
-
-                        # Validate coordinates before making route request
-                        if not origin_coords or not destination_coords:
-                            print(f"ERROR: Failed to get coordinates for route {i}")
-                            return None
-
-                        route = await RouteService.find_three_optimal_routes(FindRoutesRequest(
-                            origin=origin_coords,
-                            destination=destination_coords
-                        ))
-
-                        if route:
-                            selected_route = None
-                            if RouteType.smart_combination in route.routes:
-                                selected_route = route.routes[RouteType.smart_combination]
-                            else:
-                                selected_route = route.routes[RouteType.low_carbon]
-
-                            await PlanRepository.create_route(db, RouteCreate(
-                                plan_id=new_plan.id,
-                                origin_plan_destination_id=origin.id,
-                                destination_plan_destination_id=destination.id,
-                                distance_km=selected_route.distance,
-                                carbon_emission_kg=selected_route.carbon,
-                                mode=TransportMode.car
-                            ))
-                    except Exception as e:
-                        print(f"Error creating route {i}: {e}")
-                        return None
-
-                # Process all routes in parallel
-                await asyncio.gather(
-                    *[create_route_for_pair(i) for i in range(len(saved_destinations) - 1)],
-                    return_exceptions=True
-                )
-
+            # 4. Route consecutive destinations once and reuse the results for the response
             saved_destinations = await PlanRepository.get_plan_destinations(db, new_plan.id)
-
             list_route = []
-            for i in range(len(saved_destinations) - 1):
-                origin = saved_destinations[i].destination_id
-                destination = saved_destinations[i + 1].destination_id
-                routes = await RouteService.get_route_for_plan(origin, destination)
-                list_route.extend(routes)
+            if len(saved_dest_ids) > 1:
+                list_route = await PlanService._create_plan_routes(
+                    db, new_plan.id, saved_destinations
+                )
 
             return PlanResponse(
                 id=new_plan.id,
@@ -249,6 +207,72 @@ class PlanService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error creating plan: {e}")
 
+    @staticmethod
+    async def _create_plan_routes(
+        db: AsyncSession, plan_id: int, saved_destinations: List[PlanDestination]
+    ) -> List[RouteForPlanResponse]:
+        """
+        Single routing pass for a plan: resolve all coordinates at once, route
+        each consecutive pair once with bounded concurrency, bulk-insert the
+        selected routes and build the response routes from the same results.
+        """
+        coordinates = await MapService.get_coordinates_many(
+            [dest.destination_id for dest in saved_destinations], db=db
+        )
+        semaphore = asyncio.Semaphore(settings.PLAN_ROUTE_CONCURRENCY)
+        pairs = list(zip(saved_destinations, saved_destinations[1:]))
+
+        async def route_pair(i: int, origin: PlanDestination, destination: PlanDestination):
+            origin_coords = coordinates.get(origin.destination_id)
+            destination_coords = coordinates.get(destination.destination_id)
+
+            # Validate coordinates before making route request
+            if not origin_coords or not destination_coords:
+                print(f"WARNING: Skipping route {i} due to invalid coordinates")
+                return None
+
+            async with semaphore:
+                try:
+                    return await RouteService.find_three_optimal_routes(FindRoutesRequest(
+                        origin=origin_coords,
+                        destination=destination_coords
+                    ))
+                except Exception as e:
+                    print(f"Error creating route {i}: {e}")
+                    return None
+
+        results = await asyncio.gather(
+            *[route_pair(i, origin, destination) for i, (origin, destination) in enumerate(pairs)]
+        )
+
+        routes_to_create = []
+        list_route = []
+        for (origin, destination), route in zip(pairs, results):
+            if not route or not route.routes:
+                continue
+
+            selected_route = route.routes.get(
+                RouteType.smart_combination
+            ) or route.routes.get(RouteType.low_carbon)
+            if selected_route:
+                routes_to_create.append(RouteCreate(
+                    plan_id=plan_id,
+                    origin_plan_destination_id=origin.id,
+                    destination_plan_destination_id=destination.id,
+                    distance_km=selected_route.distance,
+                    carbon_emission_kg=selected_route.carbon,
+                    mode=TransportMode.car
+                ))
+
+            list_route.extend(
+                RouteService.build_routes_for_plan(
+                    origin.destination_id, destination.destination_id, route
+                )
+            )
+
+        await PlanRepository.create_routes(db, routes_to_create)
+        return list_route
+
     @staticmethod
     async def update_plan(
         db: AsyncSession, user_id: int, plan_id: int, updated_data: PlanUpdate
@@ -282,49 +306,12 @@ class PlanService:
                 saved_dest = await PlanRepository.add_destination_to_plan(db, plan_id, dest_data)
                 saved_dest_ids.append(saved_dest.id)
 
-            if len(saved_dest_ids) > 1:
-                saved_destinations = await PlanRepository.get_plan_destinations(db, plan_id)
-                for i in range(len(saved_destinations) - 1):
-                    origin = saved_destinations[i]
-                    destination = saved_destinations[i + 1]
-                    
-                    # Get coordinates with validation
-                    origin_coords = await MapService.get_coordinates(origin.destination_id)
-                    destination_coords = await MapService.get_coordinates(destination.destination_id)
-                    
-                    # Skip route creation if coordinates are invalid
-                    if not origin_coords or not destination_coords:
-                        print(f"WARNING: Skipping route creation between destinations {i} and {i+1} due to invalid coordinates")
-                        continue
-                    
-                    route = await RouteService.find_three_optimal_routes(FindRoutesRequest(
-                        origin=origin_coords,
-                        destination=destination_coords
-                    ))
-                    if route:
-                        selected_route = None
-                        if RouteType.smart_combination in route.routes:
-                            selected_route = route.routes[RouteType.smart_combination]
-                        else:
-                            selected_route = route.routes[RouteType.low_carbon]
-
-                        await PlanRepository.create_route(db, RouteCreate(
-                            plan_id=plan_id,
-                            origin_plan_destination_id=origin.id,
-                            destination_plan_destination_id=destination.id,
-                            distance_km=selected_route.distance,
-                            carbon_emission_kg=selected_route.carbon,
-                            mode=TransportMode.car
-                        ))
-
             saved_destinations = await PlanRepository.get_plan_destinations(db, updated_plan.id)
-
             list_route = []
-            for i in range(len(saved_destinations) - 1):
-                origin = saved_destinations[i].destination_id
-                destination = saved_destinations[i + 1].destination_id
-                routes = await RouteService.get_route_for_plan(origin, destination)
-                list_route.extend(routes)
+            if len(saved_dest_ids) > 1:
+                list_route = await PlanService._create_plan_routes(
+                    db, plan_id, saved_destinations
+                )
 
             return PlanResponse(
                 id=updated_plan.id,
@@ -10,7 +10,13 @@ from repository.cluster_repository import ClusterRepository
 from schemas.recommendation_schema import RecommendationResponse, RecommendationScore, RecommendationDestination
 from schemas.destination_schema import DestinationCreate
 from services.cluster_service import ClusterService
-from utils.embedded.faiss_utils import is_index_ready, search_index
+from utils.config import settings
+from utils.embedded.faiss_utils import (
+    is_index_ready,
+    score_destinations,
+    search_index,
+    search_index_batch,
+)
 from schemas.map_schema import (
     TextSearchRequest,
     Location,
@@ -22,12 +28,18 @@ from schemas.map_schema import (
     PhotoInfo,
 )
 
+# Recommendations stored per cluster after each clustering run
+PRECOMPUTED_RECOMMENDATIONS_PER_CLUSTER = 50
+# Hybrid score weights; stored recommendations are ranked with these
+DEFAULT_SIMILARITY_WEIGHT = 0.7
+DEFAULT_POPULARITY_WEIGHT = 0.3
+
 
 def blend_scores(
     similarity_items: List[Dict[str, Any]],
     popularity_items: List[Dict[str, Any]],
-    similarity_weight: float = 0.7,
-    popularity_weight: float = 0.3,
+    similarity_weight: float = DEFAULT_SIMILARITY_WEIGHT,
+    popularity_weight: float = DEFAULT_POPULARITY_WEIGHT,
     k: int = 20,
 ) -> RecommendationScore:
     try:
@@ -35,8 +47,10 @@ def blend_scores(
 
         for item in similarity_items:
             dest_id = item["destination_id"]
+            # Cosine scores can be negative; treat those as no similarity so
+            # they stay on the same 0-1 scale as popularity.
             destination_scores[dest_id] = {
-                "similarity": item.get("similarity_score", 0),
+                "similarity": max(0.0, item.get("similarity_score", 0)),
                 "popularity": 0.0,
             }
 
@@ -75,6 +89,36 @@ class RecommendationService:
         if not is_index_ready():
             raise RuntimeError("FAISS index is not available.")
 
+    @staticmethod
+    async def compute_destination_affinities(
+        db: AsyncSession, cluster_vector: np.ndarray, destination_ids: List[str]
+    ) -> Dict[str, float]:
+        """
+        Cosine similarity between a cluster vector and each destination,
+        scored with one matrix-vector product. The FAISS index holds every
+        stored embedding (it is updated as embeddings are saved), so ids it
+        does not know have no embedding; the database is only read when the
+        index is unavailable. Destinations without an embedding are omitted.
+        """
+        if is_index_ready():
+            return score_destinations(cluster_vector, destination_ids)
+
+        affinities = {}
+        embeddings_list = await DestinationRepository.get_embeddings_by_ids(
+            db, destination_ids
+        )
+        if not embeddings_list:
+            return affinities
+
+        ids = [emb.destination_id for emb in embeddings_list]
+        matrix = np.vstack([emb.get_array() for emb in embeddings_list])
+        cluster_vec = np.asarray(cluster_vector, dtype=np.float32)
+        scores = (matrix @ cluster_vec) / (
+            np.linalg.norm(matrix, axis=1) * np.linalg.norm(cluster_vec) + 1e-8
+        )
+        affinities.update(zip(ids, scores.astype(float).tolist()))
+        return affinities
+
     '''Change to receive TextSearchResponse and user_id'''
     @staticmethod
     async def sort_recommendations_by_user_cluster_affinity(
@@ -88,37 +132,16 @@ class RecommendationService:
             if user_cluster is None:
                 return response
 
-            cluster_vector = await ClusterService.compute_cluster_embedding(db, user_cluster)
+            cluster_vector = await ClusterService.get_cluster_centroid(db, user_cluster)
             if cluster_vector is None:
                 return response
 
             place_ids = [p.place_id for p in response.results]
-            embeddings_list = await DestinationRepository.get_embeddings_by_ids(db, place_ids)
-
-            # Chuẩn hoá embeddings
-            dest_embeddings = {}
-            if isinstance(embeddings_list, list):
-                for emb in embeddings_list:
-                    dest_embeddings[emb.destination_id] = emb.get_vector()
-            else:
-                dest_embeddings = embeddings_list
-
-            cluster_vec = np.array(cluster_vector, dtype=np.float32)
 
             #  Tạo một map: id → affinity (không chạm vào object)
-            affinities = {}
-
-            for place in response.results:
-                if place.place_id in dest_embeddings:
-                    dest_vec = np.array(dest_embeddings[place.place_id], dtype=np.float32)
-                    affinity = float(
-                        np.dot(cluster_vec, dest_vec)
-                        / (np.linalg.norm(cluster_vec) * np.linalg.norm(dest_vec) + 1e-8)
-                    )
-                else:
-                    affinity = 0.0
-
-                affinities[place.place_id] = affinity
+            affinities = await RecommendationService.compute_destination_affinities(
+                db, cluster_vector, place_ids
+            )
 
             #  Sort kết quả theo map affinity
             response.results.sort(
@@ -167,13 +190,13 @@ class RecommendationService:
             )
 
     @staticmethod
-    async def recommend_for_cluster_hybrid(
-        db: AsyncSession,
-        cluster_id: int,
-        k: int = 20,
-        similarity_weight: float = 0.7,
-        popularity_weight: float = 0.3,
-    ) -> RecommendationResponse:
+    async def recommend_for_users(
+        db: AsyncSession, user_ids: List[int], k: int = 10
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        FAISS recommendations for many users in one batched search, using the
+        stored preference embeddings. Users without an embedding are omitted.
+        """
         try:
             if not is_index_ready():
                 raise HTTPException(
@@ -181,38 +204,90 @@ class RecommendationService:
                     detail="FAISS index is not available",
                 )
 
-            cluster_vector = await ClusterService.compute_cluster_embedding(
-                db, cluster_id
+            rows = await ClusterRepository.get_embeddings_by_user_ids(db, user_ids)
+            if not rows:
+                return {}
+
+            found_ids = [row[0] for row in rows]
+            query_matrix = np.vstack([row[1] for row in rows])
+            results = search_index_batch(query_matrix, k=k)
+            return dict(zip(found_ids, results))
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error generating recommendations for users: {str(e)}",
             )
-            if cluster_vector is None:
+
+    @staticmethod
+    async def recommend_for_clusters(
+        db: AsyncSession,
+        cluster_ids: List[int],
+        k: int = 20,
+        similarity_weight: float = DEFAULT_SIMILARITY_WEIGHT,
+        popularity_weight: float = DEFAULT_POPULARITY_WEIGHT,
+        persist: bool = True,
+    ) -> Dict[int, RecommendationResponse]:
+        """
+        Hybrid recommendations for many clusters: one batched FAISS search
+        over all cluster centroids, blended with each cluster's popularity.
+        With persist=True the results replace the cluster_recommendations rows.
+        """
+        try:
+            if not is_index_ready():
                 raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Could not compute embedding for cluster {cluster_id}",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="FAISS index is not available",
                 )
 
-            similar_destinations = search_index(cluster_vector.tolist(), k=k * 2)
+            centroid_ids, centroids = [], []
+            for cluster_id in cluster_ids:
+                vector = await ClusterService.get_cluster_centroid(db, cluster_id)
+                if vector is not None:
+                    centroid_ids.append(cluster_id)
+                    centroids.append(vector)
 
-            await ClusterService.compute_cluster_popularity(db, cluster_id)
+            if not centroids:
+                return {}
 
-            popular_destinations_raw = (
-                await ClusterRepository.get_destinations_in_cluster(db, cluster_id)
-            )
+            similar_rows = search_index_batch(np.vstack(centroids), k=k * 2)
 
-            popular_destinations: List[Dict[str, Any]] = [
-                {
-                    "destination_id": dest.destination_id,
-                    "popularity_score": (dest.popularity_score or 0) / 100.0,
-                }
-                for dest in popular_destinations_raw
-            ]
+            results: Dict[int, RecommendationResponse] = {}
+            for cluster_id, similar_destinations in zip(centroid_ids, similar_rows):
+                popular_destinations_raw = (
+                    await ClusterRepository.get_destinations_in_cluster(db, cluster_id)
+                )
+                popular_destinations = [
+                    {
+                        "destination_id": dest.destination_id,
+                        "popularity_score": (dest.popularity_score or 0) / 100.0,
+                    }
+                    for dest in popular_destinations_raw
+                ]
+                results[cluster_id] = blend_scores(
+                    similar_destinations,
+                    popular_destinations,
+                    similarity_weight,
+                    popularity_weight,
+                    k,
+                )
 
-            results = blend_scores(
-                similar_destinations,
-                popular_destinations,
-                similarity_weight,
-                popularity_weight,
-                k,
-            )
+            if persist:
+                stored = await ClusterRepository.replace_cluster_recommendations(
+                    db,
+                    {
+                        cluster_id: response.recommendations
+                        for cluster_id, response in results.items()
+                    },
+                    settings.CLUSTERING_WRITE_CHUNK_SIZE,
+                )
+                if not stored:
+                    print(
+                        f"WARNING: Cluster recommendations for {len(results)} clusters "
+                        f"were not stored; they will be computed on demand"
+                    )
 
             return results
 
@@ -221,9 +296,82 @@ class RecommendationService:
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error generating hybrid recommendations for cluster {cluster_id}: {str(e)}",
+                detail=f"Error generating recommendations for clusters: {str(e)}",
             )
 
+    @staticmethod
+    async def get_precomputed_cluster_recommendations(
+        db: AsyncSession, cluster_id: int, k: int = 20
+    ) -> Optional[RecommendationResponse]:
+        rows = await ClusterRepository.get_cluster_recommendations(db, cluster_id, k)
+        if not rows:
+            return None
+        return RecommendationResponse(
+            recommendations=[
+                RecommendationScore(
+                    destination_id=row.destination_id,
+                    hybrid_score=row.hybrid_score,
+                    similarity_score=row.similarity_score,
+                    popularity_score=row.popularity_score,
+                )
+                for row in rows
+            ]
+        )
+
+    @staticmethod
+    async def recommend_for_cluster_hybrid(
+        db: AsyncSession,
+        cluster_id: int,
+        k: int = 20,
+        similarity_weight: float = DEFAULT_SIMILARITY_WEIGHT,
+        popularity_weight: float = DEFAULT_POPULARITY_WEIGHT,
+    ) -> RecommendationResponse:
+        # Served from the table filled after each clustering run; computed on
+        # the fly for clusters created since then, and for other weights
+        # since the stored rows are ranked with the defaults.
+        if (
+            k <= PRECOMPUTED_RECOMMENDATIONS_PER_CLUSTER
+            and similarity_weight == DEFAULT_SIMILARITY_WEIGHT
+            and popularity_weight == DEFAULT_POPULARITY_WEIGHT
+        ):
+            precomputed = (
+                await RecommendationService.get_precomputed_cluster_recommendations(
+                    db, cluster_id, k
+                )
+            )
+            if precomputed is not None:
+                return precomputed
+
+        await ClusterService.compute_cluster_popularity(db, cluster_id)
+        results = await RecommendationService.recommend_for_clusters(
+            db,
+            [cluster_id],
+            k=k,
+            similarity_weight=similarity_weight,
+            popularity_weight=popularity_weight,
+            persist=False,
+        )
+        if cluster_id not in results:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Could not compute embedding for cluster {cluster_id}",
+            )
+        return results[cluster_id]
+
+    @staticmethod
+    async def recommend_cluster_hybrid_for_user(
+        db: AsyncSession, user_id: int, k: int = 20
+    ) -> RecommendationResponse:
+        cluster_id = await ClusterRepository.get_user_latest_cluster(db, user_id)
+        if cluster_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User {user_id} has no cluster assignment yet",
+            )
+        return await RecommendationService.recommend_for_cluster_hybrid(
+            db, cluster_id, k=k
+        )
+
     @staticmethod
     async def recommend_nearby_by_cluster_tags(
         db: AsyncSession,
@@ -507,7 +655,7 @@ class RecommendationService:
                     return RecommendationDestination(recommendation=[])
 
             # Step 2: Compute cluster embedding (mean of user embeddings)
-            cluster_vector = await ClusterService.compute_cluster_embedding(db, user_cluster)
+            cluster_vector = await ClusterService.get_cluster_centroid(db, user_cluster)
             if cluster_vector is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -527,10 +675,10 @@ class RecommendationService:
                     # Try to build index on-demand
                     try:
                         from database.db import get_sync_session
-                        from utils.embedded.faiss_utils import build_index
+                        from utils.embedded.faiss_utils import load_or_build_index
                         print("🔧 Attempting to build FAISS index on-demand...")
                         with get_sync_session() as sync_db:
-                            success = build_index(sync_db, normalize=False)
+                            success = load_or_build_index(sync_db, normalize=False)
                             if not success:
                                 print("❌ FAISS index build failed, returning empty recommendations")
                                 return RecommendationDestination(recommendation=[])
@@ -548,38 +696,20 @@ class RecommendationService:
             # Extract destination IDs
             destination_ids = [dest.destination_id for dest in cluster_destinations]
 
-            # Get destination embeddings in batch
-            embeddings_list = await DestinationRepository.get_embeddings_by_ids(db, destination_ids)
-
-            # Normalize embeddings into a dictionary for O(1) lookup
-            dest_embeddings = {}
-            if isinstance(embeddings_list, list):
-                for emb in embeddings_list:
-                    dest_embeddings[emb.destination_id] = emb.get_vector()
-            else:
-                dest_embeddings = embeddings_list
-
-            # Convert cluster vector to numpy array and pre-compute norm
-            cluster_vec = np.array(cluster_vector, dtype=np.float32)
-            cluster_norm = np.linalg.norm(cluster_vec)
+            # Step 4: Cosine affinity for every destination, read from the index
+            affinities = await RecommendationService.compute_destination_affinities(
+                db, cluster_vector, destination_ids
+            )
 
-            # Step 4: Calculate affinity scores for each destination
             recommendations = []
             for dest in cluster_destinations:
                 dest_id = dest.destination_id
 
                 # Skip if no embedding available
-                if dest_id not in dest_embeddings:
+                if dest_id not in affinities:
                     continue
 
-                # Get destination vector
-                dest_vec = np.array(dest_embeddings[dest_id], dtype=np.float32)
-                dest_norm = np.linalg.norm(dest_vec)
-
-                # Calculate cosine similarity (affinity score)
-                affinity_score = float(
-                    np.dot(cluster_vec, dest_vec) / (cluster_norm * dest_norm + 1e-8)
-                )
+                affinity_score = affinities[dest_id]
 
                 # Normalize popularity score to 0-1 range
                 popularity_normalized = (dest.popularity_score or 0.0) / 100.0
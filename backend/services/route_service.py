@@ -1,4 +1,6 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
 
@@ -9,10 +11,12 @@ from services.map_service import MapService
 from schemas.route_schema import (
     DirectionsRequest,
     DirectionsResponse,
+    FindRoutesDebug,
     FindRoutesRequest,
     FindRoutesResponse,
     RecommendResponse,
     RouteData,
+    RouteModeTiming,
     RouteType,
     TransitDetails,
     TransitStep,
@@ -23,6 +27,8 @@ from schemas.route_schema import (
 )
 from services.carbon_service import CarbonService
 from models.plan import PlanDestination
+from utils.config import settings
+from utils.maps.route_cache import route_cache, route_cache_key, route_cache_ttl
 import math
 
 
@@ -147,20 +153,48 @@ class RouteService:
                     detail="Invalid route data: missing legs information",
                 )
 
-            leg = route["legs"][0]
-            distance_km = leg["distance"]
-            duration_min = leg["duration"]
-
-            carbon_response = await CarbonService.estimate_transport_emission(
-                mode, distance_km
+            return RouteService.process_routes_batch([(route, mode, route_type)])[0]
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to process route data: {str(e)}",
             )
 
+    @staticmethod
+    def process_routes_batch(
+        candidates: List[Tuple[Dict[str, Any], TransportMode, RouteType]],
+    ) -> List[RouteData]:
+        """
+        Build RouteData for many candidate routes at once. Carbon for the whole
+        batch is estimated in a single vectorised call; candidates with
+        missing leg data are skipped instead of failing the batch.
+        """
+        valid = []
+        for route, mode, route_type in candidates:
+            if not route or "legs" not in route or not route["legs"]:
+                print(f"WARNING: Skipping {mode.value} route with missing legs information")
+                continue
+            valid.append((route, mode, route_type))
+
+        if not valid:
+            return []
+
+        carbons = CarbonService.estimate_many(
+            [mode for _, mode, _ in valid],
+            [route["legs"][0]["distance"] for route, _, _ in valid],
+        )
+
+        results = []
+        for (route, mode, route_type), carbon in zip(valid, carbons):
+            leg = route["legs"][0]
             result = RouteData(
                 type=route_type,
                 mode=[mode],
-                distance=distance_km,
-                duration=duration_min,
-                carbon=carbon_response,
+                distance=leg["distance"],
+                duration=leg["duration"],
+                carbon=carbon,
                 route_details=route,
             )
 
@@ -169,28 +203,70 @@ class RouteService:
                     result.transit_info = RouteService.extract_transit_details(leg)
                 except Exception as e:
                     print(f"WARNING: Failed to extract transit details: {e}")
-                    # Set empty transit info instead of failing
                     result.transit_info = TransitDetails(
                         transit_steps=[],
                         walking_steps=[],
                         total_transit_steps=0,
                         total_walking_steps=0,
                     )
+            results.append(result)
 
-            return result
-        except HTTPException:
-            raise
+        return results
+
+    @staticmethod
+    async def _timed_route_request(
+        name: str,
+        fetch: Callable[[], Awaitable[DirectionsResponse]],
+        timeout: float,
+        cache_key: str,
+        cache_ttl: int,
+    ) -> Tuple[str, DirectionsResponse, RouteModeTiming]:
+        """
+        Resolve one upstream mode request from the route cache or Google,
+        never raising, and record its latency.
+        """
+        started = time.perf_counter()
+        cached = await route_cache.get(cache_key, DirectionsResponse)
+        if cached is not None:
+            timing = RouteModeTiming(
+                status="cached",
+                latency_ms=(time.perf_counter() - started) * 1000,
+                routes=len(cached.routes),
+            )
+            return name, cached, timing
+
+        try:
+            result = await asyncio.wait_for(fetch(), timeout=timeout)
+            result = result or DirectionsResponse(routes=[])
+            timing = RouteModeTiming(
+                status="ok",
+                latency_ms=(time.perf_counter() - started) * 1000,
+                routes=len(result.routes),
+            )
+            await route_cache.set(cache_key, result, cache_ttl)
+            return name, result, timing
+        except asyncio.TimeoutError:
+            print(f"{name} routes timed out after {timeout}s")
+            timing = RouteModeTiming(
+                status="timeout",
+                latency_ms=(time.perf_counter() - started) * 1000,
+                error=f"Timed out after {timeout}s",
+            )
         except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to process route data: {str(e)}",
+            print(f"{name} routes not available: {str(e)}")
+            timing = RouteModeTiming(
+                status="error",
+                latency_ms=(time.perf_counter() - started) * 1000,
+                error=str(e),
             )
+        return name, DirectionsResponse(routes=[]), timing
 
     @staticmethod
     async def find_three_optimal_routes(
         request: FindRoutesRequest,
     ) -> FindRoutesResponse:
         try:
+            started = time.perf_counter()
             origin = request.origin
             destination = request.destination
             max_time_ratio = request.max_time_ratio
@@ -208,104 +284,147 @@ class RouteService:
                     detail="max_time_ratio must be greater than 0",
                 )
 
+            # The combined response includes transit, so it expires with it
+            optimal_key = route_cache_key(
+                "optimal", origin, destination, "all", language, extra=str(max_time_ratio)
+            )
+            cached = await route_cache.get(optimal_key, FindRoutesResponse)
+            if cached is not None:
+                return cached.model_copy(
+                    update={
+                        "origin": Location(lat=origin.latitude, lng=origin.longitude),
+                        "destination": Location(
+                            lat=destination.latitude, lng=destination.longitude
+                        ),
+                        "debug": FindRoutesDebug(
+                            cache_hit=True,
+                            total_ms=(time.perf_counter() - started) * 1000,
+                        ),
+                    }
+                )
+
             routes_dict = {}
+            routes = None
+            debug = FindRoutesDebug()
 
             try:
                 routes = await create_route_api_client()
 
-                driving_alternatives = await routes.get_routes(
-                    data=DirectionsRequest(
-                        origin=origin, destination=destination, alternatives=True
-                    ),
-                    mode=TransportMode.car,
-                    language=language,
-                )
-
-                # Try to get transit routes, but don't fail if unavailable
-                transit_result = None
-                try:
-                    transit_result = await routes.get_routes(
-                        data=DirectionsRequest(
-                            origin=origin, destination=destination, alternatives=True
-                        ),
-                        mode=TransportMode.bus,
-                        language=language,
+                # Issue every mode request concurrently; a failing or slow mode
+                # only loses its own candidates.
+                def directions_key(name: str, mode: TransportMode) -> str:
+                    return route_cache_key(
+                        "directions", origin, destination, f"{name}-{mode.value}", language
                     )
-                except Exception as e:
-                    print(f"Transit routes not available: {str(e)}")
-                    transit_result = DirectionsResponse(routes=[])
 
-                walking_result = await routes.get_routes(
-                    data=DirectionsRequest(origin=origin, destination=destination),
-                    mode=TransportMode.walking,
-                    language=language,
+                mode_results = await asyncio.gather(
+                    RouteService._timed_route_request(
+                        "driving",
+                        lambda: routes.get_routes(
+                            data=DirectionsRequest(
+                                origin=origin, destination=destination, alternatives=True
+                            ),
+                            mode=TransportMode.car,
+                            language=language,
+                        ),
+                        settings.ROUTE_DRIVING_TIMEOUT_SECONDS,
+                        directions_key("driving", TransportMode.car),
+                        route_cache_ttl(TransportMode.car.value),
+                    ),
+                    # Google may not return explicit eco labels, but this
+                    # preference optimizes for fuel efficiency
+                    RouteService._timed_route_request(
+                        "eco",
+                        lambda: routes.get_eco_friendly_route(
+                            data=DirectionsRequest(
+                                origin=origin, destination=destination, alternatives=True
+                            ),
+                            mode=TransportMode.car,
+                            vehicle_type="GASOLINE",
+                            language=language,
+                        ),
+                        settings.ROUTE_ECO_TIMEOUT_SECONDS,
+                        directions_key("eco", TransportMode.car),
+                        route_cache_ttl(TransportMode.car.value),
+                    ),
+                    RouteService._timed_route_request(
+                        "transit",
+                        lambda: routes.get_routes(
+                            data=DirectionsRequest(
+                                origin=origin, destination=destination, alternatives=True
+                            ),
+                            mode=TransportMode.bus,
+                            language=language,
+                        ),
+                        settings.ROUTE_TRANSIT_TIMEOUT_SECONDS,
+                        directions_key("transit", TransportMode.bus),
+                        route_cache_ttl(TransportMode.bus.value),
+                    ),
+                    RouteService._timed_route_request(
+                        "walking",
+                        lambda: routes.get_routes(
+                            data=DirectionsRequest(origin=origin, destination=destination),
+                            mode=TransportMode.walking,
+                            language=language,
+                        ),
+                        settings.ROUTE_WALKING_TIMEOUT_SECONDS,
+                        directions_key("walking", TransportMode.walking),
+                        route_cache_ttl(TransportMode.walking.value),
+                    ),
                 )
 
-                all_routes = []
+                results_by_mode = {}
+                for name, result, timing in mode_results:
+                    results_by_mode[name] = result
+                    debug.mode_timings[name] = timing
 
-                if driving_alternatives.routes:
-                    for idx, route in enumerate(driving_alternatives.routes):
-                        route_type = (
-                            RouteType.fastest if idx == 0 else RouteType.fastest
-                        )
+                processing_started = time.perf_counter()
 
-                        route_data = await RouteService.process_route_data(
-                            route.model_dump(), TransportMode.car, route_type
+                driving_candidates = [
+                    (route.model_dump(), TransportMode.car, RouteType.fastest)
+                    for route in results_by_mode["driving"].routes
+                ]
+                # The actual "eco-friendliness" is determined by carbon calculation
+                eco_candidates = [
+                    (route.model_dump(), TransportMode.car, RouteType.low_carbon)
+                    for route in results_by_mode["eco"].routes
+                ]
+                other_candidates = [
+                    (route.model_dump(), TransportMode.bus, RouteType.smart_combination)
+                    for route in results_by_mode["transit"].routes
+                ]
+                walking_routes = results_by_mode["walking"].routes
+                if walking_routes and walking_routes[0].distance <= 3.0:
+                    other_candidates.append(
+                        (
+                            walking_routes[0].model_dump(),
+                            TransportMode.walking,
+                            RouteType.smart_combination,
                         )
-                        all_routes.append(route_data)
-
-                # Get eco-friendly routes using TRAFFIC_AWARE_OPTIMAL
-                # Note: Google may not return explicit eco labels, but this preference
-                # optimizes for fuel efficiency
-                try:
-                    eco_result = await routes.get_eco_friendly_route(
-                        data=DirectionsRequest(
-                            origin=origin, destination=destination, alternatives=True
-                        ),
-                        mode=TransportMode.car,
-                        vehicle_type="GASOLINE",
-                        language=language,
                     )
 
-                    # Process eco routes and add to all_routes
-                    # The actual "eco-friendliness" will be determined by carbon calculation
-                    if eco_result and eco_result.routes:
-                        for eco_route in eco_result.routes:
-                            eco_route_data = await RouteService.process_route_data(
-                                eco_route.model_dump(), TransportMode.car, RouteType.low_carbon
-                            )
-                            # Only add if not duplicate (check by distance + duration)
-                            is_duplicate = any(
-                                abs(r.distance - eco_route_data.distance) < 0.1 and
-                                abs(r.duration - eco_route_data.duration) < 1
-                                for r in all_routes
-                            )
-                            if not is_duplicate:
-                                all_routes.append(eco_route_data)
-                except Exception as e:
-                    print(f"Eco route request failed (will use carbon-based selection): {str(e)}")
-                    eco_result = None
-
-                if transit_result and transit_result.routes:
-                    for idx, route in enumerate(transit_result.routes):
-                        route_type = RouteType.smart_combination
-
-                        route_data = await RouteService.process_route_data(
-                            route.model_dump(), TransportMode.bus, route_type
-                        )
-                        all_routes.append(route_data)
+                processed = RouteService.process_routes_batch(
+                    driving_candidates + eco_candidates + other_candidates
+                )
+                driving_processed = [r for r in processed if r.type == RouteType.fastest]
+                eco_processed = [r for r in processed if r.type == RouteType.low_carbon]
+                other_processed = [
+                    r for r in processed if r.type == RouteType.smart_combination
+                ]
 
-                if walking_result.routes:
-                    route = walking_result.routes[0]
-                    distance_km = route.distance
+                all_routes = list(driving_processed)
+                for eco_route_data in eco_processed:
+                    # Only add if not duplicate (check by distance + duration)
+                    is_duplicate = any(
+                        abs(r.distance - eco_route_data.distance) < 0.1 and
+                        abs(r.duration - eco_route_data.duration) < 1
+                        for r in all_routes
+                    )
+                    if not is_duplicate:
+                        all_routes.append(eco_route_data)
+                all_routes.extend(other_processed)
 
-                    if distance_km <= 3.0:
-                        route_data = await RouteService.process_route_data(
-                            route.model_dump(),
-                            TransportMode.walking,
-                            RouteType.smart_combination,
-                        )
-                        all_routes.append(route_data)
+                debug.processing_ms = (time.perf_counter() - processing_started) * 1000
 
                 if not all_routes:
                     raise HTTPException(
@@ -355,15 +474,19 @@ class RouteService:
                 if smart_route_data:
                     routes_dict[RouteType.smart_combination] = smart_route_data
 
+                recommendation_started = time.perf_counter()
                 recommendation = await RouteService.generate_route_recommendation(
                     routes_dict, fastest_route, lowest_carbon_route
                 )
+                debug.recommendation_ms = (
+                    time.perf_counter() - recommendation_started
+                ) * 1000
 
             finally:
                 if routes:
                     await routes.close()
 
-            return FindRoutesResponse(
+            response = FindRoutesResponse(
                 origin=Location(
                     lat=origin.latitude, lng=origin.longitude
                 ),
@@ -373,6 +496,24 @@ class RouteService:
                 routes=routes_dict,
                 recommendation=recommendation.recommendation,
             )
+            # A mode that timed out or failed contributed no routes; caching that
+            # response would hide those routes for the whole cell until the TTL.
+            # Modes that succeeded are already cached individually.
+            if all(
+                timing.status in ("ok", "cached")
+                for timing in debug.mode_timings.values()
+            ):
+                await route_cache.set(
+                    optimal_key, response, route_cache_ttl(TransportMode.bus.value)
+                )
+
+            return response.model_copy(
+                update={
+                    "debug": debug.model_copy(
+                        update={"total_ms": (time.perf_counter() - started) * 1000}
+                    )
+                }
+            )
 
         except HTTPException:
             raise
@@ -611,12 +752,16 @@ Provide a concise recommendation that balances environmental impact and convenie
         # Average speed in city (km/h) - used for time calculation
         AVG_SPEED_KMH = 30
 
+        coordinates = await MapService.get_coordinates_many(
+            [dest.destination_id for dest in sorted_dests]
+        )
+
         for i in range(len(sorted_dests) - 1):
             start_node = sorted_dests[i]
             end_node = sorted_dests[i + 1]
 
-            start_coords = await MapService.get_coordinates(start_node.destination_id)
-            end_coords = await MapService.get_coordinates(end_node.destination_id)
+            start_coords = coordinates.get(start_node.destination_id)
+            end_coords = coordinates.get(end_node.destination_id)
 
             if not start_coords or not end_coords:
                 continue
@@ -653,13 +798,49 @@ Provide a concise recommendation that balances environmental impact and convenie
             details=route_details,
         )
 
+    @staticmethod
+    def build_routes_for_plan(
+        origin: str,
+        destination: str,
+        result: FindRoutesResponse,
+        transport_mode: TransportMode = TransportMode.car,
+    ) -> List[RouteForPlanResponse]:
+        """Flatten a FindRoutesResponse into RouteForPlanResponse items for a plan leg."""
+        list_response = []
+        for route_type, route_data in result.routes.items():
+            # Filter by transport_mode if specified and not default
+            if transport_mode != TransportMode.car and transport_mode not in route_data.mode:
+                continue
+
+            # Extract polyline from the Route object stored in route_details dict
+            polyline = ""
+            if isinstance(route_data.route_details, dict) and "overview_polyline" in route_data.route_details:
+                polyline = route_data.route_details["overview_polyline"]
+            elif hasattr(route_data.route_details, "overview_polyline"):
+                polyline = route_data.route_details.overview_polyline
+
+            list_response.append(
+                RouteForPlanResponse(
+                    origin=origin,
+                    destination=destination,
+                    distance_km=route_data.distance,
+                    estimated_travel_time_min=route_data.duration,
+                    carbon_emission_kg=route_data.carbon,
+                    route_polyline=polyline,
+                    transport_mode=route_data.mode[0] if route_data.mode else transport_mode,
+                    route_type=route_type,
+                )
+            )
+        return list_response
+
     @staticmethod
     async def get_route_for_plan(
         origin: str, destination: str, transport_mode: TransportMode = TransportMode.car
 ) -> List[RouteForPlanResponse]:
         try:
-            origin_coords = await MapService.get_coordinates(place_id=origin)
-            destination_coords = await MapService.get_coordinates(place_id=destination)
+            coordinates = await MapService.get_coordinates_many([origin, destination])
+            origin_coords = coordinates.get(origin)
+            destination_coords = coordinates.get(destination)
 
             if not origin_coords or not destination_coords:
                 raise HTTPException(
@@ -677,32 +858,9 @@ Provide a concise recommendation that balances environmental impact and convenie
                     detail="No route found between the specified locations",
                 )
 
-            list_response = []
-            for route_type, route_data in result.routes.items():
-                # Filter by transport_mode if specified and not default
-                if transport_mode != TransportMode.car and transport_mode not in route_data.mode:
-                    continue
-
-                # Extract polyline from the Route object stored in route_details dict
-                polyline = ""
-                if isinstance(route_data.route_details, dict) and "overview_polyline" in route_data.route_details:
-                    polyline = route_data.route_details["overview_polyline"]
-                elif hasattr(route_data.route_details, "overview_polyline"):
-                    polyline = route_data.route_details.overview_polyline
-
-                list_response.append(
-                    RouteForPlanResponse(
-                        origin=origin,
-                        destination=destination,
-                        distance_km=route_data.distance,
-                        estimated_travel_time_min=route_data.duration,
-                        carbon_emission_kg=route_data.carbon,
-                        route_polyline=polyline,
-                        transport_mode=route_data.mode[0] if route_data.mode else transport_mode,
-                        route_type=route_type,
-                    )
-                )
-            return list_response
+            return RouteService.build_routes_for_plan(
+                origin, destination, result, transport_mode
+            )
         except HTTPException:
             raise
         except Exception as e:
@@ -710,3 +868,7 @@ Provide a concise recommendation that balances environmental impact and convenie
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to get route for plan: {str(e)}",
             )
+
+    @staticmethod
+    def get_route_cache_stats() -> dict:
+        return route_cache.stats()
@@ -1,50 +1,262 @@
-from typing import Dict, List
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
 
 from fastapi import WebSocket
 
+from utils.config import settings
+from utils.socket_backplane import InProcessBackplane, SocketBackplane, create_backplane
+
+# SOCKET_OVERFLOW_POLICY value that closes a connection whose send queue is
+# full; any other value ("drop_oldest") discards its oldest queued message
+DISCONNECT = "disconnect"
+
+
+class RoomFanoutStats:
+    """Delay between a room message being queued and written to each socket."""
+
+    def __init__(self, window: int = 256):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.messages = 0
+        self.deliveries = 0
+        self.dropped = 0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float):
+        self.deliveries += 1
+        self.samples.append(latency_ms)
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "messages": self.messages,
+            "deliveries": self.deliveries,
+            "dropped": self.dropped,
+            "avg_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "p95_ms": (
+                round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2)
+                if ordered else 0.0
+            ),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class SocketConnection:
+    """
+    One WebSocket with a bounded outbound queue drained by its own writer
+    task, so a slow client only delays its own messages.
+    """
+
+    def __init__(self, service: "SocketService", websocket: WebSocket, room_id: int, user_id: int):
+        self.service = service
+        self.websocket = websocket
+        self.room_id = room_id
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SOCKET_SEND_QUEUE_SIZE)
+        self.writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    def enqueue(self, text: str) -> bool:
+        """Queue a serialized message; False when the connection was dropped instead."""
+        item = (text, time.perf_counter())
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        stats = self.service.room_stats(self.room_id)
+        stats.dropped += 1
+        if settings.SOCKET_OVERFLOW_POLICY == DISCONNECT:
+            self.service.evict(self, reason="send queue full")
+            return False
+        self.queue.get_nowait()
+        self.queue.put_nowait(item)
+        return True
+
+    async def _write_loop(self):
+        stats = self.service.room_stats(self.room_id)
+        while True:
+            text, queued_at = await self.queue.get()
+            try:
+                await asyncio.wait_for(
+                    self.websocket.send_text(text), settings.SOCKET_SEND_TIMEOUT_SECONDS
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.service.evict(self, reason=str(e) or type(e).__name__)
+                return
+            stats.record((time.perf_counter() - queued_at) * 1000)
+
+    def stop(self):
+        if self.writer is not None and not self.writer.done():
+            self.writer.cancel()
+
 
 class SocketService:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
-        self.user_connections: Dict[int, Dict[int, WebSocket]] = {}
+    """
+    Holds this worker's WebSocket connections. Room broadcasts and user
+    notifications are published once on the backplane, and every worker
+    delivers them to the sockets it holds, so chat works with any number
+    of API workers. A message is serialized once and queued on each
+    member's connection; connections that fail a send are evicted.
+    """
+
+    def __init__(self, backplane: Optional[SocketBackplane] = None):
+        self.active_connections: Dict[int, List[SocketConnection]] = {}
+        self.user_connections: Dict[int, Dict[int, SocketConnection]] = {}
+        self.backplane = backplane or InProcessBackplane()
+        self._started = False
+        self._room_stats: Dict[int, RoomFanoutStats] = {}
+        self.evicted = 0
+
+    async def start(self, backplane: Optional[SocketBackplane] = None):
+        if backplane is not None:
+            self.backplane = backplane
+        await self.backplane.start(self._deliver)
+        self._started = True
+
+    async def close(self):
+        await self.backplane.close()
+        self._started = False
+        for connections in list(self.active_connections.values()):
+            for connection in connections:
+                connection.stop()
+
+    async def _publish(self, event: dict):
+        if self._started:
+            await self.backplane.publish(event)
+        else:
+            # Scripts that never run the lifespan only have local sockets
+            await self._deliver(event)
+
+    async def _deliver(self, event: dict):
+        """Deliver a backplane event to the matching sockets on this worker."""
+        kind = event.get("kind")
+        message = event.get("message")
+        if kind == "room":
+            self._broadcast_local(message, event["room_id"])
+        elif kind == "room_user":
+            self._send_local(message, event["room_id"], event["user_id"])
+        elif kind == "user":
+            self._notify_local(message, event["user_id"])
+
+    @staticmethod
+    def _serialize(message: dict) -> str:
+        # Same encoding as WebSocket.send_json
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+    def room_stats(self, room_id: int) -> RoomFanoutStats:
+        stats = self._room_stats.get(room_id)
+        if stats is None:
+            stats = self._room_stats[room_id] = RoomFanoutStats()
+        return stats
 
     async def connect(self, websocket: WebSocket, room_id: int, user_id: int):
         await websocket.accept()
         if room_id not in self.active_connections:
             self.active_connections[room_id] = []
             self.user_connections[room_id] = {}
-        self.active_connections[room_id].append(websocket)
-        self.user_connections[room_id][user_id] = websocket
+        connection = SocketConnection(self, websocket, room_id, user_id)
+        connection.start()
+        self.active_connections[room_id].append(connection)
+        self.user_connections[room_id][user_id] = connection
 
-    def disconnect(self, websocket: WebSocket, room_id: int, user_id: int):
+    def _remove(self, connection: SocketConnection):
+        room_id = connection.room_id
+        connection.stop()
         if room_id in self.active_connections:
-            if websocket in self.active_connections[room_id]:
-                self.active_connections[room_id].remove(websocket)
-            if user_id in self.user_connections[room_id]:
-                del self.user_connections[room_id][user_id]
+            if connection in self.active_connections[room_id]:
+                self.active_connections[room_id].remove(connection)
+            if self.user_connections[room_id].get(connection.user_id) is connection:
+                del self.user_connections[room_id][connection.user_id]
             if not self.active_connections[room_id]:
                 del self.active_connections[room_id]
                 del self.user_connections[room_id]
+                self._room_stats.pop(room_id, None)
+
+    def disconnect(self, websocket: WebSocket, room_id: int, user_id: int):
+        for connection in list(self.active_connections.get(room_id, [])):
+            if connection.websocket is websocket:
+                self._remove(connection)
+
+    def evict(self, connection: SocketConnection, reason: str):
+        """Drop a dead or too slow connection and close its socket."""
+        if connection not in self.active_connections.get(connection.room_id, []):
+            return
+        print(f"Evicting socket of user {connection.user_id} in room {connection.room_id}: {reason}")
+        self.evicted += 1
+        self._remove(connection)
+
+        async def close_socket():
+            try:
+                await connection.websocket.close(code=1011)
+            except Exception:
+                pass
+
+        asyncio.get_running_loop().create_task(close_socket())
 
     async def broadcast(self, message: dict, room_id: int):
-        if room_id in self.active_connections:
-            for connection in self.active_connections[room_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    pass
+        await self._publish({"kind": "room", "room_id": room_id, "message": message})
 
     async def send_to_user(self, message: dict, room_id: int, user_id: int):
-        if room_id in self.user_connections:
-            websocket = self.user_connections[room_id].get(user_id)
-            if websocket:
-                try:
-                    await websocket.send_json(message)
-                except Exception:
-                    pass
+        if user_id in self.user_connections.get(room_id, {}):
+            self._send_local(message, room_id, user_id)
+        else:
+            await self._publish(
+                {"kind": "room_user", "room_id": room_id, "user_id": user_id, "message": message}
+            )
+
+    async def notify_user(self, message: dict, user_id: int):
+        """Send to the user's socket in every room they currently have open."""
+        await self._publish({"kind": "user", "user_id": user_id, "message": message})
+
+    def _broadcast_local(self, message: dict, room_id: int):
+        connections = self.active_connections.get(room_id)
+        if not connections:
+            return
+        text = self._serialize(message)
+        self.room_stats(room_id).messages += 1
+        for connection in list(connections):
+            connection.enqueue(text)
+
+    def _send_local(self, message: dict, room_id: int, user_id: int):
+        connection = self.user_connections.get(room_id, {}).get(user_id)
+        if connection is not None:
+            connection.enqueue(self._serialize(message))
+
+    def _notify_local(self, message: dict, user_id: int):
+        text = None
+        for connections in list(self.user_connections.values()):
+            connection = connections.get(user_id)
+            if connection is not None:
+                text = text or self._serialize(message)
+                connection.enqueue(text)
 
     def get_room_users(self, room_id: int) -> List[int]:
+        """Users connected to the room on this worker."""
         return list(self.user_connections.get(room_id, {}).keys())
 
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self.active_connections),
+            "connections": sum(len(c) for c in self.active_connections.values()),
+            "queued": sum(
+                c.queue.qsize() for cs in self.active_connections.values() for c in cs
+            ),
+            "evicted": self.evicted,
+            "overflow_policy": settings.SOCKET_OVERFLOW_POLICY,
+            "fanout": {
+                room_id: stats.snapshot() for room_id, stats in self._room_stats.items()
+            },
+            "backplane": self.backplane.stats(),
+        }
+
 
-socket = SocketService()
+socket = SocketService(create_backplane())
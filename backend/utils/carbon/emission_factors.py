@@ -0,0 +1,110 @@
+from enum import Enum
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+from schemas.route_schema import TransportMode
+
+
+class PassengerBasis(str, Enum):
+    # Factor is per vehicle-km and the vehicle is shared by the group (car)
+    shared_vehicle = "shared_vehicle"
+    # Factor is per vehicle-km regardless of group size (motorbike)
+    per_vehicle = "per_vehicle"
+    # Factor is per passenger-km (bus, metro, train)
+    per_passenger = "per_passenger"
+
+
+PASSENGER_BASIS: Dict[TransportMode, PassengerBasis] = {
+    TransportMode.car: PassengerBasis.shared_vehicle,
+    TransportMode.motorbike: PassengerBasis.per_vehicle,
+    TransportMode.walking: PassengerBasis.per_vehicle,
+    TransportMode.bus: PassengerBasis.per_passenger,
+    TransportMode.metro: PassengerBasis.per_passenger,
+    TransportMode.train: PassengerBasis.per_passenger,
+}
+
+# Offline factors in kg CO2e per km, matching the Climatiq activities used by
+# CarbonAPI (data_version ^27). The bus factor is already divided by the
+# 30-passenger occupancy CarbonAPI.estimate_electric_bus assumes.
+DEFAULT_FACTOR_VERSION = "default-v1"
+DEFAULT_FACTORS: Dict[TransportMode, float] = {
+    TransportMode.car: 0.1707,
+    TransportMode.motorbike: 0.1135,
+    TransportMode.walking: 0.0,
+    TransportMode.bus: 0.0227,
+    TransportMode.metro: 0.0286,
+    TransportMode.train: 0.0355,
+}
+
+# Modes whose factors can be refreshed from Climatiq
+CLIMATIQ_REFRESHABLE_MODES = [TransportMode.car, TransportMode.motorbike, TransportMode.bus]
+
+_MODE_INDEX = {mode: idx for idx, mode in enumerate(TransportMode)}
+
+
+class EmissionFactorTable:
+    """
+    Versioned emission factors held in NumPy arrays indexed by TransportMode
+    so whole batches of routes are estimated with a few vector operations.
+    """
+
+    def __init__(self, version: str, factors: Dict[TransportMode, float]):
+        self.version = version
+        self.factors = {**DEFAULT_FACTORS, **factors}
+
+        self._factor_array = np.zeros(len(_MODE_INDEX), dtype=np.float64)
+        self._shared = np.zeros(len(_MODE_INDEX), dtype=bool)
+        self._per_passenger = np.zeros(len(_MODE_INDEX), dtype=bool)
+        for mode, idx in _MODE_INDEX.items():
+            self._factor_array[idx] = self.factors[mode]
+            self._shared[idx] = PASSENGER_BASIS[mode] == PassengerBasis.shared_vehicle
+            self._per_passenger[idx] = (
+                PASSENGER_BASIS[mode] == PassengerBasis.per_passenger
+            )
+
+    def estimate(
+        self, mode: TransportMode, distance_km: float, passengers: int = 1
+    ) -> float:
+        return float(self.estimate_many([mode], [distance_km], passengers)[0])
+
+    def estimate_many(
+        self,
+        modes: Sequence[TransportMode],
+        distances_km: Sequence[float],
+        passengers: Union[int, Sequence[int]] = 1,
+    ) -> np.ndarray:
+        """Return kg CO2e for each (mode, distance, passengers) triple."""
+        idx = np.fromiter(
+            (_MODE_INDEX[TransportMode(mode)] for mode in modes),
+            dtype=np.intp,
+            count=len(modes),
+        )
+        distances = np.asarray(distances_km, dtype=np.float64)
+        group = np.broadcast_to(
+            np.maximum(np.asarray(passengers, dtype=np.float64), 1.0), distances.shape
+        )
+
+        if idx.shape != distances.shape:
+            raise ValueError("modes and distances_km must have the same length")
+
+        multiplier = np.ones_like(distances)
+        multiplier = np.where(self._shared[idx], 1.0 / group, multiplier)
+        multiplier = np.where(self._per_passenger[idx], group, multiplier)
+
+        return self._factor_array[idx] * distances * multiplier
+
+    def as_dict(self) -> Dict[str, float]:
+        return {mode.value: factor for mode, factor in self.factors.items()}
+
+
+emission_factors = EmissionFactorTable(DEFAULT_FACTOR_VERSION, DEFAULT_FACTORS)
+
+
+def get_emission_factors() -> EmissionFactorTable:
+    return emission_factors
+
+
+def set_emission_factors(table: EmissionFactorTable):
+    global emission_factors
+    emission_factors = table
@@ -0,0 +1,139 @@
+import copy
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, Optional, Set, Tuple
+
+from utils.config import settings
+
+# Messages of the room history sent to the chatbot with each turn
+CONTEXT_HISTORY_LIMIT = 20
+
+
+class ChatContextCache:
+    """
+    Chatbot context (ContextLoadResponse) per (room_id, user_id).
+
+    Callers get their own copy, so concurrent turns never share or modify
+    the cached object. New messages are appended to the cached history of
+    every context of their room; entries are dropped when a message is
+    edited or deleted, when the room's stored context changes, when a plan
+    they include changes, or when the user's plan membership changes. The
+    TTL bounds staleness from writes made by other API workers.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, latency_window: int = 256):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # (room_id, user_id) -> (context, expires_at, plan ids)
+        self._cache: "OrderedDict[Tuple[int, int], Tuple[Any, float, Set[int]]]" = OrderedDict()
+        # Bumped by every invalidation so a context built meanwhile is not stored
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.appends = 0
+        self._latencies: Dict[str, Deque[float]] = {
+            "hit": deque(maxlen=latency_window),
+            "miss": deque(maxlen=latency_window),
+        }
+
+    def begin(self) -> int:
+        """Token to pass to put() for a context about to be built."""
+        return self._generation
+
+    def get(self, room_id: int, user_id: int) -> Optional[Any]:
+        key = (room_id, user_id)
+        entry = self._cache.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._cache[key]
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(entry[0])
+
+    def put(self, room_id: int, user_id: int, context: Any, plan_ids: Iterable[int], token: int):
+        if token != self._generation:
+            return
+        key = (room_id, user_id)
+        self._cache[key] = (
+            copy.deepcopy(context), time.time() + self.ttl_seconds, set(plan_ids)
+        )
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def append_message(self, room_id: int, item: Any) -> int:
+        """
+        Add a new message (MessageHistoryItem) to the history of the room's
+        cached contexts, keeping the last CONTEXT_HISTORY_LIMIT.
+        """
+        # A context being built may have read the history before this message
+        self._generation += 1
+        updated = 0
+        for (cached_room_id, _), (context, _, _) in self._cache.items():
+            if cached_room_id == room_id:
+                context.history.append(copy.copy(item))
+                context.history = context.history[-CONTEXT_HISTORY_LIMIT:]
+                updated += 1
+        self.appends += updated
+        return updated
+
+    def _invalidate(self, matches) -> int:
+        self._generation += 1
+        stale = [key for key, entry in self._cache.items() if matches(key, entry)]
+        for key in stale:
+            del self._cache[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_room(self, room_id: int) -> int:
+        return self._invalidate(lambda key, entry: key[0] == room_id)
+
+    def invalidate_user(self, user_id: int) -> int:
+        return self._invalidate(lambda key, entry: key[1] == user_id)
+
+    def invalidate_plan(self, plan_id: int) -> int:
+        return self._invalidate(lambda key, entry: plan_id in entry[2])
+
+    def record_latency(self, hit: bool, seconds: float):
+        self._latencies["hit" if hit else "miss"].append(seconds * 1000)
+
+    def clear(self):
+        self._generation += 1
+        self._cache.clear()
+
+    @staticmethod
+    def _summary(samples: Deque[float]) -> dict:
+        ordered = sorted(samples)
+        if not ordered:
+            return {"count": 0, "avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": len(ordered),
+            "avg_ms": round(sum(ordered) / len(ordered), 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            "max_ms": round(ordered[-1], 2),
+        }
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "appends": self.appends,
+            "load_latency": {
+                name: self._summary(samples) for name, samples in self._latencies.items()
+            },
+        }
+
+
+chat_context_cache = ChatContextCache(
+    max_size=settings.CHAT_CONTEXT_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CHAT_CONTEXT_CACHE_TTL_SECONDS,
+)
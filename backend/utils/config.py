@@ -40,4 +40,95 @@ class Settings(BaseSettings):
 
     SEND_GRID_API_KEY: str = ""
 
+    HTTP2_ENABLED: bool = True
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    # Per-pool overrides, e.g. "google_maps=100,openrouter=20"
+    HTTP_POOL_MAX_CONNECTIONS: str = ""
+
+    # WebSocket fan-out between API workers: "memory" (single worker) or
+    # "postgres" (LISTEN/NOTIFY on the application database)
+    SOCKET_BACKPLANE: str = "memory"
+    SOCKET_BACKPLANE_CHANNEL: str = "ecomovex_socket"
+    # Per-connection outbound queue; when full either "drop_oldest" or "disconnect"
+    SOCKET_SEND_QUEUE_SIZE: int = 100
+    SOCKET_OVERFLOW_POLICY: str = "drop_oldest"
+    SOCKET_SEND_TIMEOUT_SECONDS: float = 10.0
+
+    # Chatbot context per room and user, dropped on message, context and plan writes
+    CHAT_CONTEXT_CACHE_MAX_SIZE: int = 2000
+    CHAT_CONTEXT_CACHE_TTL_SECONDS: int = 300
+
+    # Climatiq is only used to refresh the offline emission factors
+    EMISSION_FACTOR_REFRESH_DAYS: int = 30
+
+    # Per-mode upstream timeouts for RouteService.find_three_optimal_routes
+    ROUTE_DRIVING_TIMEOUT_SECONDS: float = 15.0
+    ROUTE_ECO_TIMEOUT_SECONDS: float = 15.0
+    ROUTE_TRANSIT_TIMEOUT_SECONDS: float = 10.0
+    ROUTE_WALKING_TIMEOUT_SECONDS: float = 10.0
+
+    # Consecutive plan legs routed in parallel by PlanService
+    PLAN_ROUTE_CONCURRENCY: int = 4
+
+    ROUTE_CACHE_MAX_SIZE: int = 5000
+    ROUTE_CACHE_PERSIST: bool = True
+    ROUTE_CACHE_GRID_METERS: float = 50.0
+    ROUTE_CACHE_TRAFFIC_BUCKET_SECONDS: int = 900
+    ROUTE_CACHE_TTL_DRIVING_SECONDS: int = 6 * 3600
+    ROUTE_CACHE_TTL_TRANSIT_SECONDS: int = 30 * 60
+    ROUTE_CACHE_TTL_WALKING_SECONDS: int = 7 * 24 * 3600
+
+    COORDINATE_CACHE_MAX_SIZE: int = 10000
+    COORDINATE_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    COORDINATE_FETCH_CONCURRENCY: int = 8
+
+    # Print per-package import and per-step init cost at startup
+    STARTUP_PROFILE: bool = False
+    # Start the green-verification workers (and load their models) in the background warm-up
+    WARM_GREEN_MODELS: bool = True
+    # Worker processes running green-verification jobs; each holds its own copy of the models
+    GREEN_VERIFICATION_WORKERS: int = 2
+    GREEN_VERIFICATION_JOB_TTL_SECONDS: int = 3600
+    # Queued or running jobs older than this are marked failed (their worker died)
+    GREEN_VERIFICATION_JOB_TIMEOUT_SECONDS: int = 1800
+    # How often a request waiting on a job run by another API worker checks it
+    GREEN_VERIFICATION_JOB_POLL_SECONDS: float = 1.0
+    # Place-level results; per-photo results are cached in the database by content hash
+    GREEN_PLACE_CACHE_MAX_SIZE: int = 5000
+    GREEN_PLACE_CACHE_TTL_SECONDS: int = 6 * 3600
+
+    # Catalogue-wide green verification sweep
+    GREEN_SWEEP_PAGE_SIZE: int = 100
+    GREEN_SWEEP_IMAGE_BATCH_SIZE: int = 32
+    GREEN_SWEEP_DETAILS_CONCURRENCY: int = 8
+    GREEN_SWEEP_CHECKPOINT_PATH: Path = Path("data/green_sweep_checkpoint.json")
+    GREEN_SWEEP_REVERIFY_DAYS: int = 30
+
+    # Shared image loader for the green-verification models
+    IMAGE_FETCH_CONCURRENCY: int = 8
+    IMAGE_FETCH_MAX_BYTES: int = 10 * 1024 * 1024
+    IMAGE_FETCH_TIMEOUT_SECONDS: float = 15.0
+    IMAGE_DECODE_MAX_SIDE: int = 1600
+    IMAGE_CACHE_MAX_SIZE: int = 64
+    IMAGE_CACHE_TTL_SECONDS: int = 120
+
+    # On-disk FAISS index reused across restarts while its fingerprint matches
+    FAISS_INDEX_DIR: Path = Path("data/faiss")
+    FAISS_INDEX_MMAP: bool = True
+    # "cosine" (inner product over normalized vectors) or "l2"
+    FAISS_INDEX_METRIC: str = "cosine"
+
+    # Cluster centroids cached for affinity re-ranking; cleared by clustering runs
+    CLUSTER_CENTROID_CACHE_MAX_SIZE: int = 1000
+    CLUSTER_CENTROID_CACHE_TTL_SECONDS: int = 24 * 3600
+
+    # Micro-batched sentence-transformer encoding with a text-level cache
+    EMBEDDING_MAX_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_CACHE_MAX_SIZE: int = 10000
+
+    # Bulk clustering pipeline
+    CLUSTERING_WRITE_CHUNK_SIZE: int = 1000
+    FAISS_PERSIST_INTERVAL_MINUTES: int = 10
+
 settings = Settings()
@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from utils.config import settings
+
+
+class CentroidCache:
+    """
+    In-process LRU of cluster_id -> centroid vector so affinity re-ranking
+    does not recompute the cluster mean on every search. Clustering runs
+    clear it and cluster membership changes invalidate single entries.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cluster_id: int) -> Optional[np.ndarray]:
+        entry = self._entries.get(cluster_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        centroid, cached_at = entry
+        if (time.time() - cached_at) >= self.ttl_seconds:
+            del self._entries[cluster_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(cluster_id)
+        self.hits += 1
+        return centroid
+
+    def put(self, cluster_id: int, centroid: np.ndarray):
+        centroid = np.asarray(centroid, dtype=np.float32)
+        centroid.setflags(write=False)
+        self._entries[cluster_id] = (centroid, time.time())
+        self._entries.move_to_end(cluster_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, cluster_id: int):
+        self._entries.pop(cluster_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+centroid_cache = CentroidCache(
+    max_size=settings.CLUSTER_CENTROID_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CLUSTER_CENTROID_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.config import settings
+from utils.embedded.embedding_utils import encode_texts
+
+
+def text_cache_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingService:
+    """
+    Async front end for the sentence-transformer.
+
+    Concurrent encode() calls are collected for up to batch_window_ms and
+    encoded as one batch on a dedicated worker thread, so the event loop never
+    runs the model and throughput follows batch size rather than request
+    count. Results are kept in a content-hash LRU and identical texts that are
+    already in flight share one encode.
+    """
+
+    def __init__(self, max_batch_size: int, batch_window_ms: float, cache_size: int):
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="embedding"
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.texts_encoded = 0
+        self.encode_seconds = 0.0
+
+    def _cached(self, key: str) -> Optional[np.ndarray]:
+        vector = self._cache.get(key)
+        if vector is not None:
+            self._cache.move_to_end(key)
+        return vector
+
+    def _remember(self, key: str, vector: np.ndarray):
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        # Scripts may run several event loops in turn; queues are loop-bound
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._in_flight.clear()
+            self._worker = loop.create_task(self._run())
+
+    async def _encode_in_thread(self, texts: List[str]) -> np.ndarray:
+        started = time.perf_counter()
+        matrix = await asyncio.get_running_loop().run_in_executor(
+            self._executor, encode_texts, texts, self.max_batch_size
+        )
+        self.batches += 1
+        self.texts_encoded += len(texts)
+        self.encode_seconds += time.perf_counter() - started
+        return matrix
+
+    async def _collect_batch(self) -> List[Tuple[str, str]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            keys = [key for key, _ in batch]
+            try:
+                matrix = await self._encode_in_thread([text for _, text in batch])
+                for key, vector in zip(keys, matrix):
+                    self._remember(key, vector)
+                    future = self._in_flight.pop(key, None)
+                    if future is not None and not future.done():
+                        future.set_result(self._cache.get(key, vector))
+            except Exception as e:
+                print(f"WARNING: Embedding batch of {len(batch)} failed - {e}")
+                for key in keys:
+                    future = self._in_flight.pop(key, None)
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Embedding of one text as a read-only float32 vector."""
+        key = text_cache_key(text)
+        vector = self._cached(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+
+        self._ensure_worker()
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._loop.create_future()
+            self._in_flight[key] = future
+            self._queue.put_nowait((key, text))
+        return await asyncio.shield(future)
+
+    async def encode_many(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embeddings of many texts as an (n, dim) float32 matrix. Bulk misses
+        are encoded directly in model-sized batches instead of going through
+        the micro-batch queue.
+        """
+        if not texts:
+            return encode_texts([])
+
+        keys = [text_cache_key(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            vector = self._cached(key)
+            if vector is not None:
+                self.hits += 1
+                vectors[key] = vector
+            else:
+                self.misses += 1
+                missing[key] = text
+
+        if len(missing) >= self.max_batch_size:
+            matrix = await self._encode_in_thread(list(missing.values()))
+            for key, vector in zip(missing.keys(), matrix):
+                self._remember(key, vector)
+                vectors[key] = self._cache.get(key, vector)
+        elif missing:
+            encoded = await asyncio.gather(
+                *(self.encode(text) for text in missing.values())
+            )
+            # encode() already counted these as misses
+            self.misses -= len(missing)
+            vectors.update(zip(missing.keys(), encoded))
+
+        return np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cache_size": len(self._cache),
+            "cache_max_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "batches": self.batches,
+            "texts_encoded": self.texts_encoded,
+            "avg_batch_size": self.texts_encoded / self.batches if self.batches else 0.0,
+            "avg_batch_ms": (
+                self.encode_seconds * 1000 / self.batches if self.batches else 0.0
+            ),
+        }
+
+
+embedding_service = EmbeddingService(
+    max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+    batch_window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+    cache_size=settings.EMBEDDING_CACHE_MAX_SIZE,
+)
@@ -1,3 +1,4 @@
+import threading
 from typing import List
 
 import numpy as np
@@ -24,24 +25,51 @@ def patch_torch_compatibility():
         pass
 
 
-patch_torch_compatibility()
+class DummyModel:
+    def encode(self, text, **kwargs):
+        if isinstance(text, list):
+            return np.random.randn(len(text), 384)
+        return np.random.randn(384)
 
-try:
-    from sentence_transformers import SentenceTransformer
 
-    _embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-except Exception:
+# Loaded on first use (or by the startup warm-up) so importing this module
+# does not pull in torch and sentence_transformers.
+_embedding_model = None
+_model_lock = threading.Lock()
 
-    class DummyModel:
-        def encode(self, text):
-            return np.random.randn(384)
 
-    _embedding_model = DummyModel()
+def _load_embedding_model():
+    patch_torch_compatibility()
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer("all-MiniLM-L6-v2")
+    except Exception as e:
+        print(f"WARNING: Sentence transformer unavailable, using random embeddings - {e}")
+        return DummyModel()
 
 
 def get_embedding_model():
+    global _embedding_model
+    if _embedding_model is None:
+        with _model_lock:
+            if _embedding_model is None:
+                _embedding_model = _load_embedding_model()
     return _embedding_model
 
 
+def is_embedding_model_loaded() -> bool:
+    return _embedding_model is not None
+
+
 def encode_text(text: str) -> List[float]:
-    return _embedding_model.encode(text).tolist()
+    return get_embedding_model().encode(text).tolist()
+
+
+def encode_texts(texts: List[str], batch_size: int = 64) -> np.ndarray:
+    """Encode many texts in model-sized batches; returns an (n, dim) float32 matrix."""
+    if not texts:
+        return np.empty((0, 384), dtype=np.float32)
+    return np.asarray(
+        get_embedding_model().encode(texts, batch_size=batch_size), dtype=np.float32
+    )
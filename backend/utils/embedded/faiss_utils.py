@@ -1,10 +1,17 @@
 import json
-from typing import Any, Dict, List, Tuple
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+from sqlalchemy import LargeBinary, func, select, type_coerce
 from sqlalchemy.orm import Session
 
 from models.destination import DestinationEmbedding
+from utils.config import settings
+from utils.embedded.vector_codec import decode_matrix
 
 try:
     import faiss
@@ -16,14 +23,107 @@ except ImportError:
     print("⚠ FAISS not available. Install with: pip install faiss-cpu")
 
 
+METRIC_L2 = "l2"
+METRIC_COSINE = "cosine"
+
+
 class FAISSIndex:
-    def __init__(self, dimension: int = 384):
+    """
+    Destination vectors keyed by int64 labels so single destinations can be
+    added or removed without a rebuild. place_ids are mapped to sequential
+    labels that are persisted with the index.
+
+    metric="cosine" stores L2-normalized vectors in an inner-product index,
+    so search scores are true cosine similarities in [-1, 1]. metric="l2"
+    keeps the original Euclidean index and its 0-100 score.
+    """
+
+    def __init__(
+        self, dimension: int = 384, name: str = "destinations", metric: str = METRIC_L2
+    ):
+        if metric not in (METRIC_L2, METRIC_COSINE):
+            raise ValueError(f"Unsupported FAISS metric: {metric}")
         self.dimension = dimension
+        self.name = name
+        self.metric = metric
         self.index = None
-        self.destination_ids = []
+        self.normalized = metric == METRIC_COSINE
+        self.index_type = None
+        self.fingerprint: Optional[Dict[str, Any]] = None
+        self.id_map: Dict[int, str] = {}
+        self._labels: Dict[str, int] = {}
+        self._next_label = 0
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def index_path(self) -> Path:
+        return Path(settings.FAISS_INDEX_DIR) / f"{self.name}.index"
+
+    @property
+    def meta_path(self) -> Path:
+        return Path(settings.FAISS_INDEX_DIR) / f"{self.name}.meta.json"
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def _reset_ids(self, ids: List[str]) -> np.ndarray:
+        self.id_map = dict(enumerate(ids))
+        self._labels = {dest_id: label for label, dest_id in self.id_map.items()}
+        self._next_label = len(ids)
+        return np.arange(len(ids), dtype=np.int64)
+
+    @property
+    def is_cosine(self) -> bool:
+        return self.metric == METRIC_COSINE
+
+    def _create_index(self, vectors: np.ndarray, use_ivf: bool):
+        faiss_metric = (
+            faiss.METRIC_INNER_PRODUCT if self.is_cosine else faiss.METRIC_L2
+        )
+        if use_ivf:
+            nlist = min(100, int(np.sqrt(len(vectors))))
+            quantizer = (
+                faiss.IndexFlatIP(self.dimension)
+                if self.is_cosine
+                else faiss.IndexFlatL2(self.dimension)
+            )
+            index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, faiss_metric)
+            index.train(vectors)
+            # IVF lists store labels natively; the hashtable direct map makes
+            # reconstruct() and remove_ids() work by label.
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+            return index
+
+        base = (
+            faiss.IndexFlatIP(self.dimension)
+            if self.is_cosine
+            else faiss.IndexFlatL2(self.dimension)
+        )
+        # IndexIDMap2 keeps a reverse map so stored vectors can be read back
+        return faiss.IndexIDMap2(base)
+
+    def prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if self.is_cosine:
+            vectors = normalize_vectors(vectors).astype(np.float32)
+        return vectors
+
+    def score(self, distance: float) -> float:
+        if self.is_cosine:
+            return round(float(distance), 4)
+        return round(float(max(0, 100 - (distance * 10))), 2)
 
     def build_index(
-        self, vectors: np.ndarray, ids: List[str], use_ivf: bool = None
+        self,
+        vectors: np.ndarray,
+        ids: List[str],
+        use_ivf: bool = None,
+        normalized: bool = False,
+        fingerprint: Optional[Dict[str, Any]] = None,
     ) -> bool:
         if not FAISS_AVAILABLE:
             print("FAISS not available")
@@ -35,41 +135,94 @@ class FAISSIndex:
             if use_ivf is None:
                 use_ivf = n_vectors >= 10000
 
-            if use_ivf:
-                nlist = min(100, int(np.sqrt(n_vectors)))
-                quantizer = faiss.IndexFlatL2(self.dimension)
-                self.index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist)
-                self.index.train(vectors)
-            else:
-                self.index = faiss.IndexFlatL2(self.dimension)
+            vectors = self.prepare(vectors)
+            index = self._create_index(vectors, use_ivf)
+            with self._lock:
+                index.add_with_ids(vectors, self._reset_ids(ids))
+                self.index = index
+                self.index_type = "IVF" if use_ivf else "Flat"
+                self.normalized = normalized or self.is_cosine
+                self.fingerprint = fingerprint
+                self._dirty = True
+
+            print(
+                f"✓ Built FAISS {self.index_type} {self.metric} index "
+                f"with {n_vectors} vectors"
+            )
+            return True
+
+        except Exception as e:
+            print(f"Error building FAISS index: {e}")
+            return False
 
-            self.index.add(vectors)
-            self.destination_ids = ids
+    def add(self, destination_id: str, vector: np.ndarray) -> bool:
+        if self.index is None:
+            return False
 
-            index_type = "IVF" if use_ivf else "Flat"
-            print(f"✓ Built FAISS {index_type} index with {n_vectors} vectors")
+        try:
+            with self._lock:
+                self._remove_label(destination_id)
+                label = self._next_label
+                self._next_label += 1
+                self.index.add_with_ids(
+                    self.prepare(vector), np.array([label], dtype=np.int64)
+                )
+                self.id_map[label] = destination_id
+                self._labels[destination_id] = label
+                self._dirty = True
             return True
+        except Exception as e:
+            print(f"Error adding {destination_id} to FAISS index: {e}")
+            return False
+
+    def _remove_label(self, destination_id: str) -> bool:
+        label = self._labels.pop(destination_id, None)
+        if label is None:
+            return False
+        self.index.remove_ids(np.array([label], dtype=np.int64))
+        self.id_map.pop(label, None)
+        return True
 
+    def remove(self, destination_id: str) -> bool:
+        if self.index is None:
+            return False
+
+        try:
+            with self._lock:
+                removed = self._remove_label(destination_id)
+                if removed:
+                    self._dirty = True
+            return removed
         except Exception as e:
-            print(f"Error building FAISS index: {e}")
+            print(f"Error removing {destination_id} from FAISS index: {e}")
             return False
 
     def search(self, query_vector: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        results = self.search_batch(query_vector, k)
+        return results[0] if results else []
+
+    def search_batch(
+        self, query_matrix: np.ndarray, k: int = 10
+    ) -> List[List[Tuple[str, float]]]:
+        """Search N queries in one FAISS call; returns one result list per row."""
         if self.index is None:
             print("Index not built")
             return []
 
         try:
-            if query_vector.ndim == 1:
-                query_vector = query_vector.reshape(1, -1)
+            query_matrix = self.prepare(query_matrix)
 
-            distances, indices = self.index.search(query_vector, k)
+            with self._lock:
+                distances, labels = self.index.search(query_matrix, k)
 
             results = []
-            for idx, dist in zip(indices[0], distances[0]):
-                if idx < len(self.destination_ids):
-                    similarity = max(0, 100 - (dist * 10))
-                    results.append((self.destination_ids[idx], round(similarity, 2)))
+            for row_labels, row_distances in zip(labels, distances):
+                row = []
+                for label, dist in zip(row_labels, row_distances):
+                    dest_id = self.id_map.get(int(label))
+                    if dest_id is not None:
+                        row.append((dest_id, self.score(dist)))
+                results.append(row)
 
             return results
 
@@ -77,11 +230,127 @@ class FAISSIndex:
             print(f"Error searching FAISS index: {e}")
             return []
 
+    def get_vectors(self, destination_ids: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Read stored vectors back from the index (normalized in cosine mode).
+        Returns the ids found and a (len(found), dimension) matrix.
+        """
+        found = [dest_id for dest_id in destination_ids if dest_id in self._labels]
+        if self.index is None or not found:
+            return [], np.empty((0, self.dimension), dtype=np.float32)
+
+        labels = np.array([self._labels[dest_id] for dest_id in found], dtype=np.int64)
+        with self._lock:
+            vectors = self.index.reconstruct_batch(labels)
+        return found, vectors
+
+    def similarities(
+        self, query_vector: np.ndarray, destination_ids: List[str]
+    ) -> Dict[str, float]:
+        """Cosine similarity between one query and specific indexed destinations."""
+        found, vectors = self.get_vectors(destination_ids)
+        if not found:
+            return {}
+
+        query = normalize_vectors(
+            np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        )[0]
+        if not self.is_cosine:
+            vectors = normalize_vectors(vectors)
+        return dict(zip(found, (vectors @ query).astype(float).tolist()))
+
+    def save(self, fingerprint: Dict[str, Any]) -> bool:
+        """Write the index and its id map atomically next to each other."""
+        if self.index is None:
+            return False
+
+        try:
+            directory = Path(settings.FAISS_INDEX_DIR)
+            directory.mkdir(parents=True, exist_ok=True)
+
+            with self._lock:
+                tmp_index = self.index_path.with_suffix(".index.tmp")
+                faiss.write_index(self.index, str(tmp_index))
+                meta = {
+                    "fingerprint": fingerprint,
+                    "dimension": self.dimension,
+                    "index_type": self.index_type,
+                    "metric": self.metric,
+                    "normalized": self.normalized,
+                    "next_label": self._next_label,
+                    "id_map": [[label, dest_id] for label, dest_id in self.id_map.items()],
+                    "saved_at": datetime.now().isoformat(),
+                }
+                tmp_meta = self.meta_path.with_suffix(".json.tmp")
+                tmp_meta.write_text(json.dumps(meta))
+
+                os.replace(tmp_index, self.index_path)
+                os.replace(tmp_meta, self.meta_path)
+                self.fingerprint = fingerprint
+                self._dirty = False
+
+            print(f"✓ Saved FAISS index ({self.index.ntotal} vectors) to {directory}")
+            return True
+        except Exception as e:
+            print(f"Error saving FAISS index: {e}")
+            return False
+
+    def load(self, fingerprint: Dict[str, Any], mmap: bool = True) -> bool:
+        """Load the persisted index only if it was saved for the same data."""
+        if not FAISS_AVAILABLE:
+            return False
+        if not self.index_path.exists() or not self.meta_path.exists():
+            return False
+
+        try:
+            meta = json.loads(self.meta_path.read_text())
+            if meta.get("fingerprint") != fingerprint:
+                print("FAISS index on disk is stale, rebuilding")
+                return False
+            if meta.get("dimension") != self.dimension:
+                return False
+            if meta.get("metric", METRIC_L2) != self.metric:
+                print("FAISS index on disk uses a different metric, rebuilding")
+                return False
+
+            index = None
+            mmapped = False
+            if mmap:
+                # IndexIDMap2 over Flat and IVF indexes load writable, so
+                # add()/remove() update this index and the id map together
+                try:
+                    index = faiss.read_index(str(self.index_path), faiss.IO_FLAG_MMAP)
+                    mmapped = True
+                except Exception:
+                    index = None
+            if index is None:
+                index = faiss.read_index(str(self.index_path))
+
+            with self._lock:
+                self.index = index
+                self.index_type = meta.get("index_type")
+                self.normalized = meta.get("normalized", False)
+                self.id_map = {int(label): dest_id for label, dest_id in meta["id_map"]}
+                self._labels = {dest_id: label for label, dest_id in self.id_map.items()}
+                self._next_label = meta.get("next_label", len(self.id_map))
+                self.fingerprint = fingerprint
+                self._dirty = False
+
+            print(
+                f"✓ Loaded FAISS {self.index_type} {self.metric} index "
+                f"with {index.ntotal} vectors"
+                f"{' (memory-mapped)' if mmapped else ''}"
+            )
+            return True
+        except Exception as e:
+            print(f"Error loading FAISS index: {e}")
+            return False
+
     def is_built(self) -> bool:
-        return self.index is not None and len(self.destination_ids) > 0
+        return self.index is not None and len(self.id_map) > 0
 
 
-_faiss_index = FAISSIndex()
+_faiss_index = FAISSIndex(metric=settings.FAISS_INDEX_METRIC)
 
 
 def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
@@ -94,42 +363,126 @@ def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
         return vectors
 
 
-def load_destination_vectors(session: Session) -> Tuple[np.ndarray, List[str]]:
-    records = session.query(DestinationEmbedding).all()
-    vectors, ids = [], []
-    for r in records:
-        vectors.append(np.array(json.loads(r.embedding_vector), dtype=np.float32))
-        ids.append(r.destination_id)
-
-    if vectors:
-        return np.stack(vectors), ids
-    return np.array([]), ids
+def compute_fingerprint(session: Session) -> Dict[str, Any]:
+    """
+    Summary of destination_embeddings used to decide whether a persisted
+    index still matches the table: rows per model_version and the latest
+    update time.
+    """
+    rows = session.execute(
+        select(
+            DestinationEmbedding.model_version,
+            func.count(),
+            func.max(DestinationEmbedding.updated_at),
+        ).group_by(DestinationEmbedding.model_version)
+    ).all()
+
+    latest = max((row[2] for row in rows if row[2] is not None), default=None)
+    return {
+        "model_versions": {row[0]: row[1] for row in rows},
+        "row_count": sum(row[1] for row in rows),
+        "max_updated_at": latest.isoformat() if latest else None,
+    }
+
+
+def load_destination_vectors(
+    session: Session, dimension: int = None
+) -> Tuple[np.ndarray, List[str]]:
+    # Select the raw BYTEA column so rows are not decoded one by one; the
+    # blobs are joined once and viewed as a contiguous float32 matrix.
+    rows = session.execute(
+        select(
+            DestinationEmbedding.destination_id,
+            type_coerce(DestinationEmbedding.embedding_vector, LargeBinary),
+        )
+    ).all()
+    if not rows:
+        return np.array([]), []
+
+    ids = [row[0] for row in rows]
+    vectors = decode_matrix(
+        (row[1] for row in rows), dimension or _faiss_index.dimension, ids
+    )
+    return vectors, ids
 
 
 def build_index(session: Session, normalize: bool = False) -> bool:
     try:
+        fingerprint = compute_fingerprint(session)
         vectors, ids = load_destination_vectors(session)
         if len(vectors) == 0:
             print("No destination vectors found")
             return False
 
-        if normalize:
+        if normalize and not _faiss_index.is_cosine:
             vectors = normalize_vectors(vectors)
 
-        return _faiss_index.build_index(vectors, ids)
+        if not _faiss_index.build_index(
+            vectors, ids, normalized=normalize, fingerprint=fingerprint
+        ):
+            return False
+
+        _faiss_index.save(fingerprint)
+        return True
 
     except Exception as e:
         print(f"Error building FAISS index: {e}")
         return False
 
 
+def load_or_build_index(session: Session, normalize: bool = False) -> bool:
+    """Reuse the persisted index when the table is unchanged, else rebuild."""
+    try:
+        fingerprint = compute_fingerprint(session)
+        if _faiss_index.load(fingerprint, mmap=settings.FAISS_INDEX_MMAP):
+            if _faiss_index.is_cosine or _faiss_index.normalized == normalize:
+                return True
+    except Exception as e:
+        print(f"Error loading persisted FAISS index: {e}")
+
+    return build_index(session, normalize)
+
+
+def persist_index(session: Session) -> bool:
+    """
+    Save incremental changes. Skipped when the index and the table disagree
+    on row count (e.g. another worker added rows), so a stale file is never
+    written with a fresh fingerprint; the next startup rebuilds instead.
+    """
+    if not _faiss_index.dirty or _faiss_index.index is None:
+        return False
+
+    fingerprint = compute_fingerprint(session)
+    if fingerprint["row_count"] != _faiss_index.index.ntotal:
+        print(
+            f"FAISS index has {_faiss_index.index.ntotal} vectors but table has "
+            f"{fingerprint['row_count']} rows, not persisting"
+        )
+        return False
+    return _faiss_index.save(fingerprint)
+
+
+def add_to_index(destination_id: str, vector: List[float]) -> bool:
+    if not _faiss_index.is_built():
+        return False
+
+    vector_arr = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+    if _faiss_index.normalized and not _faiss_index.is_cosine:
+        vector_arr = normalize_vectors(vector_arr)
+    return _faiss_index.add(destination_id, vector_arr)
+
+
+def remove_from_index(destination_id: str) -> bool:
+    return _faiss_index.remove(destination_id)
+
+
 def search_index(
     query_vector: List[float], k: int = 10, normalize: bool = False
 ) -> List[Dict[str, Any]]:
     try:
         query_arr = np.array(query_vector, dtype=np.float32)
 
-        if normalize:
+        if normalize and not _faiss_index.is_cosine:
             query_arr = normalize_vectors(query_arr.reshape(1, -1)).flatten()
 
         results = _faiss_index.search(query_arr, k)
@@ -144,6 +497,46 @@ def search_index(
         return []
 
 
+def search_index_batch(
+    query_vectors: np.ndarray, k: int = 10
+) -> List[List[Dict[str, Any]]]:
+    try:
+        query_matrix = np.asarray(query_vectors, dtype=np.float32)
+        if len(query_matrix) == 0:
+            return []
+
+        return [
+            [
+                {"destination_id": dest_id, "similarity_score": score}
+                for dest_id, score in row
+            ]
+            for row in _faiss_index.search_batch(query_matrix, k)
+        ]
+
+    except Exception as e:
+        print(f"Error searching index: {e}")
+        return []
+
+
+def score_destinations(
+    query_vector: List[float], destination_ids: List[str]
+) -> Dict[str, float]:
+    """
+    Cosine similarity of query_vector to the given destinations using the
+    vectors already held by the index. Destinations missing from the index
+    are absent from the result.
+    """
+    try:
+        return _faiss_index.similarities(query_vector, destination_ids)
+    except Exception as e:
+        print(f"Error scoring destinations: {e}")
+        return {}
+
+
+def get_index_metric() -> str:
+    return _faiss_index.metric
+
+
 def is_index_ready() -> bool:
     return _faiss_index.is_built()
 
@@ -0,0 +1,110 @@
+import json
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+# Little-endian float32 regardless of host byte order so stored blobs are
+# portable between machines.
+VECTOR_DTYPE = np.dtype("<f4")
+
+# Output size of the sentence-transformer used for destination and user embeddings
+EMBEDDING_DIMENSION = 384
+
+VectorLike = Union[Sequence[float], np.ndarray, bytes, memoryview, str]
+
+
+def encode_vector(vector: VectorLike, dimension: Optional[int] = None) -> bytes:
+    """
+    Serialize a vector to raw float32 bytes (1.5 KB for 384 dimensions).
+
+    Raises ValueError unless the input is a non-empty 1-D sequence of finite
+    numbers (of length `dimension` when given), so JSON null, [] or nested
+    lists never become a stored vector.
+    """
+    if isinstance(vector, (bytes, bytearray, memoryview)):
+        blob = bytes(vector)
+        if not blob or len(blob) % VECTOR_DTYPE.itemsize:
+            raise ValueError(f"Vector blob of {len(blob)} bytes is not float32 data")
+        if dimension is not None and len(blob) != dimension * VECTOR_DTYPE.itemsize:
+            raise ValueError(f"Vector blob of {len(blob)} bytes does not have dimension {dimension}")
+        return blob
+    if isinstance(vector, str):
+        vector = json.loads(vector)
+    if vector is None:
+        raise ValueError("Vector is null")
+
+    try:
+        array = np.ascontiguousarray(vector, dtype=VECTOR_DTYPE)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Vector is not numeric - {e}") from e
+    if array.ndim != 1 or array.size == 0:
+        raise ValueError(f"Vector must be a non-empty 1-D sequence, got shape {array.shape}")
+    if dimension is not None and array.size != dimension:
+        raise ValueError(f"Vector has dimension {array.size}, expected {dimension}")
+    if not np.isfinite(array).all():
+        raise ValueError("Vector contains NaN or infinite values")
+    return array.tobytes()
+
+
+def decode_vector(blob: Union[bytes, memoryview]) -> np.ndarray:
+    """Zero-copy view of a stored blob. The returned array is read-only."""
+    return np.frombuffer(blob, dtype=VECTOR_DTYPE)
+
+
+def decode_matrix(
+    blobs: Iterable[Union[bytes, memoryview]],
+    dimension: Optional[int] = None,
+    ids: Optional[Sequence] = None,
+) -> np.ndarray:
+    """
+    Stack blobs into one contiguous (n, dimension) float32 matrix.
+
+    Every blob must hold exactly `dimension` values; a blob of another size
+    raises ValueError naming its row (its entry in `ids` when given) rather
+    than shifting later rows onto the wrong ids. The blobs are appended into
+    a single writable buffer and viewed with np.frombuffer, so the only copy
+    is the join itself.
+    """
+    buffer = bytearray()
+    row_size = None if dimension is None else dimension * VECTOR_DTYPE.itemsize
+    for row, blob in enumerate(blobs):
+        if row_size is None:
+            raise ValueError("dimension is required to reshape a non-empty matrix")
+        if blob is None or len(blob) != row_size:
+            name = ids[row] if ids is not None else row
+            size = "NULL" if blob is None else f"{len(blob)} bytes"
+            raise ValueError(
+                f"Embedding of row {name} is {size}, expected {row_size} "
+                f"bytes for dimension {dimension}"
+            )
+        buffer += blob
+    if not buffer:
+        return np.empty((0, dimension or 0), dtype=np.float32)
+    return np.frombuffer(buffer, dtype=VECTOR_DTYPE).reshape(-1, dimension)
+
+
+def vector_to_list(vector: Optional[np.ndarray]) -> Optional[List[float]]:
+    return None if vector is None else vector.astype(np.float32).tolist()
+
+
+class Float32Vector(TypeDecorator):
+    """
+    Stores an embedding as a BYTEA of little-endian float32 values.
+
+    Accepts lists, NumPy arrays or legacy JSON strings on write and returns a
+    read-only np.ndarray on read.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_vector(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decode_vector(value)
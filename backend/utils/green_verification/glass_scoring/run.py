@@ -62,50 +62,43 @@ class CupDetectorScorer:
         Detect cups/glasses and return normalized coordinates.
         img_rgb: Numpy array (H, W, 3) - uint8 or float.
         """
+        return self.detect_batch([img_rgb])[0]
+
+    def detect_batch(self, images: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """Detect cups/glasses in several images with one model call."""
         # Chạy inference
         self._load_model()
-        if self._model is None:
-            return []
-
-        H, W = img_rgb.shape[:2]
-
-        # --- DEBUG: In ra thông tin ảnh đầu vào ---
-        print(f"[CupDetector] Input shape: {img_rgb.shape}, Max Val: {img_rgb.max()}, Min Val: {img_rgb.min()}")
+        if self._model is None or not images:
+            return [[] for _ in images]
 
-        # --- THAY ĐỔI Ở ĐÂY ---
-        # 1. Giảm conf xuống 0.05 hoặc 0.1 để bắt nhạy hơn
-        # 2. Bật verbose=True để xem log của YOLO
         results = self._model(
-            img_rgb,
+            images,
             imgsz=640,
-            conf=0.25,    # <--- Giảm xuống 0.1 (10%)
+            conf=self.conf_threshold,
             device=self.device,
-            verbose=False # <--- Bật lên để xem log
+            verbose=False
         )
 
-        detections = []
+        return [self._detections_from_result(res) for res in results]
 
-        for res in results:
-            boxes = res.boxes
-            for box in boxes:
-                # Lấy thông tin cơ bản
-                conf = float(box.conf.item()) if hasattr(box.conf, "item") else float(box.conf)
-                cls_id = int(box.cls.item()) if hasattr(box.cls, "item") else int(box.cls)
-
-                class_name = (
-                    str(self._model.names[cls_id])
-                    if hasattr(self._model, "names") and cls_id in self._model.names
-                    else str(cls_id)
-                )
-
-                material = class_name.lower()
-
-                detection_info = {
-            "label": class_name,
-            "material": material,
-            "confidence": conf,
-        }
+    def _detections_from_result(self, res) -> List[Dict[str, Any]]:
+        detections = []
 
-        detections.append(detection_info)
+        for box in res.boxes:
+            # Lấy thông tin cơ bản
+            conf = float(box.conf.item()) if hasattr(box.conf, "item") else float(box.conf)
+            cls_id = int(box.cls.item()) if hasattr(box.cls, "item") else int(box.cls)
+
+            class_name = (
+                str(self._model.names[cls_id])
+                if hasattr(self._model, "names") and cls_id in self._model.names
+                else str(cls_id)
+            )
+
+            detections.append({
+                "label": class_name,
+                "material": class_name.lower(),
+                "confidence": conf,
+            })
 
         return detections
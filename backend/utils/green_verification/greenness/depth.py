@@ -2,12 +2,11 @@
 
 import os
 
+import cv2
 import numpy as np
 import torch
-import torch.hub
 from . import utils
-
-first_execution = True
+from .midas_net import MidasNetSmall
 
 first_execution = True
 
@@ -69,41 +68,86 @@ def process(device, model, image, target_size, optimize, use_camera):
 
     return prediction
 
-def run(img_sources, optimize=False, height=None,
-        square=False, grayscale=False):
-    """ img_sources: list of image URLs"""
-    print("Initialize")
-
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    print("Device: %s" % device)
+# MiDaS v2.1 small expects 256px inputs normalized with ImageNet statistics
+MIDAS_INPUT_SIZE = 256
+MIDAS_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+MIDAS_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
 
-    model_type = "MiDaS_small"
-    model = torch.hub.load("isl-org/MiDaS", model_type, trust_repo=True)
-    transforms = torch.hub.load("isl-org/MiDaS", "transforms", trust_repo=True)
-    transform = transforms.small_transform
 
+def load_midas_model(weights_path, device):
+    """
+    Build MiDaS_small from the vendored network definition and load its
+    weights from a local file; nothing is fetched from torch.hub.
+    """
+    if not os.path.exists(weights_path):
+        raise FileNotFoundError(f"MiDaS weights not found at {weights_path}")
 
+    model = MidasNetSmall()
+    model.load(weights_path)
     model.to(device)
-    # get input
-    num_images = len(img_sources)
-    print("Start processing")
-    results = []
+    model.eval()
+    return model
 
-    for index, url in enumerate(img_sources):
 
-        # input
-        original_image_rgb = utils.load_image_from_url(url)  # uint8 [0, 255]
-        image = transform(original_image_rgb)
+def prepare_batch(images_rgb):
+    """Resize uint8 RGB images to a square MiDaS input and stack them into one (N, 3, H, W) tensor."""
+    batch = np.empty((len(images_rgb), 3, MIDAS_INPUT_SIZE, MIDAS_INPUT_SIZE), dtype=np.float32)
+    for i, image in enumerate(images_rgb):
+        resized = cv2.resize(
+            image, (MIDAS_INPUT_SIZE, MIDAS_INPUT_SIZE), interpolation=cv2.INTER_CUBIC
+        ).astype(np.float32) / 255.0
+        batch[i] = ((resized - MIDAS_MEAN) / MIDAS_STD).transpose(2, 0, 1)
+    return torch.from_numpy(batch)
 
-        # compute
-        with torch.no_grad():
-            prediction = process(device, model, image, original_image_rgb.shape[1::-1],
-                                optimize, False)
-        results.append(prediction.astype(np.float32))
 
+def predict_depth_batch(model, device, images_rgb, optimize=False):
+    """
+    Depth maps for several images with a single forward pass. Each map is
+    interpolated back to its own image size.
+    """
+    if not images_rgb:
+        return []
+
+    sample = prepare_batch(images_rgb).to(device)
+    if optimize and device == torch.device("cuda"):
+        sample = sample.to(memory_format=torch.channels_last).half()
+
+    with torch.no_grad():
+        predictions = model.forward(sample).unsqueeze(1).float()
+        results = []
+        for prediction, image in zip(predictions, images_rgb):
+            height, width = image.shape[:2]
+            depth = torch.nn.functional.interpolate(
+                prediction.unsqueeze(0),
+                size=(height, width),
+                mode="bicubic",
+                align_corners=False,
+            )
+            results.append(depth.squeeze().cpu().numpy().astype(np.float32))
     return results
 
 
+def run(img_sources, optimize=False, height=None,
+        square=False, grayscale=False, weights_path=None):
+    """ img_sources: list of image URLs"""
+    print("Initialize")
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print("Device: %s" % device)
+
+    if weights_path is None:
+        weights_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "models",
+            "midas_v21_small_256.pt",
+        )
+    model = load_midas_model(weights_path, device)
+
+    print("Start processing")
+    images = [utils.load_image_from_url(url) for url in img_sources]  # uint8 [0, 255]
+    return predict_depth_batch(model, device, images, optimize)
+
+
 if __name__ == "__main__":
     input_path = [
         "https://lh3.googleusercontent.com/place-photos/AEkURDx03-8vfQPvYg11_8scYfRtdK8213AArtwFtbT84UMSkW6W3kFRfeBeY_-IkPETwspgDMXtamZR6_6xDFTpwXGlpGr1YEx36Sl1fscuG_nV8nBYQYXkD4V9-GM7pE7MVdWdv3qhlxsx9vKetIPfy2ASjA=s1600-w400"
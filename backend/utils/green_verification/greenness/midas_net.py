@@ -0,0 +1,234 @@
+"""
+MiDaS v2.1 small network (MidasNet_small with a tf_efficientnet_lite3 encoder).
+
+Vendored from isl-org/MiDaS and rwightman/gen-efficientnet-pytorch so the
+model can be built offline: upstream builds the encoder through torch.hub,
+which fetches the gen-efficientnet repo (and, without a weights path, its
+ImageNet weights). Module names match upstream, so the released
+midas_v21_small_256.pt state dict loads unchanged.
+"""
+
+import math
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+# TensorFlow-ported EfficientNet weights use TF's BatchNorm epsilon
+_BN_EPS = 1e-3
+
+# tf_efficientnet_lite3 stages after width (1.2) and depth (1.4) scaling:
+# (block type, repeats, kernel size, stride, expansion, output channels)
+_LITE3_STAGES = (
+    ("ds", 1, 3, 1, 1, 24),
+    ("ir", 3, 3, 2, 6, 32),
+    ("ir", 3, 5, 2, 6, 48),
+    ("ir", 5, 3, 2, 6, 96),
+    ("ir", 5, 5, 1, 6, 136),
+    ("ir", 6, 5, 2, 6, 232),
+    ("ir", 1, 3, 1, 6, 384),
+)
+_LITE3_STEM = 32
+# Encoder outputs feeding the decoder (end of stages 1, 2, 4 and 6)
+_LITE3_FEATURES = (32, 48, 136, 384)
+
+
+class Conv2dSame(nn.Conv2d):
+    """Conv2d with TensorFlow "SAME" padding, which is asymmetric for strided convs."""
+
+    def forward(self, x):
+        ih, iw = x.shape[-2:]
+        kh, kw = self.weight.shape[-2:]
+        sh, sw = self.stride
+        pad_h = max((math.ceil(ih / sh) - 1) * sh + kh - ih, 0)
+        pad_w = max((math.ceil(iw / sw) - 1) * sw + kw - iw, 0)
+        if pad_h or pad_w:
+            x = F.pad(x, [pad_w // 2, pad_w - pad_w // 2, pad_h // 2, pad_h - pad_h // 2])
+        return F.conv2d(x, self.weight, self.bias, self.stride, 0, self.dilation, self.groups)
+
+
+def _conv_same(in_chs, out_chs, kernel_size, stride=1, depthwise=False):
+    groups = in_chs if depthwise else 1
+    if stride == 1:
+        # Odd kernels at stride 1 pad symmetrically, same as a plain Conv2d
+        return nn.Conv2d(
+            in_chs, out_chs, kernel_size, stride, padding=(kernel_size - 1) // 2,
+            groups=groups, bias=False,
+        )
+    return Conv2dSame(in_chs, out_chs, kernel_size, stride, groups=groups, bias=False)
+
+
+class DepthwiseSeparableConv(nn.Module):
+    def __init__(self, in_chs, out_chs, kernel_size, stride):
+        super().__init__()
+        self.has_residual = stride == 1 and in_chs == out_chs
+        self.conv_dw = _conv_same(in_chs, in_chs, kernel_size, stride, depthwise=True)
+        self.bn1 = nn.BatchNorm2d(in_chs, eps=_BN_EPS)
+        self.act1 = nn.ReLU6(inplace=True)
+        self.conv_pw = _conv_same(in_chs, out_chs, 1)
+        self.bn2 = nn.BatchNorm2d(out_chs, eps=_BN_EPS)
+        self.act2 = nn.Identity()
+
+    def forward(self, x):
+        residual = x
+        x = self.act1(self.bn1(self.conv_dw(x)))
+        x = self.act2(self.bn2(self.conv_pw(x)))
+        if self.has_residual:
+            x = x + residual
+        return x
+
+
+class InvertedResidual(nn.Module):
+    def __init__(self, in_chs, out_chs, kernel_size, stride, exp_ratio):
+        super().__init__()
+        mid_chs = in_chs * exp_ratio
+        self.has_residual = stride == 1 and in_chs == out_chs
+        self.conv_pw = _conv_same(in_chs, mid_chs, 1)
+        self.bn1 = nn.BatchNorm2d(mid_chs, eps=_BN_EPS)
+        self.act1 = nn.ReLU6(inplace=True)
+        self.conv_dw = _conv_same(mid_chs, mid_chs, kernel_size, stride, depthwise=True)
+        self.bn2 = nn.BatchNorm2d(mid_chs, eps=_BN_EPS)
+        self.act2 = nn.ReLU6(inplace=True)
+        self.conv_pwl = _conv_same(mid_chs, out_chs, 1)
+        self.bn3 = nn.BatchNorm2d(out_chs, eps=_BN_EPS)
+
+    def forward(self, x):
+        residual = x
+        x = self.act1(self.bn1(self.conv_pw(x)))
+        x = self.act2(self.bn2(self.conv_dw(x)))
+        x = self.bn3(self.conv_pwl(x))
+        if self.has_residual:
+            x = x + residual
+        return x
+
+
+def _make_efficientnet_lite3_encoder():
+    """The four encoder stages MidasNet_small takes from tf_efficientnet_lite3."""
+    stages = []
+    in_chs = _LITE3_STEM
+    for block_type, repeats, kernel_size, stride, exp_ratio, out_chs in _LITE3_STAGES:
+        blocks = []
+        for i in range(repeats):
+            block_stride = stride if i == 0 else 1
+            if block_type == "ds":
+                blocks.append(DepthwiseSeparableConv(in_chs, out_chs, kernel_size, block_stride))
+            else:
+                blocks.append(
+                    InvertedResidual(in_chs, out_chs, kernel_size, block_stride, exp_ratio)
+                )
+            in_chs = out_chs
+        stages.append(nn.Sequential(*blocks))
+
+    encoder = nn.Module()
+    encoder.layer1 = nn.Sequential(
+        _conv_same(3, _LITE3_STEM, 3, stride=2),
+        nn.BatchNorm2d(_LITE3_STEM, eps=_BN_EPS),
+        nn.ReLU6(inplace=True),
+        *stages[0:2],
+    )
+    encoder.layer2 = nn.Sequential(*stages[2:3])
+    encoder.layer3 = nn.Sequential(*stages[3:5])
+    encoder.layer4 = nn.Sequential(*stages[5:7])
+    return encoder
+
+
+def _make_scratch(in_shapes, features):
+    """3x3 convs projecting each encoder output to 1, 2, 4 and 8 x features channels."""
+    scratch = nn.Module()
+    for i, in_chs in enumerate(in_shapes):
+        setattr(
+            scratch,
+            f"layer{i + 1}_rn",
+            nn.Conv2d(in_chs, features * 2 ** i, kernel_size=3, stride=1, padding=1, bias=False),
+        )
+    return scratch
+
+
+class Interpolate(nn.Module):
+    def __init__(self, scale_factor, mode):
+        super().__init__()
+        self.scale_factor = scale_factor
+        self.mode = mode
+
+    def forward(self, x):
+        return F.interpolate(x, scale_factor=self.scale_factor, mode=self.mode, align_corners=False)
+
+
+class ResidualConvUnit(nn.Module):
+    def __init__(self, features, activation):
+        super().__init__()
+        self.conv1 = nn.Conv2d(features, features, kernel_size=3, stride=1, padding=1, bias=True)
+        self.conv2 = nn.Conv2d(features, features, kernel_size=3, stride=1, padding=1, bias=True)
+        self.activation = activation
+
+    def forward(self, x):
+        out = self.conv1(self.activation(x))
+        out = self.conv2(self.activation(out))
+        return out + x
+
+
+class FeatureFusionBlock(nn.Module):
+    def __init__(self, features, activation, expand=False, align_corners=True):
+        super().__init__()
+        self.align_corners = align_corners
+        out_features = features // 2 if expand else features
+        self.out_conv = nn.Conv2d(features, out_features, kernel_size=1, stride=1, padding=0, bias=True)
+        self.resConfUnit1 = ResidualConvUnit(features, activation)
+        self.resConfUnit2 = ResidualConvUnit(features, activation)
+
+    def forward(self, *xs):
+        output = xs[0]
+        if len(xs) == 2:
+            output = output + self.resConfUnit1(xs[1])
+        output = self.resConfUnit2(output)
+        output = F.interpolate(
+            output, scale_factor=2, mode="bilinear", align_corners=self.align_corners
+        )
+        return self.out_conv(output)
+
+
+class MidasNetSmall(nn.Module):
+    """Monocular relative depth; returns (N, H, W) inverse depth for (N, 3, H, W) input."""
+
+    def __init__(self, features=64, non_negative=True, align_corners=True):
+        super().__init__()
+        self.pretrained = _make_efficientnet_lite3_encoder()
+        self.scratch = _make_scratch(_LITE3_FEATURES, features)
+
+        self.scratch.activation = nn.ReLU(False)
+        activation = self.scratch.activation
+        self.scratch.refinenet4 = FeatureFusionBlock(features * 8, activation, True, align_corners)
+        self.scratch.refinenet3 = FeatureFusionBlock(features * 4, activation, True, align_corners)
+        self.scratch.refinenet2 = FeatureFusionBlock(features * 2, activation, True, align_corners)
+        self.scratch.refinenet1 = FeatureFusionBlock(features, activation, False, align_corners)
+
+        self.scratch.output_conv = nn.Sequential(
+            nn.Conv2d(features, features // 2, kernel_size=3, stride=1, padding=1),
+            Interpolate(scale_factor=2, mode="bilinear"),
+            nn.Conv2d(features // 2, 32, kernel_size=3, stride=1, padding=1),
+            activation,
+            nn.Conv2d(32, 1, kernel_size=1, stride=1, padding=0),
+            nn.ReLU(True) if non_negative else nn.Identity(),
+            nn.Identity(),
+        )
+
+    def load(self, path):
+        parameters = torch.load(path, map_location=torch.device("cpu"))
+        # Training checkpoints wrap the weights with the optimizer state
+        if "optimizer" in parameters:
+            parameters = parameters["model"]
+        self.load_state_dict(parameters)
+
+    def forward(self, x):
+        layer_1 = self.pretrained.layer1(x)
+        layer_2 = self.pretrained.layer2(layer_1)
+        layer_3 = self.pretrained.layer3(layer_2)
+        layer_4 = self.pretrained.layer4(layer_3)
+
+        path_4 = self.scratch.refinenet4(self.scratch.layer4_rn(layer_4))
+        path_3 = self.scratch.refinenet3(path_4, self.scratch.layer3_rn(layer_3))
+        path_2 = self.scratch.refinenet2(path_3, self.scratch.layer2_rn(layer_2))
+        path_1 = self.scratch.refinenet1(path_2, self.scratch.layer1_rn(layer_1))
+
+        out = self.scratch.output_conv(path_1)
+        return torch.squeeze(out, dim=1)
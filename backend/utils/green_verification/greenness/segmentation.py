@@ -1,8 +1,9 @@
 import cv2
 import numpy as np
-import requests
 from ultralytics import YOLO
 
+from utils.green_verification.image_loader import image_loader
+
 
 class TreeSegmenter:
     def __init__(self, model_name="best.pt", target_min=512):
@@ -14,14 +15,8 @@ class TreeSegmenter:
     # 1. LOAD IMAGE (BGR uint8)
     # --------------------------
     def load_image_from_url(self, url: str):
-        resp = requests.get(url)
-        data = np.frombuffer(resp.content, np.uint8)
-        img_bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
-
-        if img_bgr is None:
-            raise Exception(f"Failed to decode image: {url}")
-
-        return img_bgr  # BGR uint8
+        img_rgb = image_loader.load_image(url)
+        return cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)  # BGR uint8
 
     # --------------------------
     # 2. UPSCALE
@@ -47,15 +42,31 @@ class TreeSegmenter:
             - masks_list: list of mask np.ndarray (uint8)
             - combined_mask: union of all masks
         """
+        return self.process_images([self.load_image_from_url(url)])[0]
+
+    def process_images(self, images_bgr):
+        """
+        Segment several already-decoded BGR images with one model call.
+
+        Output:
+            - list of (masks_list, combined_mask), one per input image
+        """
+        if not images_bgr:
+            return []
+
+        upscaled = [self.upscale(img) for img in images_bgr]
 
-        # Load and upscale
-        img = self.load_image_from_url(url)
-        img_up = self.upscale(img)
+        # YOLO segmentation, batched
+        results = self.model(upscaled, conf=0.1, retina_masks=True, verbose=False)
 
-        H, W = img_up.shape[:2]
+        return [
+            self._masks_from_result(result, img_up.shape[:2])
+            for result, img_up in zip(results, upscaled)
+        ]
 
-        # YOLO segmentation
-        result = self.model(img_up, conf=0.1, retina_masks=True, verbose=False)[0]
+    @staticmethod
+    def _masks_from_result(result, shape):
+        H, W = shape
 
         # Prepare outputs
         masks_list = []
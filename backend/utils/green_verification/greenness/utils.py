@@ -5,7 +5,8 @@ import re
 import numpy as np
 import cv2
 import torch
-import requests
+
+from utils.green_verification.image_loader import image_loader
 
 
 def read_pfm(path):
@@ -202,13 +203,5 @@ def write_depth(path, depth, grayscale, bits=1):
 
 
 def load_image_from_url(url):
-    """Download image → decode using cv2 → return RGB uint8 in [0,255]."""
-    resp = requests.get(url)
-    data = np.frombuffer(resp.content, np.uint8)
-    img_bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
-
-    if img_bgr is None:
-        raise Exception(f"Failed to decode image at {url}")
-
-    img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
-    return img_rgb
+    """Download image (shared loader, cached briefly) → return RGB uint8 in [0,255]."""
+    return image_loader.load_image(url)
@@ -0,0 +1,209 @@
+import asyncio
+import io
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+import httpx
+import numpy as np
+
+from integration.http_clients import get_http_client
+from utils.config import settings
+
+# cv2 can shrink JPEGs by these factors while decoding (DCT scaling)
+_REDUCED_DECODE_FACTORS = (8, 4, 2)
+
+
+def _image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from the image header without decoding pixels."""
+    try:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def decode_image(data: bytes, max_side: Optional[int] = None) -> np.ndarray:
+    """
+    Decode to RGB uint8. With max_side, large images are reduced during
+    decoding when the format allows it and then resized so the longer side
+    is at most max_side.
+    """
+    # Import here so the API process only loads OpenCV when images are decoded
+    import cv2
+
+    buffer = np.frombuffer(data, np.uint8)
+    flag = cv2.IMREAD_COLOR
+    if max_side:
+        size = _image_size(data)
+        if size:
+            for factor in _REDUCED_DECODE_FACTORS:
+                if max(size) / factor >= max_side:
+                    flag = getattr(cv2, f"IMREAD_REDUCED_COLOR_{factor}")
+                    break
+
+    img_bgr = cv2.imdecode(buffer, flag)
+    if img_bgr is None:
+        raise ValueError("Failed to decode image")
+
+    if max_side:
+        h, w = img_bgr.shape[:2]
+        scale = max_side / max(h, w)
+        if scale < 1.0:
+            img_bgr = cv2.resize(
+                img_bgr, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA
+            )
+
+    return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+
+
+class ImageLoader:
+    """
+    Shared image fetcher for the green-verification models.
+
+    URLs are fetched concurrently (bounded), streamed with a byte cap and
+    decoded once. Decoded arrays are cached for a short time so cup
+    detection, segmentation and depth all reuse a single download.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        max_bytes: int,
+        timeout: float,
+        max_side: Optional[int],
+        cache_size: int,
+        cache_ttl_seconds: float,
+    ):
+        self.concurrency = concurrency
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_side = max_side
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._cache: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_downloaded = 0
+
+    def _cached(self, url: str) -> Optional[np.ndarray]:
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        image, expires_at = entry
+        if expires_at <= time.time():
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return image
+
+    def _remember(self, url: str, image: np.ndarray):
+        image.setflags(write=False)
+        self._cache[url] = (image, time.time() + self.cache_ttl_seconds)
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _fetch_bytes(self, client: httpx.AsyncClient, url: str) -> bytes:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            declared = int(response.headers.get("content-length") or 0)
+            if declared > self.max_bytes:
+                raise ValueError(f"Image is {declared} bytes, limit is {self.max_bytes}")
+
+            chunks = bytearray()
+            async for chunk in response.aiter_bytes():
+                chunks.extend(chunk)
+                if len(chunks) > self.max_bytes:
+                    raise ValueError(f"Image exceeds {self.max_bytes} bytes")
+        self.bytes_downloaded += len(chunks)
+        return bytes(chunks)
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency),
+        )
+
+    async def load_many(
+        self, urls: List[str], client: Optional[httpx.AsyncClient] = None
+    ) -> List[Union[np.ndarray, Exception]]:
+        """
+        One decoded RGB image per URL, or the exception that URL raised.
+        Downloads use the shared "images" connection pool unless a client
+        is passed.
+        """
+        images: Dict[str, Union[np.ndarray, Exception]] = {}
+        missing = []
+        for url in dict.fromkeys(urls):
+            cached = self._cached(url)
+            if cached is not None:
+                self.hits += 1
+                images[url] = cached
+            else:
+                self.misses += 1
+                missing.append(url)
+
+        if missing:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            if client is None:
+                client = get_http_client("images")
+
+            async def load(url: str):
+                try:
+                    async with semaphore:
+                        data = await self._fetch_bytes(client, url)
+                    image = await asyncio.to_thread(decode_image, data, self.max_side)
+                    self._remember(url, image)
+                    images[url] = image
+                except Exception as e:
+                    images[url] = e
+
+            await asyncio.gather(*(load(url) for url in missing))
+
+        return [images[url] for url in urls]
+
+    def load_images(self, urls: List[str]) -> List[Union[np.ndarray, Exception]]:
+        """
+        Blocking form of load_many() for model code running outside an event
+        loop. Each call runs its own loop, so it uses its own client rather
+        than the pooled one bound to the API's loop.
+        """
+
+        async def run():
+            async with self._create_client() as client:
+                return await self.load_many(urls, client)
+
+        return asyncio.run(run())
+
+    def load_image(self, url: str) -> np.ndarray:
+        result = self.load_images([url])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_downloaded": self.bytes_downloaded,
+        }
+
+
+image_loader = ImageLoader(
+    concurrency=settings.IMAGE_FETCH_CONCURRENCY,
+    max_bytes=settings.IMAGE_FETCH_MAX_BYTES,
+    timeout=settings.IMAGE_FETCH_TIMEOUT_SECONDS,
+    max_side=settings.IMAGE_DECODE_MAX_SIDE,
+    cache_size=settings.IMAGE_CACHE_MAX_SIZE,
+    cache_ttl_seconds=settings.IMAGE_CACHE_TTL_SECONDS,
+)
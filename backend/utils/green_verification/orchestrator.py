@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 from typing import List, Dict, Any, Optional
 
 # ==============================================================================
@@ -54,6 +55,7 @@ class GreenCoverageOrchestrator:
         self,
         segmentation_model: str = "best.pt",
         cup_model_name: str = "glass_classification_model.pt",
+        depth_model_name: str = "midas_v21_small_256.pt",
         green_threshold: float = 0.15,
         optimize: bool = False,
         height: Optional[int] = None,
@@ -63,6 +65,7 @@ class GreenCoverageOrchestrator:
         self.green_threshold = float(green_threshold)
         self.segmentation_model = segmentation_model
         self.cup_model_name = cup_model_name
+        self.depth_model_name = depth_model_name
         self.depth_optimize = optimize
         self.depth_height = height
         self.depth_square = square
@@ -70,13 +73,21 @@ class GreenCoverageOrchestrator:
         # Models will be loaded on first use
         self.tree_segmenter = None
         self.cup_detector = None
+        self.depth_model = None
         self.device = None
+        self._load_lock = threading.Lock()
 
     def _ensure_models_loaded(self):
         """Load models only when actually needed"""
         if self._models_loaded:
             return
 
+        with self._load_lock:
+            if self._models_loaded:
+                return
+            self._load_models()
+
+    def _load_models(self):
         print("[Orchestrator] Loading ML models for the first time...")
 
         # Lazy load heavy dependencies
@@ -84,6 +95,7 @@ class GreenCoverageOrchestrator:
 
         # Import here to avoid loading at module import time
         import torch
+        from .greenness.depth import load_midas_model
         from .greenness.segmentation import TreeSegmenter
 
         try:
@@ -110,27 +122,29 @@ class GreenCoverageOrchestrator:
         else:
             self.cup_detector = None
 
+        # --- 3. Init Depth model (MiDaS small, local weights) ---
+        depth_model_path = os.path.join(models_dir, self.depth_model_name)
+        print(f"[Orchestrator] Loading Depth model: {depth_model_path}")
+        self.depth_model = load_midas_model(depth_model_path, self.device)
+
         self._models_loaded = True
         print("[Orchestrator] Models loaded and ready.")
 
-    def _get_depth_map(self, url: str):
-        """
-        Use depth.run() which handles everything internally.
-        Returns depth map for a single image URL.
-        """
-        from .greenness import depth
-
-        # depth.run() takes a list of URLs and returns list of depth maps
-        results = depth.run(
-            img_sources=[url],
-            optimize=self.depth_optimize,
-            height=self.depth_height,
-            square=self.depth_square,
-            grayscale=False
-        )
+    def warm_up(self):
+        """Load every model up front (used by the startup warm-up task)."""
+        self._ensure_models_loaded()
+
+    @property
+    def models_loaded(self) -> bool:
+        return self._models_loaded
 
-        # Return the first (and only) result
-        return results[0]
+    def _get_depth_maps(self, images_rgb):
+        """Depth maps for decoded RGB images, computed in one batch with the cached model."""
+        from .greenness.depth import predict_depth_batch
+
+        return predict_depth_batch(
+            self.depth_model, self.device, images_rgb, optimize=self.depth_optimize
+        )
 
     @staticmethod
     def _normalize_depth_map(depth):
@@ -142,94 +156,140 @@ class GreenCoverageOrchestrator:
         else:
             return np.zeros_like(depth, dtype=np.float32)
 
-    def process_single_image(self, url: str) -> Dict[str, Any]:
-        # Ensure models are loaded before processing
-        self._ensure_models_loaded()
+    def _score_image(self, combined_mask, depth_map, cup_detections) -> float:
+        import numpy as np
+        import cv2
 
-        try:
-            import numpy as np
-            import cv2
-            from .greenness import utils
+        # Resize depth khớp mask
+        mask_h, mask_w = combined_mask.shape[:2]
+        if depth_map.shape[:2] != (mask_h, mask_w):
+            depth_map_resized = cv2.resize(depth_map, (mask_w, mask_h), interpolation=cv2.INTER_CUBIC)
+        else:
+            depth_map_resized = depth_map
+
+        # Tính điểm
+        total_pixels = combined_mask.size
+        green_pixels = int(np.count_nonzero(combined_mask > 0))
+        green_proportion = float(green_pixels) / float(total_pixels) if total_pixels > 0 else 0.0
+
+        depth_weighted = 0.0
+        if green_pixels > 0:
+            mask_bool = combined_mask > 0
+            depth_norm_full = self._normalize_depth_map(depth_map_resized)
+            veg_depth_norm = depth_norm_full[mask_bool]
+            depth_weighted = float(1.0 - np.clip(np.mean(veg_depth_norm), 0.0, 1.0))
+
+        # Scale green proportion để range đẹp hơn
+        gp_norm = min(green_proportion * 3.0, 1.0)
+
+        # Depth weighting mềm hơn
+        dw_norm = depth_weighted ** 0.8
 
-            # 1. Load Image (Float32 RGB [0,1])
-            original_image_float = utils.load_image_from_url(url)
+        green_score = gp_norm * dw_norm
+        #check if plastic appears in the image
+        if any(cup.get("material") == "plastic" for cup in cup_detections):
+            green_score *= 0.7
 
-            # Convert sang Uint8 [0,255] cho Cup Detector
-            original_image_uint8 = (original_image_float * 255).astype(np.uint8)
+        return green_score
 
-            # 2. Cup Detection
-            cup_detections = []
-            if self.cup_detector:
-                cup_detections = self.cup_detector.detect(original_image_uint8)
+    def score_images(self, images_rgb) -> List[Dict[str, Any]]:
+        """
+        Score decoded RGB images: cup detection, tree segmentation and depth
+        each run as one batch. Returns green_score, mask_coverage, cup_count
+        and verified per image; raises if batch inference fails.
+        """
+        # Ensure models are loaded before processing
+        self._ensure_models_loaded()
+
+        import numpy as np
+        import cv2
 
-            # 3. Tree Segmentation
-            masks_list, combined_mask = self.tree_segmenter.process_image(url)
+        if not images_rgb:
+            return []
 
-            # 4. Logic Depth & Green Score
+        # 2. Cup Detection
+        if self.cup_detector:
+            cup_detections = self.cup_detector.detect_batch(images_rgb)
+        else:
+            cup_detections = [[] for _ in images_rgb]
+
+        # 3. Tree Segmentation (segmenter works on BGR)
+        images_bgr = [cv2.cvtColor(img, cv2.COLOR_RGB2BGR) for img in images_rgb]
+        segmentations = self.tree_segmenter.process_images(images_bgr)
+
+        # 4. Depth only for images that contain vegetation
+        green = [
+            i for i, (_, mask) in enumerate(segmentations)
+            if mask is not None and mask.size > 0 and mask.any()
+        ]
+        depth_maps = dict(zip(green, self._get_depth_maps([images_rgb[i] for i in green])))
+
+        results = []
+        for i in range(len(images_rgb)):
+            combined_mask = segmentations[i][1]
             # Nếu không có cây -> Score 0
-            if combined_mask is None or combined_mask.size == 0:
-                return {
-                    "url": url,
-                    "combined_mask": [],
-                    "green_score": 0.0,
-                    "verified": False,
-                    "cup_detections": cup_detections
-                }
-
-            # Tính Depth using midas.run()
-            depth_map = self._get_depth_map(url)
-
-            # Resize depth khớp mask
-            mask_h, mask_w = combined_mask.shape[:2]
-            if depth_map.shape[:2] != (mask_h, mask_w):
-                depth_map_resized = cv2.resize(depth_map, (mask_w, mask_h), interpolation=cv2.INTER_CUBIC)
+            if i not in depth_maps:
+                green_score = 0.0
+                mask_coverage = 0.0
             else:
-                depth_map_resized = depth_map
-
-            # Tính điểm
-            total_pixels = combined_mask.size
-            green_pixels = int(np.count_nonzero(combined_mask > 0))
-            green_proportion = float(green_pixels) / float(total_pixels) if total_pixels > 0 else 0.0
+                green_score = self._score_image(combined_mask, depth_maps[i], cup_detections[i])
+                mask_coverage = float(np.count_nonzero(combined_mask)) / float(combined_mask.size)
 
-            depth_weighted = 0.0
-            if green_pixels > 0:
-                mask_bool = combined_mask > 0
-                depth_norm_full = self._normalize_depth_map(depth_map_resized)
-                veg_depth_norm = depth_norm_full[mask_bool]
-                depth_weighted = float(1.0 - np.clip(np.mean(veg_depth_norm), 0.0, 1.0))
+            results.append({
+                "green_score": green_score,
+                "mask_coverage": mask_coverage,
+                "cup_count": len(cup_detections[i]),
+                "verified": bool(green_score >= self.green_threshold),
+                "cup_detections": cup_detections[i],
+            })
 
-            # Scale green proportion để range đẹp hơn
-            gp_norm = min(green_proportion * 3.0, 1.0)
+        return results
 
-            # Depth weighting mềm hơn
-            dw_norm = depth_weighted ** 0.8
+    def process_images(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Score every image of a place. Images are fetched concurrently and
+        decoded once by the shared loader, then scored with score_images().
+        Images that fail to load get an "error" entry.
+        """
+        from .image_loader import image_loader
 
-            green_score = gp_norm * dw_norm
-            #check if plastic appears in the image
-            if any(cup.get("material") == "plastic" for cup in cup_detections):
-                green_score *= 0.7
+        results: List[Optional[Dict[str, Any]]] = [None] * len(urls)
 
-            verified = bool(green_score >= self.green_threshold)
+        # 1. Load Images (RGB uint8) once, fetched concurrently
+        images_rgb = []
+        loaded = []
+        for idx, (url, image) in enumerate(zip(urls, image_loader.load_images(urls))):
+            if isinstance(image, Exception):
+                print(f"[Orchestrator] Error on {url}: {image}")
+                results[idx] = {"url": url, "error": str(image), "verified": False}
+            else:
+                images_rgb.append(image)
+                loaded.append(idx)
 
-            return {
-                "url": url,
-                "green_score": green_score
-            }
+        if not loaded:
+            return results
 
+        try:
+            scored = self.score_images(images_rgb)
         except Exception as e:
-            print(f"[Orchestrator] Error on {url}: {e}")
+            print(f"[Orchestrator] Batch inference failed: {e}")
+            for idx in loaded:
+                results[idx] = {"url": urls[idx], "error": str(e), "verified": False}
+            return results
 
-            return {"url": url, "error": str(e), "verified": False}
+        for idx, result in zip(loaded, scored):
+            results[idx] = {"url": urls[idx], **result}
 
-    def process_image_list(self, urls: List[str]) -> Dict[str, Any]:
-        # Ensure models are loaded before processing
-        self._ensure_models_loaded()
+        return results
 
+    def process_single_image(self, url: str) -> Dict[str, Any]:
+        return self.process_images([url])[0]
+
+    def process_image_list(self, urls: List[str]) -> Dict[str, Any]:
         import numpy as np
-        scores = []
-        for url in urls:
-            res = self.process_single_image(url)
-            scores.append(res["green_score"])
+        scores = [
+            res["green_score"] for res in self.process_images(urls) if "green_score" in res
+        ]
 
         total_score = float(np.mean(scores)) if scores else 0.0
 
@@ -237,4 +297,3 @@ class GreenCoverageOrchestrator:
             "total_score": total_score,
             "verified": total_score >= self.green_threshold
         }
-
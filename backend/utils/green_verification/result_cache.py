@@ -0,0 +1,100 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+from schemas.green_verification_schema import GreenVerificationResponse
+from utils.config import settings
+
+models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+# Bump when the scoring formula changes so cached per-image results are recomputed
+SCORING_VERSION = "v1"
+MODEL_FILES = ("best.pt", "glass_classification_model.pt", "midas_v21_small_256.pt")
+
+
+@lru_cache(maxsize=1)
+def get_model_version() -> str:
+    """
+    Identifies the weights and scoring formula. Derived from the model files'
+    names, sizes and modification times, so replacing any weights file
+    invalidates cached results without loading the models.
+    """
+    parts = [SCORING_VERSION]
+    for name in MODEL_FILES:
+        try:
+            stat = os.stat(os.path.join(models_dir, name))
+            parts.append(f"{name}:{stat.st_size}:{int(stat.st_mtime)}")
+        except OSError:
+            parts.append(f"{name}:missing")
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+def image_content_hash(image: np.ndarray) -> str:
+    """Hash of the decoded pixels, so re-signed URLs of the same photo share a result."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(image.shape).encode())
+    digest.update(np.ascontiguousarray(image))
+    return digest.hexdigest()
+
+
+class PlaceResultCache:
+    """
+    In-process TTL cache of place-level verification results. Entries carry
+    the model version they were computed with and are ignored after an
+    upgrade.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[GreenVerificationResponse, str, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, place_id: str) -> Optional[GreenVerificationResponse]:
+        entry = self._entries.get(place_id)
+        if entry is not None:
+            result, model_version, cached_at = entry
+            if (
+                model_version == get_model_version()
+                and (time.time() - cached_at) < self.ttl_seconds
+            ):
+                self._entries.move_to_end(place_id)
+                self.hits += 1
+                return result.model_copy()
+            del self._entries[place_id]
+
+        self.misses += 1
+        return None
+
+    def put(self, place_id: str, result: GreenVerificationResponse):
+        self._entries[place_id] = (result.model_copy(), get_model_version(), time.time())
+        self._entries.move_to_end(place_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, place_id: str):
+        self._entries.pop(place_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+place_result_cache = PlaceResultCache(
+    max_size=settings.GREEN_PLACE_CACHE_MAX_SIZE,
+    ttl_seconds=settings.GREEN_PLACE_CACHE_TTL_SECONDS,
+)
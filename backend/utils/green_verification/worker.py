@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from utils.config import settings
+
+
+# ==============================================================================
+# Worker process side
+# ==============================================================================
+def init_worker():
+    """Load every model once when a worker process starts."""
+    from utils.green_verification.orchestrator import GreenCoverageOrchestrator
+
+    GreenCoverageOrchestrator.get_instance().warm_up()
+
+
+def score_images(urls: List[str]) -> List[Dict[str, Any]]:
+    from utils.green_verification.orchestrator import GreenCoverageOrchestrator
+
+    return GreenCoverageOrchestrator.get_instance().process_images(urls)
+
+
+def score_arrays(images) -> List[Dict[str, Any]]:
+    from utils.green_verification.orchestrator import GreenCoverageOrchestrator
+
+    return GreenCoverageOrchestrator.get_instance().score_images(images)
+
+
+def _ping() -> bool:
+    return True
+
+
+# ==============================================================================
+# API process side
+# ==============================================================================
+class GreenVerificationPool:
+    """
+    Bounded process pool for YOLO, MiDaS and cup detection. Each worker loads
+    the models in its initializer so a job only pays for inference, and the
+    event loop only awaits the result.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already holds torch or asyncio state is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                )
+            return self._executor
+
+    def warm_up(self):
+        """Start every worker so its models are loaded before the first job."""
+        executor = self._get_executor()
+        futures = [executor.submit(_ping) for _ in range(self.max_workers)]
+        wait(futures)
+        for future in futures:
+            future.result()
+
+    async def score_images(self, urls: List[str]) -> List[Dict[str, Any]]:
+        return await self._run(score_images, urls)
+
+    async def score_arrays(self, images) -> List[Dict[str, Any]]:
+        """Score images already decoded in this process (used with the result cache)."""
+        return await self._run(score_arrays, images)
+
+    async def _run(self, fn, arg):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, arg)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool for the next job
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+green_verification_pool = GreenVerificationPool(
+    max_workers=settings.GREEN_VERIFICATION_WORKERS
+)
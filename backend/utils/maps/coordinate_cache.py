@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from utils.config import settings
+
+
+class CoordinateCache:
+    """
+    In-process LRU of place_id -> (lat, lng) sitting in front of the
+    coordinates persisted on the destinations table.
+
+    Entries keep the time they were fetched from Google so the same TTL
+    applies to both tiers.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.api_failures = 0
+
+    def is_fresh(self, fetched_at: float) -> bool:
+        return (time.time() - fetched_at) < self.ttl_seconds
+
+    def get(self, place_id: str) -> Optional[Tuple[float, float]]:
+        entry = self._entries.get(place_id)
+        if entry is None:
+            return None
+
+        lat, lng, fetched_at = entry
+        if not self.is_fresh(fetched_at):
+            del self._entries[place_id]
+            return None
+
+        self._entries.move_to_end(place_id)
+        return lat, lng
+
+    def put(
+        self, place_id: str, lat: float, lng: float, fetched_at: Optional[float] = None
+    ):
+        self._entries[place_id] = (lat, lng, fetched_at or time.time())
+        self._entries.move_to_end(place_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, place_id: str):
+        self._entries.pop(place_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "api_failures": self.api_failures,
+            "hit_rate": (
+                (self.memory_hits + self.db_hits) / lookups if lookups else 0.0
+            ),
+        }
+
+
+coordinate_cache = CoordinateCache(
+    max_size=settings.COORDINATE_CACHE_MAX_SIZE,
+    ttl_seconds=settings.COORDINATE_CACHE_TTL_SECONDS,
+)
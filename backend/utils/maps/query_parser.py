@@ -1,9 +1,5 @@
 import re
-
-import spacy
-from spacy.matcher import PhraseMatcher
-
-nlp = spacy.load("en_core_web_sm")
+from functools import lru_cache
 
 POI_TYPES = [
     "cafe",
@@ -41,11 +37,26 @@ PRICE_PATTERNS = [
     r"less than (\d+)(k|k vnd| vnd)?",
 ]
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-phrase_matcher.add("POI", [nlp.make_doc(t) for t in POI_TYPES])
-phrase_matcher.add("ECO", [nlp.make_doc(t) for t in ECO_TERMS])
-phrase_matcher.add("MOBILITY", [nlp.make_doc(t) for t in MOBILITY_TERMS])
-phrase_matcher.add("TIME", [nlp.make_doc(t) for t in TIME_TERMS])
+
+@lru_cache(maxsize=1)
+def get_nlp():
+    """spaCy pipeline, loaded on the first parse rather than at import time."""
+    import spacy
+
+    return spacy.load("en_core_web_sm")
+
+
+@lru_cache(maxsize=1)
+def get_phrase_matcher():
+    from spacy.matcher import PhraseMatcher
+
+    nlp = get_nlp()
+    phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    phrase_matcher.add("POI", [nlp.make_doc(t) for t in POI_TYPES])
+    phrase_matcher.add("ECO", [nlp.make_doc(t) for t in ECO_TERMS])
+    phrase_matcher.add("MOBILITY", [nlp.make_doc(t) for t in MOBILITY_TERMS])
+    phrase_matcher.add("TIME", [nlp.make_doc(t) for t in TIME_TERMS])
+    return phrase_matcher
 
 
 def extract_price(text):
@@ -65,6 +76,8 @@ def extract_district(text):
 
 
 def parse_query(text):
+    nlp = get_nlp()
+    phrase_matcher = get_phrase_matcher()
     doc = nlp(text)
     result = {
         "category": None,
@@ -0,0 +1,199 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from database.db import UserAsyncSessionLocal
+from repository.route_cache_repository import RouteCacheRepository
+from schemas.destination_schema import Location
+from schemas.route_schema import TransportMode
+from utils.config import settings
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+METERS_PER_DEGREE = 111_320
+
+
+def quantize_location(location: Location, grid_meters: float) -> Tuple[int, int]:
+    """Snap a coordinate to a ~grid_meters cell so nearby requests share a key."""
+    lat_step = grid_meters / METERS_PER_DEGREE
+    lng_step = lat_step / max(math.cos(math.radians(location.latitude)), 1e-6)
+    return (
+        math.floor(location.latitude / lat_step),
+        math.floor(location.longitude / lng_step),
+    )
+
+
+def route_cache_key(
+    kind: str,
+    origin: Location,
+    destination: Location,
+    mode: str,
+    language: str,
+    departure_time: Optional[datetime] = None,
+    extra: str = "",
+) -> str:
+    grid = settings.ROUTE_CACHE_GRID_METERS
+    o_lat, o_lng = quantize_location(origin, grid)
+    d_lat, d_lng = quantize_location(destination, grid)
+    bucket = (
+        int(departure_time.timestamp() // settings.ROUTE_CACHE_TRAFFIC_BUCKET_SECONDS)
+        if departure_time
+        else "any"
+    )
+    return f"{kind}:{mode}:{language}:{o_lat},{o_lng}:{d_lat},{d_lng}:{bucket}:{extra}"
+
+
+def route_cache_ttl(mode: str) -> int:
+    """Transit schedules change quickly; walking paths barely change."""
+    return {
+        TransportMode.car.value: settings.ROUTE_CACHE_TTL_DRIVING_SECONDS,
+        TransportMode.motorbike.value: settings.ROUTE_CACHE_TTL_DRIVING_SECONDS,
+        TransportMode.bus.value: settings.ROUTE_CACHE_TTL_TRANSIT_SECONDS,
+        TransportMode.metro.value: settings.ROUTE_CACHE_TTL_TRANSIT_SECONDS,
+        TransportMode.train.value: settings.ROUTE_CACHE_TTL_TRANSIT_SECONDS,
+        TransportMode.walking.value: settings.ROUTE_CACHE_TTL_WALKING_SECONDS,
+    }.get(mode, settings.ROUTE_CACHE_TTL_TRANSIT_SECONDS)
+
+
+class RouteCacheBackend(ABC):
+    """Persistent tier behind the in-memory LRU. Payloads are JSON strings."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(payload, expires_at timestamp) for a key, or None."""
+
+    @abstractmethod
+    async def set(self, key: str, kind: str, payload: str, expires_at: float):
+        """Store or replace the payload for a key."""
+
+    async def purge_expired(self) -> int:
+        return 0
+
+
+class DatabaseRouteCacheBackend(RouteCacheBackend):
+    async def get(self, key: str) -> Optional[Tuple[str, float]]:
+        async with UserAsyncSessionLocal() as db:
+            entry = await RouteCacheRepository.get_entry(db, key)
+            if entry is None:
+                return None
+            return entry.payload, entry.expires_at.timestamp()
+
+    async def set(self, key: str, kind: str, payload: str, expires_at: float):
+        async with UserAsyncSessionLocal() as db:
+            await RouteCacheRepository.upsert_entry(
+                db,
+                key,
+                kind,
+                payload,
+                datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            )
+
+    async def purge_expired(self) -> int:
+        async with UserAsyncSessionLocal() as db:
+            return await RouteCacheRepository.delete_expired(db)
+
+
+class RouteCache:
+    """
+    In-memory LRU of parsed route responses with an optional persistent
+    backend. Keys come from route_cache_key(); the kind prefix ("directions"
+    or "optimal") is used to break hit-rate counters down per response type.
+    """
+
+    def __init__(self, max_size: int, backend: Optional[RouteCacheBackend] = None):
+        self.max_size = max_size
+        self.backend = backend
+        self._entries: "OrderedDict[str, Tuple[BaseModel, float]]" = OrderedDict()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, kind: str, counter: str):
+        counters = self._counters.setdefault(
+            kind, {"memory_hits": 0, "backend_hits": 0, "misses": 0, "stores": 0}
+        )
+        counters[counter] += 1
+
+    def _remember(self, key: str, value: BaseModel, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str, model: Type[ModelT]) -> Optional[ModelT]:
+        kind = key.split(":", 1)[0]
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self._count(kind, "memory_hits")
+                return value.model_copy(deep=True)
+            del self._entries[key]
+
+        if self.backend is not None:
+            try:
+                stored = await self.backend.get(key)
+                if stored is not None:
+                    payload, expires_at = stored
+                    value = model.model_validate_json(payload)
+                    self._remember(key, value, expires_at)
+                    self._count(kind, "backend_hits")
+                    return value.model_copy(deep=True)
+            except Exception as e:
+                print(f"WARNING: Route cache backend lookup failed: {e}")
+
+        self._count(kind, "misses")
+        return None
+
+    async def set(self, key: str, value: BaseModel, ttl_seconds: int):
+        kind = key.split(":", 1)[0]
+        expires_at = time.time() + ttl_seconds
+        self._remember(key, value.model_copy(deep=True), expires_at)
+        self._count(kind, "stores")
+
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, kind, value.model_dump_json(), expires_at)
+            except Exception as e:
+                print(f"WARNING: Route cache backend store failed: {e}")
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        for key in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        if self.backend is None:
+            return 0
+        return await self.backend.purge_expired()
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        per_kind = {}
+        for kind, counters in self._counters.items():
+            lookups = counters["memory_hits"] + counters["backend_hits"] + counters["misses"]
+            per_kind[kind] = {
+                **counters,
+                "hit_rate": (
+                    (counters["memory_hits"] + counters["backend_hits"]) / lookups
+                    if lookups
+                    else 0.0
+                ),
+            }
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "kinds": per_kind,
+        }
+
+
+route_cache = RouteCache(
+    max_size=settings.ROUTE_CACHE_MAX_SIZE,
+    backend=DatabaseRouteCacheBackend() if settings.ROUTE_CACHE_PERSIST else None,
+)
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.config import settings
+
+EventHandler = Callable[[dict], Awaitable[None]]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; leave room for the header
+_NOTIFY_CHUNK_SIZE = 7000
+
+
+class SocketBackplane(ABC):
+    """
+    Carries socket events between the API worker processes. Every worker
+    publishes an event once and every worker, including the publisher,
+    hands it to its handler to deliver to the sockets it holds.
+    """
+
+    def __init__(self):
+        self._handler: Optional[EventHandler] = None
+
+    async def start(self, handler: EventHandler):
+        self._handler = handler
+
+    @abstractmethod
+    async def publish(self, event: dict):
+        """Deliver the event to this worker's handler and to every other worker."""
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+
+class InProcessBackplane(SocketBackplane):
+    """Single-worker backplane: publishing delivers straight to the local sockets."""
+
+    async def publish(self, event: dict):
+        if self._handler is not None:
+            await self._handler(event)
+
+
+class PostgresBackplane(SocketBackplane):
+    """
+    Backplane over Postgres LISTEN/NOTIFY, so workers on any node that share
+    the database see each other's events without another service.
+
+    The publishing worker delivers to its own sockets directly and ignores
+    the echo of its own NOTIFY. Payloads over the NOTIFY limit are split
+    into chunks, which Postgres delivers in order because one connection
+    sends them.
+    """
+
+    def __init__(self, dsn: str, channel: str, reconnect_seconds: float = 2.0):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self.origin = uuid.uuid4().hex[:12]
+
+        self._listen_conn = None
+        self._publish_conn = None
+        self._publish_lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+        # (origin, event id) -> received chunks
+        self._partial: Dict[Tuple[str, str], List[str]] = {}
+
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    async def start(self, handler: EventHandler):
+        await super().start(handler)
+        self._closing = False
+        await self._listen()
+
+    async def _connect(self):
+        # Imported here so the in-process backplane works without asyncpg
+        import asyncpg
+
+        return await asyncpg.connect(self.dsn)
+
+    async def _listen(self):
+        self._listen_conn = await self._connect()
+        self._listen_conn.add_termination_listener(self._on_terminated)
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+
+    def _on_terminated(self, connection):
+        if self._closing:
+            return
+        print("WARNING: Socket backplane lost its database connection, reconnecting")
+        self._listen_conn = None
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while not self._closing:
+            try:
+                await self._listen()
+                print("✅ Socket backplane reconnected")
+                return
+            except Exception as e:
+                self.errors += 1
+                print(f"WARNING: Socket backplane reconnect failed - {e}")
+                await asyncio.sleep(self.reconnect_seconds)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            origin, event_id, index, total, data = payload.split(":", 4)
+        except ValueError:
+            self.errors += 1
+            return
+        if origin == self.origin:
+            return
+
+        total = int(total)
+        if total > 1:
+            key = (origin, event_id)
+            chunks = self._partial.setdefault(key, [])
+            chunks.append(data)
+            if len(chunks) < total:
+                return
+            data = "".join(self._partial.pop(key))
+
+        self.received += 1
+        try:
+            event = json.loads(data)
+        except ValueError:
+            self.errors += 1
+            return
+        asyncio.get_running_loop().create_task(self._deliver(event))
+
+    async def _deliver(self, event: dict):
+        try:
+            await self._handler(event)
+        except Exception as e:
+            self.errors += 1
+            print(f"WARNING: Socket backplane delivery failed - {e}")
+
+    async def _notify(self, payloads: List[str]):
+        async with self._publish_lock:
+            if self._publish_conn is None or self._publish_conn.is_closed():
+                self._publish_conn = await self._connect()
+            async with self._publish_conn.transaction():
+                for payload in payloads:
+                    await self._publish_conn.execute(
+                        "SELECT pg_notify($1, $2)", self.channel, payload
+                    )
+
+    async def publish(self, event: dict):
+        if self._handler is not None:
+            await self._handler(event)
+
+        # ASCII-only JSON so a chunk's length in characters is its size in bytes
+        data = json.dumps(event, separators=(",", ":"), default=str)
+        chunks = [
+            data[i:i + _NOTIFY_CHUNK_SIZE] for i in range(0, len(data), _NOTIFY_CHUNK_SIZE)
+        ] or [""]
+        event_id = uuid.uuid4().hex[:12]
+        payloads = [
+            f"{self.origin}:{event_id}:{i}:{len(chunks)}:{chunk}"
+            for i, chunk in enumerate(chunks)
+        ]
+        try:
+            await self._notify(payloads)
+            self.published += 1
+        except Exception as e:
+            # Local sockets already have the event; other workers miss this one
+            self.errors += 1
+            self._publish_conn = None
+            print(f"WARNING: Socket backplane publish failed - {e}")
+
+    async def close(self):
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None and not conn.is_closed():
+                try:
+                    await conn.close()
+                except Exception:
+                    pass
+        self._listen_conn = None
+        self._publish_conn = None
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "channel": self.channel,
+            "connected": self._listen_conn is not None and not self._listen_conn.is_closed(),
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+
+def create_backplane() -> SocketBackplane:
+    """Backplane selected by SOCKET_BACKPLANE ("memory" or "postgres")."""
+    if settings.SOCKET_BACKPLANE == "postgres":
+        dsn = (
+            f"postgresql://{settings.DB_USER}:{settings.DB_PASS}"
+            f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+        )
+        return PostgresBackplane(dsn, settings.SOCKET_BACKPLANE_CHANNEL)
+    return InProcessBackplane()
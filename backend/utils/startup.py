@@ -0,0 +1,144 @@
+import builtins
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from utils.config import settings
+
+
+class StartupProfiler:
+    """
+    Records import and initialisation cost when STARTUP_PROFILE is enabled.
+
+    Imports are attributed to their top-level package by self time (time not
+    already counted for a nested import), the same split `python -X importtime`
+    uses, so the report shows which dependency is actually expensive.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.import_seconds: Dict[str, float] = {}
+        self.step_seconds: Dict[str, float] = {}
+        self._original_import = None
+        self._stack: List[float] = []
+        self._started_at = time.perf_counter()
+
+    def _profiled_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            package = name.split(".", 1)[0]
+            self.import_seconds[package] = (
+                self.import_seconds.get(package, 0.0) + elapsed - nested
+            )
+
+    def start_imports(self):
+        if not self.enabled or self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._profiled_import
+
+    def stop_imports(self):
+        if self._original_import is None:
+            return
+        builtins.__import__ = self._original_import
+        self._original_import = None
+        self.step_seconds["imports"] = sum(self.import_seconds.values())
+
+    @contextmanager
+    def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.step_seconds[name] = time.perf_counter() - start
+
+    def report(self, top: int = 15) -> Optional[dict]:
+        if not self.enabled:
+            return None
+
+        slowest = sorted(self.import_seconds.items(), key=lambda item: -item[1])[:top]
+        print("⏱️ Startup profile")
+        print("   Imports (self time by package):")
+        for package, seconds in slowest:
+            print(f"     {package:<28} {seconds * 1000:9.1f} ms")
+        print("   Steps:")
+        for name, seconds in self.step_seconds.items():
+            print(f"     {name:<28} {seconds * 1000:9.1f} ms")
+        print(f"   Since process start: {(time.perf_counter() - self._started_at) * 1000:.1f} ms")
+
+        return {
+            "imports_ms": {package: round(s * 1000, 1) for package, s in slowest},
+            "steps_ms": {name: round(s * 1000, 1) for name, s in self.step_seconds.items()},
+        }
+
+
+class SubsystemReadiness:
+    """State of each subsystem warmed up after the API starts accepting traffic."""
+
+    PENDING = "pending"
+    WARMING = "warming"
+    READY = "ready"
+    FAILED = "failed"
+    DISABLED = "disabled"
+
+    def __init__(self):
+        self._states: Dict[str, dict] = {}
+
+    def register(self, name: str, enabled: bool = True):
+        self._states[name] = {
+            "state": self.PENDING if enabled else self.DISABLED,
+            "seconds": None,
+            "error": None,
+        }
+
+    @contextmanager
+    def track(self, name: str):
+        """Mark a subsystem warming, then ready or failed, recording its load time."""
+        state = self._states.setdefault(name, {"seconds": None, "error": None})
+        state["state"] = self.WARMING
+        start = time.perf_counter()
+        try:
+            with startup_profiler.step(f"warm:{name}"):
+                yield
+        except Exception as e:
+            state.update(state=self.FAILED, error=str(e))
+            raise
+        else:
+            state.update(state=self.READY, error=None)
+        finally:
+            state["seconds"] = round(time.perf_counter() - start, 3)
+
+    def is_ready(self, name: str) -> bool:
+        return self._states.get(name, {}).get("state") == self.READY
+
+    def all_settled(self) -> bool:
+        return all(
+            s["state"] not in (self.PENDING, self.WARMING) for s in self._states.values()
+        )
+
+    def snapshot(self) -> dict:
+        if not self.all_settled():
+            status = "warming"
+        elif any(s["state"] == self.FAILED for s in self._states.values()):
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "subsystems": {name: dict(state) for name, state in self._states.items()},
+        }
+
+
+startup_profiler = StartupProfiler(enabled=settings.STARTUP_PROFILE)
+readiness = SubsystemReadiness()
@@ -1266,8 +1266,15 @@ class ApiClient {
     });
   }
 
-  async getChatHistory(roomId: number): Promise<ChatMessage[]> {
-    return this.request<ChatMessage[]>(`/messages/room/${roomId}`, {
+  async getChatHistory(
+    roomId: number,
+    options: { limit?: number; before?: number } = {},
+  ): Promise<ChatMessage[]> {
+    const params = new URLSearchParams();
+    if (options.limit) params.append("limit", options.limit.toString());
+    if (options.before) params.append("before", options.before.toString());
+    const query = params.toString() ? `?${params.toString()}` : "";
+    return this.request<ChatMessage[]>(`/messages/room/${roomId}${query}`, {
       method: "GET",
     });
   }